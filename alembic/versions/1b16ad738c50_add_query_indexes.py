@@ -0,0 +1,48 @@
+"""add_query_indexes
+
+Revision ID: 1b16ad738c50
+Revises: b059a50b0b5a
+Create Date: 2026-10-17 09:12:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b16ad738c50'
+down_revision: Union[str, None] = 'b059a50b0b5a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Composite indexes lead with the column every read filters on, so they
+    # also serve the plain user_id / student_id lookups.
+    op.create_index('ix_students_user_id_name', 'students', ['user_id', 'name'], unique=False)
+    op.create_index('ix_schedules_user_id', 'schedules', ['user_id'], unique=False)
+    op.create_index('ix_materials_user_id_category', 'materials', ['user_id', 'category'], unique=False)
+    op.create_index('ix_daily_entries_user_id_date', 'daily_entries', ['user_id', 'date'], unique=False)
+    # Fails if the table already holds duplicate (student, date, subject) rows;
+    # resolve those by hand before upgrading.
+    op.create_index('uq_daily_entries_student_date_subject', 'daily_entries', ['student_id', 'date', 'subject'], unique=True)
+    op.create_index('ix_observations_student_id_date', 'observations', ['student_id', 'date'], unique=False)
+    op.create_index('ix_student_interests_student_id', 'student_interests', ['student_id'], unique=False)
+    op.create_index('ix_student_allergies_student_id', 'student_allergies', ['student_id'], unique=False)
+    op.create_index('ix_observation_skills_observation_id', 'observation_skills', ['observation_id'], unique=False)
+    op.create_index('ix_daily_activities_daily_entry_id', 'daily_activities', ['daily_entry_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_daily_activities_daily_entry_id', table_name='daily_activities')
+    op.drop_index('ix_observation_skills_observation_id', table_name='observation_skills')
+    op.drop_index('ix_student_allergies_student_id', table_name='student_allergies')
+    op.drop_index('ix_student_interests_student_id', table_name='student_interests')
+    op.drop_index('ix_observations_student_id_date', table_name='observations')
+    op.drop_index('uq_daily_entries_student_date_subject', table_name='daily_entries')
+    op.drop_index('ix_daily_entries_user_id_date', table_name='daily_entries')
+    op.drop_index('ix_materials_user_id_category', table_name='materials')
+    op.drop_index('ix_schedules_user_id', table_name='schedules')
+    op.drop_index('ix_students_user_id_name', table_name='students')
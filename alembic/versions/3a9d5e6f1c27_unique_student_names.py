@@ -0,0 +1,30 @@
+"""unique_student_names
+
+Revision ID: 3a9d5e6f1c27
+Revises: 8e2f71c04b9d
+Create Date: 2026-10-17 23:41:18.604512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a9d5e6f1c27'
+down_revision: Union[str, None] = '8e2f71c04b9d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fails if a user already has two students with the same name; rename
+    # one of them before upgrading.
+    op.drop_index('ix_students_user_id_name', table_name='students')
+    op.create_index('uq_students_user_id_name', 'students', ['user_id', 'name'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_students_user_id_name', table_name='students')
+    op.create_index('ix_students_user_id_name', 'students', ['user_id', 'name'], unique=False)
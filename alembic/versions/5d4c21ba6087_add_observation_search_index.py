@@ -0,0 +1,83 @@
+"""add_observation_search_index
+
+Revision ID: 5d4c21ba6087
+Revises: 1b16ad738c50
+Create Date: 2026-10-17 11:03:27.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d4c21ba6087'
+down_revision: Union[str, None] = '1b16ad738c50'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE VIRTUAL TABLE observations_fts USING fts5(
+            student, notes, skills,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER observations_fts_ai AFTER INSERT ON observations BEGIN
+            INSERT INTO observations_fts (rowid, student, notes, skills)
+            VALUES (new.id, (SELECT name FROM students WHERE id = new.student_id), new.notes,
+                    (SELECT group_concat(skill, ' ') FROM observation_skills WHERE observation_id = new.id));
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER observations_fts_au AFTER UPDATE ON observations BEGIN
+            UPDATE observations_fts
+            SET student = (SELECT name FROM students WHERE id = new.student_id), notes = new.notes
+            WHERE rowid = new.id;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER observations_fts_ad AFTER DELETE ON observations BEGIN
+            DELETE FROM observations_fts WHERE rowid = old.id;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER observation_skills_fts_ai AFTER INSERT ON observation_skills BEGIN
+            UPDATE observations_fts
+            SET skills = (SELECT group_concat(skill, ' ') FROM observation_skills WHERE observation_id = new.observation_id)
+            WHERE rowid = new.observation_id;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER observation_skills_fts_ad AFTER DELETE ON observation_skills BEGIN
+            UPDATE observations_fts
+            SET skills = (SELECT group_concat(skill, ' ') FROM observation_skills WHERE observation_id = old.observation_id)
+            WHERE rowid = old.observation_id;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER students_fts_au AFTER UPDATE OF name ON students BEGIN
+            UPDATE observations_fts SET student = new.name
+            WHERE rowid IN (SELECT id FROM observations WHERE student_id = new.id);
+        END
+    """)
+    op.execute("""
+        INSERT INTO observations_fts (rowid, student, notes, skills)
+        SELECT o.id, s.name, o.notes,
+               (SELECT group_concat(skill, ' ') FROM observation_skills WHERE observation_id = o.id)
+        FROM observations o JOIN students s ON s.id = o.student_id
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS students_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS observation_skills_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS observation_skills_fts_ai")
+    op.execute("DROP TRIGGER IF EXISTS observations_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS observations_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS observations_fts_ai")
+    op.execute("DROP TABLE IF EXISTS observations_fts")
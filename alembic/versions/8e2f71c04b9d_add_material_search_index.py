@@ -0,0 +1,55 @@
+"""add_material_search_index
+
+Revision ID: 8e2f71c04b9d
+Revises: 5d4c21ba6087
+Create Date: 2026-10-17 23:14:05.281736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2f71c04b9d'
+down_revision: Union[str, None] = '5d4c21ba6087'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The trigram tokenizer needs SQLite 3.34 or newer
+    op.execute("""
+        CREATE VIRTUAL TABLE materials_fts USING fts5(
+            name, description,
+            content = 'materials', content_rowid = 'id',
+            tokenize = 'trigram'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER materials_fts_ai AFTER INSERT ON materials BEGIN
+            INSERT INTO materials_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER materials_fts_ad AFTER DELETE ON materials BEGIN
+            INSERT INTO materials_fts (materials_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER materials_fts_au AFTER UPDATE OF name, description ON materials BEGIN
+            INSERT INTO materials_fts (materials_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO materials_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """)
+    op.execute("INSERT INTO materials_fts (materials_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS materials_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS materials_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS materials_fts_ai")
+    op.execute("DROP TABLE IF EXISTS materials_fts")
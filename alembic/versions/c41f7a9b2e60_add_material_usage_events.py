@@ -0,0 +1,53 @@
+"""add_material_usage_events
+
+Revision ID: c41f7a9b2e60
+Revises: 3a9d5e6f1c27
+Create Date: 2026-10-18 09:12:40.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f7a9b2e60'
+down_revision: Union[str, None] = '3a9d5e6f1c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('material_usage_events',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('material_id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=True),
+    sa.Column('used_on', sa.Date(), nullable=False),
+    sa.Column('used_at', sa.DateTime(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['material_id'], ['materials.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_material_usage_events_material_id', 'material_usage_events', ['material_id'], unique=False)
+    op.create_index('ix_material_usage_events_user_id_used_on', 'material_usage_events', ['user_id', 'used_on'], unique=False)
+    op.create_table('material_usage_daily',
+    sa.Column('material_id', sa.Integer(), nullable=False),
+    sa.Column('used_on', sa.Date(), nullable=False),
+    sa.Column('uses', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['material_id'], ['materials.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('material_id', 'used_on')
+    )
+    op.create_index('ix_material_usage_daily_user_id_used_on', 'material_usage_daily', ['user_id', 'used_on'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_material_usage_daily_user_id_used_on', table_name='material_usage_daily')
+    op.drop_table('material_usage_daily')
+    op.drop_index('ix_material_usage_events_user_id_used_on', table_name='material_usage_events')
+    op.drop_index('ix_material_usage_events_material_id', table_name='material_usage_events')
+    op.drop_table('material_usage_events')
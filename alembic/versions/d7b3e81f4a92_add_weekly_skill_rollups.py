@@ -0,0 +1,55 @@
+"""add_weekly_skill_rollups
+
+Revision ID: d7b3e81f4a92
+Revises: c41f7a9b2e60
+Create Date: 2026-10-18 14:05:51.337120
+
+"""
+from collections import Counter
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b3e81f4a92'
+down_revision: Union[str, None] = 'c41f7a9b2e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    rollups = op.create_table('weekly_skill_rollups',
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('week_start', sa.Date(), nullable=False),
+    sa.Column('subject', sa.String(length=100), nullable=False),
+    sa.Column('skill_level', sa.String(length=50), nullable=False),
+    sa.Column('sessions', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('student_id', 'week_start', 'subject', 'skill_level')
+    )
+    op.create_index('ix_weekly_skill_rollups_user_id_week_start', 'weekly_skill_rollups', ['user_id', 'week_start'], unique=False)
+
+    # Backfill from the existing entries (same result as crud.rebuild_weekly_rollups)
+    weekly = Counter()
+    for user_id, student_id, day, subject, skill_level, n in op.get_bind().execute(sa.text(
+        "SELECT user_id, student_id, date, subject, skill_level, COUNT(*) FROM daily_entries "
+        "GROUP BY user_id, student_id, date, subject, skill_level"
+    )):
+        day = day if isinstance(day, date) else date.fromisoformat(str(day)[:10])
+        weekly[(user_id, student_id, day - timedelta(days=day.weekday()), subject, skill_level)] += n
+    if weekly:
+        op.bulk_insert(rollups, [
+            {'user_id': user_id, 'student_id': student_id, 'week_start': week,
+             'subject': subject, 'skill_level': skill_level, 'sessions': n}
+            for (user_id, student_id, week, subject, skill_level), n in weekly.items()
+        ])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_weekly_skill_rollups_user_id_week_start', table_name='weekly_skill_rollups')
+    op.drop_table('weekly_skill_rollups')
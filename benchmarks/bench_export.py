@@ -0,0 +1,110 @@
+"""Rows per second and peak RSS of "Export My Data", streamed in chunks versus loading whole tables first.
+
+    python -m benchmarks.bench_export --students 200 --entries 500 --observations 100
+
+Each run happens in a fresh process, so its peak RSS is its own.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import zipfile
+
+# The app reads DATABASE_URL at import time; worker processes re-import this
+# module and must find the parent's scratch database, not make their own
+if "MONTY_BENCH_DB" not in os.environ:
+    _tmp = tempfile.TemporaryDirectory()
+    os.environ["MONTY_BENCH_DB"] = os.path.join(_tmp.name, "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.environ['MONTY_BENCH_DB']}"
+
+from benchmarks.common import make_engine, populate
+from src.monty.crud import (
+    get_user_settings,
+    list_daily_entries,
+    list_materials,
+    list_observations,
+    list_schedules,
+    list_students,
+)
+from src.monty.export import EXPORT_FORMATS, export_user_data, peak_rss_bytes
+
+
+def load_everything(user_id: int, file) -> dict:
+    """The export without streaming: every table loaded through crud, then written as JSON Lines."""
+    started = time.perf_counter()
+    tables = {
+        "students": list_students.__wrapped__(user_id),
+        "observations": list_observations.__wrapped__(user_id),
+        "schedules": list_schedules.__wrapped__(user_id),
+        "materials": list_materials.__wrapped__(user_id),
+        "daily_entries": list_daily_entries.__wrapped__(user_id),
+        "settings": [get_user_settings(user_id) or {}],
+    }
+    with zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, records in tables.items():
+            archive.writestr(f"{name}.jsonl", "".join(json.dumps(r) + "\n" for r in records))
+    seconds = time.perf_counter() - started
+    rows = sum(len(records) for records in tables.values())
+    return {"rows": rows, "seconds": seconds, "rows_per_second": rows / seconds}
+
+
+def worker(mode: str, chunk_rows: int, results):
+    with tempfile.TemporaryFile() as file:
+        if mode == "load everything":
+            stats = load_everything(1, file)
+        else:
+            stats = export_user_data(1, file, mode, chunk_rows)
+        stats["size"] = file.seek(0, os.SEEK_END)
+    stats["peak_rss_bytes"] = peak_rss_bytes()
+    results.put(stats)
+
+
+def run(mode: str, chunk_rows: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=worker, args=(mode, chunk_rows, results))
+    process.start()
+    stats = results.get()
+    process.join()
+    return stats
+
+
+def idle_worker(results):
+    results.put(peak_rss_bytes())
+
+
+def run_idle() -> int:
+    """Peak RSS of a worker that only imports the app, the floor under every run."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=idle_worker, args=(results,))
+    process.start()
+    peak = results.get()
+    process.join()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--entries", type=int, default=500, help="daily entries per student")
+    parser.add_argument("--observations", type=int, default=100, help="observations per student")
+    parser.add_argument("--chunk-rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    counts = populate(make_engine(os.environ["MONTY_BENCH_DB"]), 1, args.students, args.entries, args.observations)
+    print(f"{counts['daily_entries']} daily entries, {counts['observations']} observations, "
+          f"{args.students} students; chunks of {args.chunk_rows} rows\n")
+    print(f"{'':<18}{'rows/s':>10}{'seconds':>10}{'archive':>10}{'peak RSS':>11}")
+    print(f"{'idle process':<18}{'':>30}{run_idle() / 2**20:>8.0f} MB")
+    for mode in ["load everything", *EXPORT_FORMATS]:
+        stats = run(mode, args.chunk_rows)
+        print(f"{mode:<18}{stats['rows_per_second']:>10,.0f}{stats['seconds']:>10.2f}"
+              f"{stats['size'] / 2**20:>7.1f} MB{stats['peak_rss_bytes'] / 2**20:>8.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
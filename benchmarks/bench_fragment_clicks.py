@@ -0,0 +1,125 @@
+"""Click latency on a Materials page of 200 cards, with whole-page reruns and with fragments.
+
+    python -m benchmarks.bench_fragment_clicks --cards 200 --clicks 5
+
+Drives pages/materials.py with Streamlit's AppTest against a scratch
+database. A click is timed from the interaction until every rerun it causes
+has finished, i.e. the button's own run plus the st.rerun() the page asks
+for. "page reruns" replaces st.fragment with a pass-through, which is how
+the page behaved before the cards and forms became fragments; every click
+then renders the whole page twice. "fragments" sends the click the way the
+browser does for a widget inside a fragment, as a rerun of that fragment
+only.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager, nullcontext
+
+# The app reads DATABASE_URL at import time, so point it at a scratch file first
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}"
+
+import streamlit as st
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+from benchmarks.common import AREAS, WORDS
+from src.monty import session
+from src.monty.crud import create_material
+from src.monty.database import init_db
+
+PAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages", "materials.py")
+USER = {"db_id": 1, "id": "user_001", "name": "Bench", "email": "", "school": "School", "classroom": "Room"}
+
+
+def seed(cards: int):
+    init_db()
+    for i in range(cards - 6):  # the demo data already has six materials
+        create_material(1, {
+            "name": f"Material {i:03d}", "category": AREAS[i % 6], "age_range": "3-6",
+            "description": " ".join(WORDS[:12]), "in_stock": True,
+        })
+
+
+def passthrough_fragment(func=None, **_):
+    return func if func is not None else (lambda f: f)
+
+
+@contextmanager
+def fragment_click(fragment_id: str):
+    """Send the next AppTest interaction as a rerun of ``fragment_id`` only, as the browser does."""
+    def scoped(**kwargs):
+        return RerunData(**kwargs, fragment_id_queue=[fragment_id], is_fragment_scoped_rerun=True)
+
+    # LocalScriptRunner builds its initial and its interaction RerunData from this name
+    local_script_runner.RerunData = scoped
+    try:
+        yield
+    finally:
+        local_script_runner.RerunData = RerunData
+
+
+def card_fragment_ids(at) -> list[str]:
+    """Fragment ids of the material cards, in page order (children of the grid fragment)."""
+    storage = at._fragment_storage
+    (grid,) = storage._ids_by_target_key["material_grid"]
+    return [fid for fid in storage._fragments if storage._parent_by_id.get(fid) == grid]
+
+
+def measure(mode: str, args) -> dict:
+    fragment = st.fragment
+    if mode == "page reruns":
+        st.fragment = passthrough_fragment
+    try:
+        at = AppTest.from_file(PAGE, default_timeout=120)
+        at.session_state.authenticated = True
+        at.session_state.user = USER
+        start = time.perf_counter()
+        at.run()
+        load = time.perf_counter() - start
+        assert not at.exception, at.exception
+
+        timings = {"Use": [], "View": []}
+        cards = card_fragment_ids(at) if mode == "fragments" else []
+        for i in range(args.clicks):
+            material_id = i + 1
+            for label, key in (("Use", f"use_{material_id}"), ("View", f"view_{material_id}")):
+                at.run()  # fresh full tree, untimed
+                scope = fragment_click(cards[i]) if cards else nullcontext()
+                with scope:
+                    start = time.perf_counter()
+                    at.button(key=key).click().run()
+                    timings[label].append(time.perf_counter() - start)
+                assert not at.exception, at.exception
+        return {"load": load, **{label: statistics.median(t) for label, t in timings.items()}}
+    finally:
+        st.fragment = fragment
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=200)
+    parser.add_argument("--clicks", type=int, default=5)
+    args = parser.parse_args()
+
+    seed(args.cards)
+    # Show every card on one page: the Materials page defaults to the second page size
+    session.PAGE_SIZES = (10, args.cards)
+    # AppTest runs the page outside the multipage app, where the sidebar links cannot resolve
+    st.page_link = lambda *a, **k: None
+
+    results = {mode: measure(mode, args) for mode in ("page reruns", "fragments")}
+    before, after = results["page reruns"], results["fragments"]
+    print(f"\n{args.cards} material cards, median of {args.clicks} clicks")
+    print(f"  {'':<22}{'page reruns':>14}{'fragments':>14}{'speedup':>10}")
+    for label, key in (("page load", "load"), ("Use click", "Use"), ("View click", "View")):
+        print(f"  {label:<22}{before[key] * 1000:>12.0f}ms{after[key] * 1000:>12.0f}ms"
+              f"{before[key] / after[key]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
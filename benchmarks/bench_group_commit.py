@@ -0,0 +1,92 @@
+"""Write throughput and latency of 50 concurrent sessions, committing directly and through the group-commit writer.
+
+    python -m benchmarks.bench_group_commit --sessions 50 --seconds 5
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+# The app reads DATABASE_URL at import time, so point it at a scratch file first
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}"
+
+from sqlalchemy.exc import OperationalError
+
+from benchmarks.bench_sqlite_profile import percentile
+from benchmarks.common import AREAS, SKILLS, WORDS
+from src.monty import database
+from src.monty.crud import create_observation, list_students
+from src.monty.database import init_db
+
+
+def run_mode(queued: bool, args) -> dict:
+    database.WRITE_QUEUE = queued
+    database.WRITE_WINDOW = args.window_ms / 1000
+    students = [s["name"] for s in list_students(1)]
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {"writes": [], "errors": 0}
+
+    def session(n):
+        # Each simulated teacher session saves observations back to back, as fast as it can
+        rng = random.Random(n)
+        while not stop.is_set():
+            data = {
+                "student": rng.choice(students), "date": "2026-03-02", "area": rng.choice(AREAS),
+                "notes": " ".join(rng.choice(WORDS) for _ in range(12)), "skills": [rng.choice(SKILLS)],
+            }
+            start = time.perf_counter()
+            try:
+                create_observation(1, data)
+            except OperationalError:
+                with lock:
+                    stats["errors"] += 1
+                continue
+            with lock:
+                stats["writes"].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(args.sessions)]
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    writer = database.get_writer()
+    if writer is not None:
+        stats["commits"] = writer.commits
+        writer.close()
+        database._writer = None
+    else:
+        stats["commits"] = len(stats["writes"])
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    init_db()
+    print(f"{args.sessions} sessions saving observations, {args.seconds:.0f}s per mode\n")
+    print(f"{'mode':<14}{'writes/s':>10}{'commits':>10}{'p50':>10}{'p99':>10}{'errors':>8}")
+    for queued in (False, True):
+        stats = run_mode(queued, args)
+        print(
+            f"{'group commit' if queued else 'direct':<14}"
+            f"{len(stats['writes']) / args.seconds:>10.0f}"
+            f"{stats['commits']:>10}"
+            f"{percentile(stats['writes'], 0.50) * 1000:>8.1f}ms"
+            f"{percentile(stats['writes'], 0.99) * 1000:>8.1f}ms"
+            f"{stats['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Query plans and timings for the hot read paths with and without secondary indexes.
+
+    python -m benchmarks.bench_indexes --users 50 --students 30 --entries 200
+"""
+
+import argparse
+import os
+import tempfile
+
+from sqlalchemy import text
+
+from benchmarks.common import best_of, make_engine, populate
+from src.monty.models import Base
+
+# (label, SQL, params) — mirrors what crud.list_* and the pages ask for
+QUERIES = [
+    ("students by user", "SELECT * FROM students WHERE user_id = :u ORDER BY id", {}),
+    ("student by name", "SELECT id FROM students WHERE user_id = :u AND name = :name", {"name": "Student 007"}),
+    ("student interests (selectin)",
+     "SELECT * FROM student_interests WHERE student_id IN (SELECT id FROM students WHERE user_id = :u)", {}),
+    ("observations by user",
+     "SELECT observations.* FROM observations JOIN students ON students.id = observations.student_id "
+     "WHERE students.user_id = :u", {}),
+    ("observations for student by date",
+     "SELECT * FROM observations WHERE student_id = :s AND date BETWEEN :start AND :end", {}),
+    ("daily entries by user", "SELECT * FROM daily_entries WHERE user_id = :u", {}),
+    ("daily entries for a week",
+     "SELECT * FROM daily_entries WHERE user_id = :u AND date BETWEEN :start AND :end", {}),
+    ("entry duplicate check",
+     "SELECT 1 FROM daily_entries WHERE student_id = :s AND date = :start AND subject = 'Art'", {}),
+    ("entry activities (selectin)",
+     "SELECT * FROM daily_activities WHERE daily_entry_id IN "
+     "(SELECT id FROM daily_entries WHERE user_id = :u AND date BETWEEN :start AND :end)", {}),
+    ("schedule by user", "SELECT * FROM schedules WHERE user_id = :u", {}),
+    ("materials by user", "SELECT * FROM materials WHERE user_id = :u", {}),
+]
+
+
+def explain(conn, sql, params):
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+    return "; ".join(row[-1] for row in rows)
+
+
+def run(engine, params, repeat):
+    results = {}
+    with engine.connect() as conn:
+        for label, sql, extra in QUERIES:
+            bound = {**params, **extra}
+            plan = explain(conn, sql, bound)
+            seconds = best_of(lambda: conn.execute(text(sql), bound).fetchall(), repeat)
+            results[label] = (plan, seconds)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--students", type=int, default=30, help="students per user")
+    parser.add_argument("--entries", type=int, default=200, help="daily entries per student")
+    parser.add_argument("--observations", type=int, default=40, help="observations per student")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(os.path.join(tmp, "bench.db"), create_indexes=False)
+        counts = populate(engine, args.users, args.students, args.entries, args.observations)
+        print("Dataset:", ", ".join(f"{k}={v:,}" for k, v in counts.items()))
+
+        params = {"u": args.users // 2, "s": args.students * (args.users // 2),
+                  "start": "2024-10-07", "end": "2024-10-13"}
+        before = run(engine, params, args.repeat)
+
+        with engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(conn)
+            conn.exec_driver_sql("ANALYZE")
+        after = run(engine, params, args.repeat)
+        engine.dispose()
+
+    for label, _, _ in QUERIES:
+        plan_before, t_before = before[label]
+        plan_after, t_after = after[label]
+        print(f"\n{label}: {t_before * 1000:.2f} ms -> {t_after * 1000:.2f} ms "
+              f"({t_before / t_after if t_after else float('inf'):.1f}x)")
+        print(f"  before: {plan_before}")
+        print(f"  after:  {plan_after}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Memory and filter latency of session collections as lists of dicts versus a RecordStore.
+
+    python -m benchmarks.bench_record_store --rows 10000 100000
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from datetime import date, timedelta
+
+from benchmarks.common import AREAS, SKILL_LEVELS, SKILLS, SUBJECTS, WORDS, best_of
+from src.monty.store import DailyEntryRecord, ObservationRecord, RecordStore
+
+STUDENTS = [f"Student {i:03d}" for i in range(30)]
+
+
+def fresh(value: str) -> str:
+    # A new string object per row, as each ORM row yields, so interning is measured fairly
+    return "".join(list(value))
+
+
+def daily_entry_dicts(rows: int, seed: int = 42):
+    """Rows shaped like crud._daily_entry_to_dict output."""
+    rng = random.Random(seed)
+    start = date(2024, 9, 1)
+    for i in range(rows):
+        yield {
+            "id": i + 1,
+            "student": fresh(rng.choice(STUDENTS)),
+            "date": (start + timedelta(days=rng.randrange(300))).isoformat(),
+            "subject": fresh(rng.choice(SUBJECTS)),
+            "activities": [rng.choice(WORDS) for _ in range(2)],
+            "skill_level": fresh(rng.choice(SKILL_LEVELS)),
+            "notes": " ".join(rng.choice(WORDS) for _ in range(8)),
+        }
+
+
+def observation_dicts(rows: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = date(2024, 9, 1)
+    for i in range(rows):
+        yield {
+            "id": i + 1,
+            "student": fresh(rng.choice(STUDENTS)),
+            "date": (start + timedelta(days=rng.randrange(300))).isoformat(),
+            "area": fresh(rng.choice(AREAS)),
+            "notes": " ".join(rng.choice(WORDS) for _ in range(12)),
+            "skills": [rng.choice(SKILLS)],
+        }
+
+
+def measure(build):
+    """Bytes still allocated by the object ``build()`` returns, and the object."""
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        entry_bytes, entries = measure(lambda: list(daily_entry_dicts(rows)))
+        store_bytes, store = measure(lambda: RecordStore.from_dicts(
+            DailyEntryRecord, daily_entry_dicts(rows), ("student", "date", "subject"), ("student", "date", "subject")))
+        obs_bytes, observations = measure(lambda: list(observation_dicts(rows)))
+        obs_store_bytes, obs_store = measure(lambda: RecordStore.from_dicts(
+            ObservationRecord, observation_dicts(rows), ("student", "date", "area")))
+
+        print(f"\n{rows:,} rows")
+        print(f"  {'memory':<34}{'dicts':>12}{'store':>12}")
+        print(f"  {'daily entries':<34}{entry_bytes / 2**20:>10.1f}MB{store_bytes / 2**20:>10.1f}MB")
+        print(f"  {'observations':<34}{obs_bytes / 2**20:>10.1f}MB{obs_store_bytes / 2**20:>10.1f}MB")
+
+        student, day, subject, area = STUDENTS[3], "2024-10-14", SUBJECTS[2], AREAS[1]
+        week = ("2024-10-14", "2024-10-20")
+        cases = [
+            ("entries for a student",
+             lambda: [e for e in entries if e["student"] == student],
+             lambda: store.where(student=student)),
+            ("entry duplicate check",
+             lambda: any(e["student"] == student and e["date"] == day and e["subject"] == subject for e in entries),
+             lambda: store.first(student=student, date=day, subject=subject) is not None),
+            ("entries for a subject",
+             lambda: [e for e in entries if e["subject"] == subject],
+             lambda: store.where(subject=subject)),
+            ("student's week",
+             lambda: [e for e in entries if e["student"] == student and week[0] <= e["date"] <= week[1]],
+             lambda: store.between("date", *week, student=student)),
+            ("observations for a student",
+             lambda: [o for o in observations if o["student"] == student],
+             lambda: obs_store.where(student=student)),
+            ("observations in an area",
+             lambda: [o for o in observations if o["area"] == area],
+             lambda: obs_store.where(area=area)),
+        ]
+        print(f"  {'filter':<34}{'dicts':>12}{'store':>12}{'speedup':>10}")
+        for label, scan, query in cases:
+            expected, actual = scan(), query()
+            assert expected == actual if isinstance(expected, bool) else len(expected) == len(actual)
+            t_scan = best_of(scan, args.repeat)
+            t_query = best_of(query, args.repeat)
+            print(f"  {label:<34}{t_scan * 1000:>10.3f}ms{t_query * 1000:>10.3f}ms{t_scan / t_query:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
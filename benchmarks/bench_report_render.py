@@ -0,0 +1,121 @@
+"""Time and peak memory of a full-year progress report, string concatenation versus streamed templates.
+
+    python -m benchmarks.bench_report_render --observations 200 800 --notes-words 60
+"""
+
+import argparse
+import gc
+import os
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from benchmarks.common import AREAS, SKILLS, SUBJECTS, WORDS, best_of
+from src.monty import reporting
+from src.monty.reporting import render, render_stream, spool
+
+
+def year_of_observations(count: int, notes_words: int, seed: int = 3):
+    rng = random.Random(seed)
+    start = date(2025, 9, 1)
+    return [
+        {
+            "date": (start + timedelta(days=i * 365 // count)).isoformat(),
+            "area": rng.choice(AREAS),
+            "skills": rng.sample(SKILLS, 2),
+            "notes": " ".join(rng.choice(WORDS) for _ in range(notes_words)),
+        }
+        for i in range(count)
+    ]
+
+
+STUDENT = {
+    "name": "Emma Johnson", "age": 5, "parent_name": "Sarah Johnson", "parent_email": "sarah.j@email.com",
+    "interests": ["Nature", "Painting"], "allergies": ["Peanuts"],
+}
+
+
+def concatenated_report(student, observations, weekly):
+    """The report as pages/reports.py built it before templates: one growing string."""
+    content = f"""
+PROGRESS REPORT
+===============
+
+Student: {student['name']}
+Age: {student['age']} years
+Parent: {student['parent_name']}
+Email: {student['parent_email']}
+
+INTERESTS
+---------
+"""
+    for interest in student["interests"]:
+        content += f"- {interest}\n"
+    content += "\nALLERGIES\n---------\n"
+    for allergy in student["allergies"]:
+        content += f"- {allergy}\n"
+    content += "\nWEEKLY PROGRESS\n---------------\n"
+    for subject, sessions in weekly["by_subject"].items():
+        content += f"- {subject}: {sessions} sessions\n"
+    content += "\nOBSERVATIONS\n------------\n"
+    for obs in observations:
+        content += f"\nDate: {obs['date']}\n"
+        content += f"Area: {obs['area']}\n"
+        content += f"Skills: {', '.join(obs.get('skills', []))}\n"
+        content += f"Notes: {obs['notes']}\n"
+    return content
+
+
+def peak_bytes(fn) -> int:
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def drain(chunks):
+    with open(os.devnull, "w") as sink:
+        for chunk in chunks:
+            sink.write(chunk)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--observations", type=int, nargs="+", default=[200, 800])
+    parser.add_argument("--notes-words", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    weekly = {"by_subject": {subject: 40 for subject in SUBJECTS}}
+    context = {"student": STUDENT, "weekly": weekly, "weekly_weeks": 52}
+
+    start = time.perf_counter()
+    reporting.environment("text").get_template("progress_report.j2")
+    compile_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    reporting.environment("text").get_template("progress_report.j2")
+    cached_ms = (time.perf_counter() - start) * 1000
+    print(f"template compile {compile_ms:.2f}ms, cached lookup {cached_ms:.3f}ms")
+
+    for count in args.observations:
+        observations = year_of_observations(count, args.notes_words)
+        size = len(render("progress_report.j2", "text", observations=observations, **context))
+        cases = [
+            ("concatenated string", lambda: concatenated_report(STUDENT, observations, weekly)),
+            ("template, joined", lambda: render("progress_report.j2", "text", observations=observations, **context)),
+            ("template, streamed", lambda: drain(
+                render_stream("progress_report.j2", "text", observations=observations, **context))),
+            ("template, download file", lambda: spool(
+                render_stream("progress_report.j2", "text", observations=observations, **context)).close()),
+        ]
+        print(f"\n{count} observations, {size / 1024:.0f} KB report")
+        print(f"  {'':<26}{'time':>10}{'peak memory':>14}")
+        for label, fn in cases:
+            print(f"  {label:<26}{best_of(fn, args.repeat) * 1000:>8.2f}ms{peak_bytes(fn) / 1024:>12.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
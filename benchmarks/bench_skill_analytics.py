@@ -0,0 +1,95 @@
+"""Skill-progression analytics over a classroom's daily entries, Python loops versus NumPy arrays.
+
+    python -m benchmarks.bench_skill_analytics --students 250 --entries 400
+"""
+
+import argparse
+import os
+import tempfile
+from datetime import date
+
+# The app reads DATABASE_URL at import time, so point it at a scratch file first
+_tmp = tempfile.TemporaryDirectory()
+_path = os.path.join(_tmp.name, "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_path}"
+
+import numpy as np
+
+from benchmarks.common import best_of, make_engine, populate
+from src.monty.analytics import ROLLING_WINDOW, compute_progression, load_entries
+from src.monty.crud import SKILL_LEVELS, list_daily_entries
+
+TODAY = date(2025, 9, 1)
+
+
+def python_progression(entries, today: date, window: int = ROLLING_WINDOW) -> dict:
+    """The same per-student, per-subject figures from entry dicts, one entry at a time."""
+    rank = {level: i for i, level in enumerate(SKILL_LEVELS, start=1)}
+    runs = {}
+    for entry in entries:
+        if entry["skill_level"] in rank:
+            runs.setdefault((entry["student"], entry["subject"]), []).append(
+                (entry["date"], rank[entry["skill_level"]])
+            )
+    summary, distribution, monthly = {}, {}, {}
+    for (student, subject), run in runs.items():
+        run.sort()
+        levels = [level for _, level in run]
+        rolling = [
+            sum(levels[max(0, i - window + 1):i + 1]) / (i + 1 - max(0, i - window + 1))
+            for i in range(len(levels))
+        ]
+        last_up = None
+        for i in range(1, len(run)):
+            if levels[i] > levels[i - 1]:
+                last_up = run[i][0]
+        summary[(student, subject)] = {
+            "sessions": len(run), "current_level": levels[-1], "rolling": rolling[-1],
+            "days_since_level_up": (today - date.fromisoformat(last_up)).days if last_up else None,
+        }
+        distribution[(subject, levels[-1])] = distribution.get((subject, levels[-1]), 0) + 1
+        for day, level in run:
+            monthly[(day[:7], level)] = monthly.get((day[:7], level), 0) + 1
+    return {"summary": summary, "distribution": distribution, "monthly": monthly}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=250, help="students in the class")
+    parser.add_argument("--entries", type=int, default=400, help="daily entries per student")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    counts = populate(make_engine(_path), 1, args.students, args.entries, 1)
+    print(f"{counts['daily_entries']} daily entries, {args.students} students")
+
+    arrays = load_entries(1)
+    entries = list_daily_entries.__wrapped__(1)
+    vectorized = compute_progression(arrays, TODAY)
+    looped = python_progression(entries, TODAY)
+
+    # Both must agree before their timings mean anything
+    summary = vectorized["summary"]
+    assert len(summary) == len(looped["summary"])
+    for row in summary.itertuples():
+        expected = looped["summary"][(row.student, row.subject)]
+        assert row.sessions == expected["sessions"] and row.current_level == expected["current_level"]
+        assert abs(row.rolling - expected["rolling"]) < 1e-9
+        assert (np.isnan(row.days_since_level_up) if expected["days_since_level_up"] is None
+                else row.days_since_level_up == expected["days_since_level_up"])
+    assert int(vectorized["distribution"].to_numpy().sum()) == sum(looped["distribution"].values())
+
+    cases = [
+        ("load entry dicts (list_daily_entries)", lambda: list_daily_entries.__wrapped__(1)),
+        ("load column arrays (load_entries)", lambda: load_entries(1)),
+        ("compute, Python loops", lambda: python_progression(entries, TODAY)),
+        ("compute, NumPy arrays", lambda: compute_progression(arrays, TODAY)),
+        ("end to end, Python", lambda: python_progression(list_daily_entries.__wrapped__(1), TODAY)),
+        ("end to end, NumPy", lambda: compute_progression(load_entries(1), TODAY)),
+    ]
+    for label, fn in cases:
+        print(f"  {label:<40}{best_of(fn, args.repeat) * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
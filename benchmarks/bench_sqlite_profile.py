@@ -0,0 +1,116 @@
+"""Reader/writer throughput on a shared SQLite file with the tuned engine profile on and off.
+
+    python -m benchmarks.bench_sqlite_profile --readers 8 --writers 4 --seconds 5
+"""
+
+import argparse
+import itertools
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from benchmarks.common import make_engine, populate
+from src.monty.database import create_db_engine
+
+READ_SQL = text(
+    "SELECT daily_entries.*, students.name FROM daily_entries "
+    "JOIN students ON students.id = daily_entries.student_id WHERE daily_entries.user_id = :u"
+)
+WRITE_SQL = text(
+    "INSERT INTO daily_entries (student_id, date, subject, skill_level, notes, user_id) "
+    "VALUES (:s, :d, :subject, 'Developing', 'benchmark', :u)"
+)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run_profile(tuned, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        make_engine(path).dispose()
+        seed_engine = create_db_engine(f"sqlite:///{path}", tuned=tuned)
+        populate(seed_engine, args.users, 30, 50, 10)
+        seed_engine.dispose()
+
+        engine = create_db_engine(f"sqlite:///{path}", tuned=tuned)
+        stop = threading.Event()
+        lock = threading.Lock()
+        stats = {"reads": [], "writes": [], "errors": 0}
+        # Each write gets a distinct (student, date) so the unique index never trips
+        counter = itertools.count()
+
+        def reader(n):
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    with engine.connect() as conn:
+                        conn.execute(READ_SQL, {"u": n % args.users + 1}).fetchall()
+                except OperationalError:
+                    with lock:
+                        stats["errors"] += 1
+                    continue
+                with lock:
+                    stats["reads"].append(time.perf_counter() - start)
+
+        def writer(n):
+            while not stop.is_set():
+                i = next(counter)
+                params = {"s": n % 30 + 1, "u": 1, "subject": "Benchmark",
+                          "d": (date(2030, 1, 1) + timedelta(days=i)).isoformat()}
+                start = time.perf_counter()
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(WRITE_SQL, params)
+                except OperationalError:
+                    with lock:
+                        stats["errors"] += 1
+                    continue
+                with lock:
+                    stats["writes"].append(time.perf_counter() - start)
+
+        threads = [threading.Thread(target=reader, args=(n,)) for n in range(args.readers)]
+        threads += [threading.Thread(target=writer, args=(n,)) for n in range(args.writers)]
+        for t in threads:
+            t.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        engine.dispose()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--users", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:.0f}s per profile\n")
+    print(f"{'profile':<10}{'reads/s':>10}{'writes/s':>10}{'read p99':>12}{'write p99':>12}{'errors':>8}")
+    for tuned in (False, True):
+        stats = run_profile(tuned, args)
+        print(
+            f"{'tuned' if tuned else 'default':<10}"
+            f"{len(stats['reads']) / args.seconds:>10.0f}"
+            f"{len(stats['writes']) / args.seconds:>10.0f}"
+            f"{percentile(stats['reads'], 0.99) * 1000:>10.1f}ms"
+            f"{percentile(stats['writes'], 0.99) * 1000:>10.1f}ms"
+            f"{stats['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Time to build a term report for a whole class, aggregating in Python over full lists versus GROUP BY in SQL.
+
+    python -m benchmarks.bench_term_report --students 30 100 --entries 400 --observations 120
+"""
+
+import argparse
+import os
+import tempfile
+from collections import Counter
+from datetime import date
+
+# The app reads DATABASE_URL at import time, so point it at a scratch file first
+_tmp = tempfile.TemporaryDirectory()
+_path = os.path.join(_tmp.name, "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_path}"
+
+from benchmarks.common import best_of, make_engine, populate
+from src.monty import database
+from src.monty.crud import list_daily_entries, list_observations, term_report
+
+START, END = date(2024, 9, 1), date(2024, 12, 31)
+
+
+def python_term_report(user_id: int) -> dict:
+    """The same figures from the full observation and entry lists, the way a page would compute them."""
+    start, end = START.isoformat(), END.isoformat()
+    reports = {}
+    for obs in list_observations.__wrapped__(user_id):
+        if not start <= obs["date"] <= end:
+            continue
+        report = reports.setdefault(obs["student"], {
+            "observations": 0, "areas": Counter(), "skills": Counter(), "subjects": Counter(), "levels": Counter(),
+        })
+        report["observations"] += 1
+        report["areas"][obs["area"]] += 1
+        report["skills"].update(obs["skills"])
+    for entry in list_daily_entries.__wrapped__(user_id):
+        if not start <= entry["date"] <= end:
+            continue
+        report = reports.setdefault(entry["student"], {
+            "observations": 0, "areas": Counter(), "skills": Counter(), "subjects": Counter(), "levels": Counter(),
+        })
+        report["subjects"][entry["subject"]] += 1
+        report["levels"][(entry["date"][:7], entry["skill_level"])] += 1
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, nargs="+", default=[30, 100], help="students in the class")
+    parser.add_argument("--entries", type=int, default=400, help="daily entries per student")
+    parser.add_argument("--observations", type=int, default=120, help="observations per student")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'students':>8}{'rows':>10}{'python':>12}{'sql':>12}{'speedup':>10}")
+    for students in args.students:
+        if os.path.exists(_path):
+            database.get_engine().dispose()
+            os.remove(_path)
+        counts = populate(make_engine(_path), 1, students, args.entries, args.observations)
+
+        expected = python_term_report(1)
+        report = term_report(1, START, END)
+        for r in report["students"].values():
+            assert r["observations"] == expected.get(r["student"], {}).get("observations", 0), r["student"]
+
+        python_s = best_of(lambda: python_term_report(1), args.repeat)
+        sql_s = best_of(lambda: term_report(1, START, END), args.repeat)
+        rows = counts["daily_entries"] + counts["observations"]
+        print(f"{students:>8}{rows:>10}{python_s * 1000:>10.0f}ms{sql_s * 1000:>10.0f}ms{python_s / sql_s:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
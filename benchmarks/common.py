@@ -0,0 +1,97 @@
+"""Shared helpers for the benchmark scripts.
+
+Run benchmarks from the repository root, e.g. ``python -m benchmarks.bench_indexes``.
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine
+
+from src.monty.models import Base
+
+AREAS = ["Practical Life", "Sensorial", "Language", "Mathematics", "Art", "Science", "Music"]
+SUBJECTS = AREAS + ["Outdoor"]
+SKILL_LEVELS = ["Emerging", "Developing", "Proficient", "Advanced"]
+SKILLS = ["Concentration", "Fine Motor", "Phonics", "Counting", "Writing", "Visual Discrimination"]
+WORDS = (
+    "concentration pouring tower rods alphabet counting cutting sorting "
+    "practice repeated carefully independently chose worked spilled helped"
+).split()
+
+
+def make_engine(path: str, create_indexes: bool = True):
+    """Create an engine for ``path`` with the current schema, optionally without secondary indexes."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    if not create_indexes:
+        with engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+    return engine
+
+
+def populate(engine, users: int, students_per_user: int, entries_per_student: int,
+             observations_per_student: int, seed: int = 42):
+    """Bulk-load a synthetic classroom dataset with raw executemany calls."""
+    rng = random.Random(seed)
+    start = date(2024, 9, 1)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO users (id, username, password_hash, name, email) VALUES (?, ?, ?, ?, ?)",
+            [(u, f"teacher{u}", "x", f"Teacher {u}", f"t{u}@example.com") for u in range(1, users + 1)],
+        )
+        students, interests = [], []
+        sid = 0
+        for u in range(1, users + 1):
+            for s in range(students_per_user):
+                sid += 1
+                students.append((sid, f"Student {s:03d}", rng.randint(3, 6), "Parent", "p@example.com", u))
+                interests.append((sid, rng.choice(AREAS)))
+        conn.exec_driver_sql(
+            "INSERT INTO students (id, name, age, parent_name, parent_email, user_id) VALUES (?, ?, ?, ?, ?, ?)",
+            students,
+        )
+        conn.exec_driver_sql("INSERT INTO student_interests (student_id, interest) VALUES (?, ?)", interests)
+
+        entries, activities, observations, skills = [], [], [], []
+        eid = oid = 0
+        for student_id, _, _, _, _, user_id in students:
+            for i in range(entries_per_student):
+                eid += 1
+                # Spread subjects across days so (student, date, subject) stays unique
+                day = start + timedelta(days=i // len(SUBJECTS))
+                entries.append((eid, student_id, day.isoformat(), SUBJECTS[i % len(SUBJECTS)],
+                                rng.choice(SKILL_LEVELS), " ".join(rng.choices(WORDS, k=12)), user_id))
+                activities.append((eid, rng.choice(WORDS)))
+            for i in range(observations_per_student):
+                oid += 1
+                day = start + timedelta(days=rng.randint(0, 300))
+                observations.append((oid, student_id, day.isoformat(), rng.choice(AREAS),
+                                     " ".join(rng.choices(WORDS, k=40))))
+                skills.append((oid, rng.choice(SKILLS)))
+        conn.exec_driver_sql(
+            "INSERT INTO daily_entries (id, student_id, date, subject, skill_level, notes, user_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            entries,
+        )
+        conn.exec_driver_sql("INSERT INTO daily_activities (daily_entry_id, activity) VALUES (?, ?)", activities)
+        conn.exec_driver_sql(
+            "INSERT INTO observations (id, student_id, date, area, notes) VALUES (?, ?, ?, ?, ?)",
+            observations,
+        )
+        conn.exec_driver_sql("INSERT INTO observation_skills (observation_id, skill) VALUES (?, ?)", skills)
+    return {"users": users, "students": len(students), "daily_entries": len(entries),
+            "observations": len(observations)}
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    """Return the fastest of ``repeat`` timed calls to ``fn`` in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -1,10 +1,37 @@
 import streamlit as st
+import csv
+import io
+import zipfile
+from datetime import date, timedelta
 
-from src.monty.session import init_session_state, require_auth
+import pandas as pd
 
+from src.monty.analytics import skill_progression
+from src.monty.cache import cached_report, report_version
+from src.monty.crud import SKILL_LEVELS, list_weekly_rollup, student_report_data, term_report
+from src.monty.reporting import (
+    FORMATS,
+    download,
+    file_name,
+    mime_type,
+    render as render_document,
+    render_stream,
+    rewound,
+    spool_file,
+    write_member,
+)
+from src.monty.session import discard_temp_file, init_session_state, require_auth
+from src.monty.profiling import profiled_render
 
+# Weeks of rollup shown in a student's progress section and report
+PROGRESS_WEEKS = 12
+# Subjects without a level-up for this many days are flagged
+STALLED_DAYS = 30
+
+
+@profiled_render("Reports")
 def render():
-    init_session_state()
+    init_session_state("students")
     require_auth()
     
     st.set_page_config(page_title="Reports - Monty", page_icon="📊", layout="wide")
@@ -42,13 +69,22 @@ def render_sidebar():
 def render_main_content():
     st.title("📊 Reports")
     
-    col_list, col_preview = st.columns([1, 2])
+    tab1, tab2, tab3 = st.tabs(["📋 Student Reports", "📆 Term Reports", "📈 Skill Progression"])
+    
+    with tab1:
+        col_list, col_preview = st.columns([1, 2])
+        
+        with col_list:
+            render_student_list()
+        
+        with col_preview:
+            render_report_preview()
     
-    with col_list:
-        render_student_list()
+    with tab2:
+        render_term_reports()
     
-    with col_preview:
-        render_report_preview()
+    with tab3:
+        render_skill_progression()
 
 
 def render_student_list():
@@ -86,13 +122,18 @@ def render_report_preview():
         st.info("Select a student from the list to view their report.")
         return
     
-    student = next((s for s in st.session_state.students if s["id"] == st.session_state.selected_student_id), None)
+    user_id = st.session_state.user["db_id"]
+    student_id = st.session_state.selected_student_id
+    # Reselecting a student, or rerunning, is a cache hit until their data changes
+    preview = cached_report(user_id, student_id, "preview", lambda: build_preview(user_id, student_id))
     
-    if not student:
+    if preview is None:
         st.error("Student not found.")
         return
     
-    student_observations = [o for o in st.session_state.observations if o["student"] == student["name"]]
+    student = preview["student"]
+    student_observations = preview["observations"]
+    weekly = preview["weekly"]
     
     with st.container(border=True):
         st.markdown(f"## 📄 Progress Report")
@@ -120,6 +161,19 @@ def render_report_preview():
         
         st.markdown("---")
         
+        st.markdown(f"### 📈 Weekly Progress (last {PROGRESS_WEEKS} weeks)")
+        if weekly["weeks"]:
+            st.bar_chart(
+                {"Week": weekly["weeks"], **weekly["by_level"]},
+                x="Week", y=list(weekly["by_level"]), x_label="Week of", y_label="Sessions",
+            )
+            for subject, sessions in weekly["by_subject"].items():
+                st.write(f"📚 **{subject}:** {sessions} sessions")
+        else:
+            st.write("No daily entries in this period.")
+        
+        st.markdown("---")
+        
         st.markdown("### 👁️ Observations")
         if student_observations:
             for obs in student_observations:
@@ -132,55 +186,326 @@ def render_report_preview():
         
         st.markdown("---")
         
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
         
         with col1:
-            if st.button("Download Report", use_container_width=True):
-                report_content = generate_report(student, student_observations)
-                st.download_button(
-                    label="📥 Download PDF",
-                    data=report_content,
-                    file_name=f"report_{student['name'].replace(' ', '_')}.txt",
-                    mime="text/plain",
-                    use_container_width=True
-                )
+            report_format = st.selectbox("Format", list(FORMATS), format_func=str.capitalize,
+                                         label_visibility="collapsed")
         
         with col2:
+            st.download_button(
+                label="📥 Download Report",
+                data=lambda: report_file(user_id, preview, report_format),
+                file_name=file_name(f"report_{student['name'].replace(' ', '_')}", report_format),
+                mime=mime_type(report_format),
+                use_container_width=True,
+            )
+        
+        with col3:
             if st.button("Print Report", use_container_width=True):
                 st.info("Print functionality coming soon!")
 
 
-def generate_report(student, observations):
-    content = f"""
-PROGRESS REPORT
-===============
+def build_preview(user_id, student_id):
+    """Everything the report shows, read from the database so the shared cache never holds one tab's stale copy."""
+    # Read first: a write after this point moves the version on and the result is not cached
+    version = report_version(user_id)
+    data = student_report_data(user_id, student_id)
+    if data is None:
+        return None
+    return {
+        **data,
+        "weekly": weekly_progress(user_id, student_id),
+        # Downloads are cached against the data this preview showed
+        "version": version,
+    }
 
-Student: {student['name']}
-Age: {student['age']} years
-Parent: {student['parent_name']}
-Email: {student['parent_email']}
 
-INTERESTS
----------
-"""
-    for interest in student["interests"]:
-        content += f"- {interest}\n"
+def report_file(user_id, preview, report_format):
+    """The rendered report as bytes, cached per student, format and data version."""
+    return cached_report(
+        user_id, preview["student"]["id"], ("download", report_format, preview["version"]),
+        lambda: render_document(
+            "progress_report.j2", report_format, student=preview["student"], observations=preview["observations"],
+            weekly=preview["weekly"], weekly_weeks=PROGRESS_WEEKS,
+        ).encode("utf-8"),
+    )
+
+
+def weekly_progress(user_id, student_id):
+    """Sessions per week by skill level, and per subject, from the weekly rollup."""
+    today = date.today()
+    rollup = list_weekly_rollup(user_id, today - timedelta(weeks=PROGRESS_WEEKS - 1), today, student_id)
+    weeks = sorted({row["week_start"] for row in rollup})
+    by_level = {}
+    by_subject = {}
+    for row in rollup:
+        by_level.setdefault(row["skill_level"], dict.fromkeys(weeks, 0))[row["week_start"]] += row["sessions"]
+        by_subject[row["subject"]] = by_subject.get(row["subject"], 0) + row["sessions"]
+    return {
+        "weeks": weeks,
+        "by_level": {level: list(counts.values()) for level, counts in sorted(by_level.items())},
+        "by_subject": dict(sorted(by_subject.items(), key=lambda x: -x[1])),
+    }
+
+
+def render_term_reports():
+    st.subheader("📆 Term Reports")
     
-    content += "\nALLERGIES\n---------\n"
-    if student["allergies"]:
-        for allergy in student["allergies"]:
-            content += f"- {allergy}\n"
-    else:
-        content += "None reported\n"
+    today = date.today()
+    terms = school_terms(today)
+    current = next((i for i, (start, end) in enumerate(terms.values()) if start <= today <= end), 0)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        period = st.selectbox("Period", [*terms, "Custom"], index=current)
+    
+    with col2:
+        if period == "Custom":
+            picked = st.date_input("Dates", (today - timedelta(days=90), today), max_value=today)
+            if len(picked) != 2:
+                st.info("Pick the last day of the period.")
+                return
+            start, end = picked
+            label = "Progress"
+        else:
+            start, end = terms[period]
+            label = period
+        fmt = st.selectbox("Download format", list(FORMATS), format_func=str.capitalize, key="term_format")
+    
+    # Months that have not happened yet would only add empty columns
+    end = min(end, today)
+    if start > end:
+        st.info(f"{period} has not started yet.")
+        return
+    
+    user_id = st.session_state.user["db_id"]
+    report = cached_report(user_id, None, ("term", start, end), lambda: term_report(user_id, start, end))
+    
+    if not report["students"]:
+        st.info("No students found.")
+        return
+    
+    term = {"label": label, "start": report["start"], "end": report["end"], "months": report["months"]}
+    
+    st.write(f"**Class summary, {start.strftime('%b %d, %Y')} - {end.strftime('%b %d, %Y')}**")
+    st.dataframe(term_summary_rows(report), hide_index=True, use_container_width=True)
+    
+    st.markdown("---")
+    
+    render_term_student(report, term, fmt)
+    
+    st.markdown("---")
+    
+    render_term_batch(report, term, fmt)
+
+
+def render_term_student(report, term, fmt):
+    student_id = st.selectbox("Student", list(report["students"]),
+                              format_func=lambda sid: report["students"][sid]["student"], key="term_student")
+    student_report = report["students"][student_id]
+    student = st.session_state.students.get(student_id)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Observations", student_report["observations"])
+    with col2:
+        st.metric("Skills Observed", len(student_report["skills"]))
+    with col3:
+        st.metric("Work Sessions", student_report["sessions"])
+    with col4:
+        st.metric("Subjects Covered", f"{len(student_report['subjects'])} / {len(report['subjects'])}")
+    
+    col_areas, col_levels = st.columns(2)
+    
+    with col_areas:
+        st.write("**Observations by Area**")
+        if student_report["areas"]:
+            st.bar_chart({"Area": list(student_report["areas"]), "Observations": list(student_report["areas"].values())},
+                         x="Area", y="Observations")
+        else:
+            st.caption("No observations in this period.")
+    
+    with col_levels:
+        st.write("**Skill Level by Month**")
+        if student_report["levels_by_month"]:
+            st.bar_chart({"Month": term["months"], **student_report["levels_by_month"]},
+                         x="Month", y=list(student_report["levels_by_month"]), y_label="Sessions")
+        else:
+            st.caption("No daily entries in this period.")
     
-    content += "\nOBSERVATIONS\n------------\n"
-    for obs in observations:
-        content += f"\nDate: {obs['date']}\n"
-        content += f"Area: {obs['area']}\n"
-        content += f"Skills: {', '.join(obs.get('skills', []))}\n"
-        content += f"Notes: {obs['notes']}\n"
+    col_skills, col_subjects = st.columns(2)
     
-    return content
+    with col_skills:
+        st.write("**Skills Observed**")
+        if student_report["skills"]:
+            st.dataframe(student_report["skills"], hide_index=True, use_container_width=True)
+        else:
+            st.caption("No skills recorded in this period.")
+    
+    with col_subjects:
+        st.write("**Subject Coverage**")
+        if student_report["subjects"]:
+            st.dataframe(student_report["subjects"], hide_index=True, use_container_width=True)
+        if student_report["subjects_missing"]:
+            st.caption(f"Not yet worked on: {', '.join(student_report['subjects_missing'])}")
+    
+    st.download_button(
+        f"📥 Download {student_report['student']}'s Report ({fmt.capitalize()})",
+        download("term_report.j2", fmt, term=term, report=student_report, student=student),
+        file_name=file_name(term_report_stem(student_report["student"], term), fmt),
+        mime=mime_type(fmt),
+    )
+
+
+def render_term_batch(report, term, fmt):
+    st.write("**Term reports for every student, in one zip**")
+    
+    archive_name = f"{term_report_stem('class', term)}_{fmt}.zip"
+    
+    if st.button("📦 Build All Term Reports", use_container_width=True):
+        progress = st.progress(0.0, text="Writing reports...")
+        
+        def on_progress(done, total, student_name):
+            progress.progress(done / total, text=f"Wrote {done} of {total}: {student_name}")
+        
+        # Spooled to disk past SPOOL_MAX_BYTES instead of kept in session state as bytes
+        file = spool_file()
+        written = write_term_report_archive(file, report, term, st.session_state.students, fmt, on_progress)
+        progress.empty()
+        size = file.tell()
+        discard_temp_file("term_report_archive")
+        st.session_state.term_report_archive = {
+            "name": archive_name, "file": rewound(file), "size": size, "written": written,
+        }
+    
+    archive = st.session_state.get("term_report_archive")
+    if not archive or archive["name"] != archive_name:
+        return
+    
+    st.success(f"Built {archive['written']} term reports ({archive['size'] / 1024:.0f} KB)")
+    file = archive["file"]
+    st.download_button("📥 Download All Term Reports (Zip)", lambda: file,
+                       file_name=archive["name"], mime="application/zip")
+
+
+def render_skill_progression():
+    st.subheader("📈 Skill Progression")
+    
+    progression = skill_progression(st.session_state.user["db_id"])
+    summary = progression["summary"]
+    
+    if summary.empty:
+        st.info("No daily entries recorded yet.")
+        return
+    
+    st.caption(f"Levels run from 1 ({SKILL_LEVELS[0]}) to {len(SKILL_LEVELS)} ({SKILL_LEVELS[-1]}). "
+               f"Rolling averages cover a student's last {progression['window']} sessions in a subject.")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("**Current Level by Subject**")
+        st.bar_chart(progression["distribution"], y_label="Students")
+    
+    with col2:
+        st.write("**Class Sessions by Level per Month**")
+        st.bar_chart(progression["monthly"], y_label="Sessions")
+    
+    st.markdown("---")
+    
+    students = dict(zip(summary["student_id"], summary["student"]))
+    student_id = st.selectbox("Student", list(students), format_func=students.get, key="progression_student")
+    sessions = progression["sessions"]
+    
+    st.write(f"**{students[student_id]}: rolling level by subject**")
+    st.line_chart(sessions[sessions["student_id"] == student_id], x="date", y="rolling", color="subject",
+                  x_label="Date", y_label="Level")
+    st.dataframe(progress_rows(summary[summary["student_id"] == student_id]), hide_index=True,
+                 use_container_width=True)
+    
+    st.markdown("---")
+    
+    st.write(f"**⏳ No level-up in the last {STALLED_DAYS} days**")
+    stalled = summary[
+        (summary["current_level"] < len(SKILL_LEVELS))
+        & ~(summary["days_since_level_up"] <= STALLED_DAYS)
+    ]
+    if stalled.empty:
+        st.caption("Every student has moved up recently in each subject they are working on.")
+    else:
+        st.dataframe(progress_rows(stalled, with_student=True), hide_index=True, use_container_width=True)
+
+
+def progress_rows(summary, with_student=False):
+    rows = pd.DataFrame({
+        "Subject": summary["subject"],
+        "Sessions": summary["sessions"],
+        "Started At": [SKILL_LEVELS[level - 1] for level in summary["first_level"]],
+        "Now At": [SKILL_LEVELS[level - 1] for level in summary["current_level"]],
+        "Rolling Level": summary["rolling"].round(2),
+        "Last Level-Up": summary["last_level_up"].dt.date,
+        "Days Since": summary["days_since_level_up"],
+    })
+    if with_student:
+        rows.insert(0, "Student", summary["student"])
+    return rows
+
+
+def school_terms(today):
+    """Term presets for the school year containing ``today``, which starts in September."""
+    year = today.year if today.month >= 9 else today.year - 1
+    return {
+        f"Autumn Term {year}": (date(year, 9, 1), date(year, 12, 31)),
+        f"Spring Term {year + 1}": (date(year + 1, 1, 1), date(year + 1, 3, 31)),
+        f"Summer Term {year + 1}": (date(year + 1, 4, 1), date(year + 1, 8, 31)),
+        f"School Year {year}-{(year + 1) % 100:02d}": (date(year, 9, 1), date(year + 1, 8, 31)),
+    }
+
+
+def term_summary_rows(report):
+    class_subjects = len(report["subjects"])
+    return [
+        {
+            "Student": r["student"],
+            "Observations": r["observations"],
+            "Areas": len(r["areas"]),
+            "Skills": len(r["skills"]),
+            "Sessions": r["sessions"],
+            "Subjects": f"{len(r['subjects'])} / {class_subjects}",
+            # Latest month with sessions, on the 1 (Emerging) to 4 (Advanced) scale
+            "Level": next((score for score in reversed(r["monthly"]["level_score"]) if score is not None), None),
+        }
+        for r in report["students"].values()
+    ]
+
+
+def term_report_stem(name, term):
+    return f"term_report_{name.lower().replace(' ', '_')}_{term['start'].replace('-', '')}"
+
+
+def write_term_report_archive(file, report, term, students, fmt, on_progress=None):
+    """Write every student's term report and a class summary CSV into a zip; returns how many reports were written.
+
+    All figures come from the one ``term_report`` result, and each document
+    is compressed into ``file`` chunk by chunk as its template renders.
+    """
+    total = len(report["students"])
+    with zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for done, (student_id, student_report) in enumerate(report["students"].items(), start=1):
+            write_member(archive, file_name(term_report_stem(student_report["student"], term), fmt), render_stream(
+                "term_report.j2", fmt, term=term, report=student_report, student=students.get(student_id)
+            ))
+            if on_progress:
+                on_progress(done, total, student_report["student"])
+        summary = io.StringIO()
+        rows = term_summary_rows(report)
+        writer = csv.DictWriter(summary, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+        archive.writestr(f"{term_report_stem('class_summary', term)}.csv", summary.getvalue())
+    return total
 
 
 render()
@@ -0,0 +1,160 @@
+"""Skill-progression analytics over a classroom's daily entries.
+
+``DailyEntry.skill_level`` is an ordinal (``crud.SKILL_LEVELS``, Emerging = 1
+to Advanced = 4). ``skill_progression`` loads every entry of a user with one
+query into columnar NumPy arrays sorted by (student, subject, date), so each
+student/subject trajectory is a contiguous run. Everything is then computed
+per run with array operations instead of Python loops over entries:
+rolling averages use a cumulative sum, level-ups compare each entry with the
+one before it, and per-run figures are ``reduceat`` calls over the run
+starts.
+
+Results are kept in the report cache, so they are rebuilt only when a
+student or daily entry of the user changes. The returned DataFrames are
+shared between sessions and must be treated as read-only.
+"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import String, cast, select
+
+from src.monty.cache import cached_report
+from src.monty.crud import SKILL_LEVELS
+from src.monty.database import get_session
+from src.monty.models import DailyEntry, Student
+from src.monty.profiling import instrument_module
+
+# Sessions in each rolling average
+ROLLING_WINDOW = 5
+
+
+def load_entries(user_id: int) -> dict[str, np.ndarray]:
+    """The user's daily entries as column arrays, sorted by student, subject and date.
+
+    Levels are 1-4 by position in SKILL_LEVELS; entries with any other level
+    are left out. Subjects are integer codes into the sorted "subjects" array
+    and "student_name" maps student ids to names.
+    """
+    session = get_session()
+    try:
+        # Dates come back as ISO strings, which NumPy parses far faster than
+        # the driver builds date objects; names are fetched once per student
+        rows = session.execute(
+            select(DailyEntry.student_id, DailyEntry.subject, cast(DailyEntry.date, String), DailyEntry.skill_level)
+            .where(DailyEntry.user_id == user_id, DailyEntry.skill_level.in_(SKILL_LEVELS))
+            .order_by(DailyEntry.student_id, DailyEntry.subject, DailyEntry.date)
+        ).all()
+        names = dict(session.execute(select(Student.id, Student.name).where(Student.user_id == user_id)).all())
+    finally:
+        session.close()
+
+    student_ids, subjects, dates, levels = zip(*rows) if rows else ((), (), (), ())
+    subjects = pd.Categorical(subjects)
+    return {
+        "student_id": np.array(student_ids, dtype=np.int64),
+        "student_name": names,
+        "subject": subjects.codes.astype(np.int32),
+        "subjects": subjects.categories.to_numpy(dtype=object),
+        "date": np.array(dates, dtype="datetime64[D]"),
+        "level": pd.Categorical(levels, categories=SKILL_LEVELS).codes.astype(np.int8) + 1,
+    }
+
+
+def rolling_mean(values: np.ndarray, starts: np.ndarray, run: np.ndarray, window: int) -> np.ndarray:
+    """Mean of each value and up to ``window - 1`` before it, never reaching back past its run's start."""
+    totals = np.concatenate(([0], np.cumsum(values, dtype=np.int64)))
+    positions = np.arange(len(values))
+    first = np.maximum(positions - window + 1, starts[run])
+    return (totals[positions + 1] - totals[first]) / (positions + 1 - first)
+
+
+def compute_progression(entries: dict[str, np.ndarray], today: date, window: int = ROLLING_WINDOW) -> dict:
+    """Trajectories, per-run summaries and class distributions from ``load_entries`` arrays."""
+    student_ids, subjects, dates, levels = entries["student_id"], entries["subject"], entries["date"], entries["level"]
+    n = len(levels)
+
+    # A run starts wherever the (student, subject) pair changes
+    new_run = np.ones(n, dtype=bool)
+    new_run[1:] = (student_ids[1:] != student_ids[:-1]) | (subjects[1:] != subjects[:-1])
+    starts = np.flatnonzero(new_run)
+    ends = np.append(starts[1:], n)[:len(starts)] - 1
+    run = np.cumsum(new_run) - 1
+
+    rolling = rolling_mean(levels, starts, run, window)
+
+    level_up = np.zeros(n, dtype=bool)
+    level_up[1:] = levels[1:] > levels[:-1]
+    level_up &= ~new_run
+    last_up = np.maximum.reduceat(np.where(level_up, np.arange(n), -1), starts)
+    has_up = last_up >= 0
+    last_up_date = np.where(has_up, dates[np.maximum(last_up, 0)], np.datetime64("NaT"))
+    days_since = np.where(has_up, (np.datetime64(today, "D") - last_up_date).astype(np.int64), np.nan)
+
+    names = entries["student_name"]
+    subject_names = entries["subjects"]
+    run_students = student_ids[starts]
+    run_names = [names[sid] for sid in run_students.tolist()]
+
+    sessions = pd.DataFrame({
+        "student_id": student_ids,
+        "student": [names[sid] for sid in student_ids.tolist()],
+        "subject": subject_names[subjects],
+        "date": dates,
+        "level": levels,
+        "rolling": rolling,
+    })
+    summary = pd.DataFrame({
+        "student_id": run_students,
+        "student": run_names,
+        "subject": subject_names[subjects[starts]],
+        "sessions": ends - starts + 1,
+        "first_level": levels[starts],
+        "current_level": levels[ends],
+        "change": levels[ends].astype(np.int16) - levels[starts],
+        "average": np.add.reduceat(levels.astype(np.int64), starts) / (ends - starts + 1),
+        "rolling": rolling[ends],
+        "last_date": dates[ends],
+        "last_level_up": last_up_date,
+        "days_since_level_up": days_since,
+    })
+
+    # Latest level of every student in every subject, counted per subject
+    distribution = np.zeros((len(subject_names), len(SKILL_LEVELS)), dtype=np.int64)
+    np.add.at(distribution, (subjects[ends], levels[ends] - 1), 1)
+
+    # Every session of the class, counted per month and level
+    months, month_codes = np.unique(dates.astype("datetime64[M]"), return_inverse=True)
+    monthly = np.bincount(
+        month_codes * len(SKILL_LEVELS) + levels - 1, minlength=len(months) * len(SKILL_LEVELS)
+    ).reshape(len(months), len(SKILL_LEVELS))
+
+    return {
+        "window": window,
+        "sessions": sessions,
+        "summary": summary,
+        "distribution": pd.DataFrame(distribution, index=pd.Index(subject_names, name="subject"),
+                                     columns=list(SKILL_LEVELS)),
+        "monthly": pd.DataFrame(monthly, index=pd.Index(months.astype(str), name="month"),
+                                columns=list(SKILL_LEVELS)),
+    }
+
+
+def skill_progression(user_id: int, today: date | None = None, window: int = ROLLING_WINDOW) -> dict:
+    """Skill progression for the user's classroom, cached until their entries or students change.
+
+    Returns {"window", "sessions" (one row per entry with its rolling
+    average), "summary" (one row per student and subject: sessions,
+    first/current level, change, average, rolling, last level-up and days
+    since), "distribution" (subjects x levels, students at each current
+    level), "monthly" (months x levels, sessions)}.
+    """
+    today = today or date.today()
+    return cached_report(
+        user_id, None, ("progression", today, window),
+        lambda: compute_progression(load_entries(user_id), today, window),
+    )
+
+
+instrument_module(globals(), __name__)
@@ -0,0 +1,174 @@
+"""In-process write batching for append-only event rows.
+
+Recording an event on every click would cost one transaction per click.
+An ``EventBuffer`` collects rows in memory and hands them to its ``writer``
+in one call once ``max_size`` rows are pending or the oldest pending row is
+``max_age`` seconds old (checked as rows arrive). Readers that need every
+event call ``flush()`` first, and pending rows are flushed when the process
+exits. A hard crash loses at most the unflushed batch.
+
+``GroupCommitWriter`` batches in the other direction: many sessions each
+waiting on their own write share one transaction, committed by a single
+writer thread, instead of queueing on SQLite's write lock one commit at a
+time.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+MAX_SIZE = 100
+MAX_AGE_SECONDS = 5.0
+
+# GroupCommitWriter: how long to wait for more commands after the first, and the group cap
+GROUP_WINDOW_SECONDS = 0.002
+MAX_GROUP = 64
+
+
+class EventBuffer:
+    """Thread-safe buffer that writes rows in batches through ``writer(rows)``."""
+
+    def __init__(self, writer, max_size: int = MAX_SIZE, max_age: float = MAX_AGE_SECONDS):
+        self.writer = writer
+        self.max_size = max_size
+        self.max_age = max_age
+        self._pending: list = []
+        self._oldest: float | None = None
+        self._lock = threading.Lock()
+        # Serialises writer calls so batches reach the database in order
+        self._flush_lock = threading.Lock()
+        self.flushes = 0
+        atexit.register(self.flush)
+
+    def record(self, row):
+        now = time.monotonic()
+        with self._lock:
+            self._pending.append(row)
+            if self._oldest is None:
+                self._oldest = now
+            due = len(self._pending) >= self.max_size or now - self._oldest >= self.max_age
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every pending row now; returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending, self._oldest = self._pending, [], None
+            if not batch:
+                return 0
+            try:
+                self.writer(batch)
+            except Exception:
+                # Put the batch back in front of anything recorded meanwhile
+                with self._lock:
+                    self._pending[:0] = batch
+                    self._oldest = time.monotonic()
+                raise
+            self.flushes += 1
+            return len(batch)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+
+class GroupCommitWriter:
+    """One background thread that runs write commands from every session in shared transactions.
+
+    ``submit(command)`` queues ``command(session)`` and returns a Future. The
+    thread takes the first waiting command, gathers whatever else arrives
+    within ``window`` seconds (up to ``max_batch`` commands), runs each in
+    its own SAVEPOINT on a single session and commits once. A command that
+    raises rolls back only its savepoint and fails only its own future; if
+    the commit itself fails, every future in the group gets that error.
+    Futures resolve after the commit, so a result is never reported for a
+    write that did not reach the database.
+    """
+
+    def __init__(self, session_factory, window: float = GROUP_WINDOW_SECONDS, max_batch: int = MAX_GROUP):
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._closed = False
+        self.commits = 0
+        self.commands = 0
+        self._thread = threading.Thread(target=self._run, name="monty-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, command) -> Future:
+        if self._closed:
+            raise RuntimeError("GroupCommitWriter is closed")
+        future: Future = Future()
+        self._queue.put((future, command))
+        return future
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self):
+        """Finish every queued command, then stop the thread."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            group = [item]
+            deadline = time.monotonic() + self.window
+            stop = False
+            while len(group) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                group.append(item)
+            self._commit_group(group)
+            if stop:
+                return
+
+    def _commit_group(self, group):
+        session = self.session_factory()
+        done = []
+        try:
+            if session.get_bind().dialect.name == "sqlite":
+                # pysqlite would only BEGIN at the first INSERT, and a SAVEPOINT
+                # outside a transaction commits on RELEASE; open it ourselves,
+                # taking the write lock up front
+                session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            for future, command in group:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with session.begin_nested():
+                        result = command(session)
+                except Exception as exc:
+                    future.set_exception(exc)
+                else:
+                    done.append((future, result))
+            session.commit()
+        except Exception as exc:
+            session.rollback()
+            for future, _ in group:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        finally:
+            session.close()
+        self.commits += 1
+        self.commands += len(done)
+        for future, result in done:
+            future.set_result(result)
@@ -0,0 +1,173 @@
+"""Process-wide read cache shared by every Streamlit session.
+
+Streamlit gives each browser tab its own ``st.session_state``, so without this
+cache every tab re-runs the same ``crud.list_*`` queries and keeps a private
+copy of the results. Entries are keyed by ``(user_id, data version, name,
+args)``; crud write functions call ``bump_version(user_id)`` after committing,
+which makes every older entry for that user unreachable. Cached values are
+shared between sessions and must be treated as read-only.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+MAX_ENTRIES = 512
+TTL_SECONDS = 300.0
+REPORT_MAX_ENTRIES = 256
+REPORT_TTL_SECONDS = 3600.0
+
+
+class ReadCache:
+    """Thread-safe LRU cache with a TTL and a per-user version counter."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl_seconds: float = TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._versions: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def version(self, user_id: int) -> int:
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def bump(self, user_id: int) -> int:
+        """Invalidate everything cached for ``user_id`` and return the new version."""
+        with self._lock:
+            new_version = self._versions.get(user_id, 0) + 1
+            self._versions[user_id] = new_version
+            for key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[key]
+            return new_version
+
+    def get_or_load(self, user_id: int, key: tuple, loader):
+        now = time.monotonic()
+        with self._lock:
+            version = self._versions.get(user_id, 0)
+            full_key = (user_id, version, *key)
+            entry = self._entries.get(full_key)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[full_key]
+                self.evictions += 1
+            self.misses += 1
+
+        # Load outside the lock so one slow query does not block other users.
+        value = loader()
+
+        with self._lock:
+            # A write during the load moved the version on; serve the value
+            # to this caller but do not cache it under the stale key.
+            if self._versions.get(user_id, 0) == version:
+                self._entries[full_key] = (time.monotonic(), value)
+                self._entries.move_to_end(full_key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class PerUserCache:
+    """One value per user, kept until ``invalidate(user_id)`` is called.
+
+    Unlike ``ReadCache`` it ignores the data version, so writes to unrelated
+    tables do not throw it away; its owner invalidates it explicitly.
+    """
+
+    def __init__(self):
+        self._values: dict[int, object] = {}
+        self._generations: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, user_id: int, loader):
+        with self._lock:
+            if user_id in self._values:
+                return self._values[user_id]
+            generation = self._generations.get(user_id, 0)
+        value = loader()
+        with self._lock:
+            if self._generations.get(user_id, 0) == generation:
+                self._values[user_id] = value
+        return value
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self._values.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            for user_id in self._values:
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self._values.clear()
+
+
+read_cache = ReadCache()
+
+# Rendered report previews and downloads. Reports only read students,
+# observations and daily entries, so this cache has its own version, moved
+# by writes to those tables alone (bump_version(..., reports=True)); using a
+# material or editing the schedule leaves every report cached.
+report_cache = ReadCache(max_entries=REPORT_MAX_ENTRIES, ttl_seconds=REPORT_TTL_SECONDS)
+
+# Student name -> id for each user; crud's student writes invalidate it
+student_ids = PerUserCache()
+
+
+def bump_version(user_id: int, reports: bool = False) -> int:
+    """Invalidate the user's cached reads; ``reports=True`` for writes that change report inputs."""
+    if reports:
+        report_cache.bump(user_id)
+    return read_cache.bump(user_id)
+
+
+def data_version(user_id: int) -> int:
+    return read_cache.version(user_id)
+
+
+def report_version(user_id: int) -> int:
+    return report_cache.version(user_id)
+
+
+def cached_report(user_id: int, student_id: int, kind, loader):
+    """``loader()``'s result for (student_id, kind) at the user's current report data version."""
+    return report_cache.get_or_load(user_id, (student_id, kind), loader)
+
+
+def cached_read(name: str):
+    """Serve ``fn(user_id, *args, **kwargs)`` from the shared cache under ``name``.
+
+    Arguments become part of the key, so they must be hashable. The
+    undecorated function stays reachable as ``fn.__wrapped__``.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(user_id: int, *args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            return read_cache.get_or_load(user_id, key, lambda: fn(user_id, *args, **kwargs))
+        return wrapper
+    return decorator
@@ -1,14 +1,24 @@
 """Data access layer — converts between ORM models and the dict format used by pages."""
 
-from datetime import date as date_type
-
-from sqlalchemy.orm import Session
-
-from src.monty.database import get_session
+from collections import Counter
+from datetime import date as date_type, datetime, timedelta
+
+from sqlalchemy import case, delete, func, insert, or_, select, text, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session, contains_eager, joinedload, raiseload, selectinload
+
+from src.monty.batching import EventBuffer
+from src.monty.cache import bump_version, cached_read, student_ids
+from src.monty.database import get_session, get_writer
+from src.monty.profiling import instrument_module
+from src.monty.search import TRIGRAM_MIN_LENGTH, fts_phrase, fts_query
 from src.monty.models import (
     DailyActivity,
     DailyEntry,
     Material,
+    MaterialUsageDaily,
+    MaterialUsageEvent,
     Observation,
     ObservationSkill,
     Schedule,
@@ -17,6 +27,7 @@ from src.monty.models import (
     StudentInterest,
     User,
     UserSettings,
+    WeeklySkillRollup,
 )
 
 
@@ -24,6 +35,47 @@ from src.monty.models import (
 # Helpers
 # ---------------------------------------------------------------------------
 
+# Statements issued by each list_* call regardless of row count (selectinload
+# batches its IN lists, so very large collections add one query per 500 parents).
+# The list queries end with raiseload("*"), so any relationship the _*_to_dict
+# helpers touch without eager loading raises instead of silently going N+1.
+LIST_QUERY_COUNTS = {
+    "students": 3,
+    "observations": 2,
+    "schedule": 1,
+    "materials": 1,
+    "daily_entries": 2,
+}
+
+
+def _write(command):
+    """Run ``command(session)`` in a transaction, commit, and return its result.
+
+    With MONTY_WRITE_QUEUE on, the command goes to the group-commit writer
+    thread and shares a commit with whatever other sessions submitted in the
+    same window; the call still blocks until that commit has happened.
+    Every crud write goes through here. Commands must flush whatever they
+    need checked (so constraint errors raise inside them), build their
+    return value before returning (the session is gone afterwards) and must
+    not call ``_write`` themselves.
+    """
+    writer = get_writer()
+    # atexit closes the writer before buffers registered earlier flush their
+    # last rows (handlers run in reverse), so those rows are written directly
+    if writer is not None and not writer.closed:
+        return writer.submit(command).result()
+    session = get_session()
+    try:
+        result = command(session)
+        session.commit()
+        return result
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
 def _student_to_dict(s: Student) -> dict:
     return {
         "id": s.id,
@@ -86,44 +138,94 @@ def _daily_entry_to_dict(e: DailyEntry) -> dict:
 # Students
 # ---------------------------------------------------------------------------
 
-def list_students(user_id: int) -> list[dict]:
+@cached_read("students")
+def list_students(user_id: int) -> tuple[dict, ...]:
     session = get_session()
     try:
-        students = session.query(Student).filter_by(user_id=user_id).all()
-        return [_student_to_dict(s) for s in students]
+        students = (
+            session.query(Student)
+            .filter_by(user_id=user_id)
+            .options(
+                selectinload(Student.interests),
+                selectinload(Student.allergies),
+                raiseload("*"),
+            )
+            .order_by(Student.id)
+            .all()
+        )
+        return tuple(_student_to_dict(s) for s in students)
     finally:
         session.close()
 
 
-def create_student(user_id: int, data: dict) -> dict:
+@cached_read("students_page")
+def page_students(
+    user_id: int,
+    search: str = "",
+    age: int | None = None,
+    interest: str | None = None,
+    after: int | None = None,
+    limit: int = 20,
+) -> dict:
+    """One page of the user's students in id order, filtered in SQL.
+
+    Pass the previous page's ``next_cursor`` as ``after`` to continue.
+    Returns {"items": (...), "next_cursor": id or None, "total": n}.
+    """
     session = get_session()
     try:
+        query = session.query(Student).filter(Student.user_id == user_id)
+        if search:
+            query = query.filter(Student.name.ilike(f"%{search}%"))
+        if age is not None:
+            query = query.filter(Student.age == age)
+        if interest is not None:
+            query = query.filter(Student.interests.any(StudentInterest.interest == interest))
+        total = query.count()
+        if after is not None:
+            query = query.filter(Student.id > after)
+        students = (
+            query.options(
+                selectinload(Student.interests),
+                selectinload(Student.allergies),
+                raiseload("*"),
+            )
+            .order_by(Student.id)
+            .limit(limit + 1)
+            .all()
+        )
+        next_cursor = students[limit - 1].id if len(students) > limit else None
+        return {"items": tuple(_student_to_dict(s) for s in students[:limit]), "next_cursor": next_cursor, "total": total}
+    finally:
+        session.close()
+
+
+def create_student(user_id: int, data: dict) -> dict:
+    def command(session):
         student = Student(
             name=data["name"],
             age=data["age"],
             parent_name=data.get("parent_name", ""),
             parent_email=data.get("parent_email", ""),
             user_id=user_id,
+            interests=[StudentInterest(interest=interest) for interest in data.get("interests", [])],
+            allergies=[StudentAllergy(allergy=allergy) for allergy in data.get("allergies", [])],
         )
         session.add(student)
         session.flush()
-        for interest in data.get("interests", []):
-            session.add(StudentInterest(student_id=student.id, interest=interest))
-        for allergy in data.get("allergies", []):
-            session.add(StudentAllergy(student_id=student.id, allergy=allergy))
-        session.commit()
-        result = _student_to_dict(student)
-        return result
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
+        return _student_to_dict(student)
+
+    try:
+        created = _write(command)
+    except IntegrityError as exc:
+        raise ValueError(f"A student named '{data['name']}' already exists") from exc
+    bump_version(user_id, reports=True)
+    student_ids.invalidate(user_id)
+    return created
 
 
 def update_student(student_id: int, data: dict) -> dict:
-    session = get_session()
-    try:
+    def command(session):
         student = session.query(Student).get(student_id)
         if not student:
             raise ValueError(f"Student {student_id} not found")
@@ -139,130 +241,348 @@ def update_student(student_id: int, data: dict) -> dict:
         session.query(StudentAllergy).filter_by(student_id=student.id).delete()
         for allergy in data.get("allergies", []):
             session.add(StudentAllergy(student_id=student.id, allergy=allergy))
-        session.commit()
+        session.flush()
         session.refresh(student)
-        return _student_to_dict(student)
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
+        return _student_to_dict(student), student.user_id
+
+    try:
+        updated, user_id = _write(command)
+    except IntegrityError as exc:
+        raise ValueError(f"A student named '{data['name']}' already exists") from exc
+    bump_version(user_id, reports=True)
+    student_ids.invalidate(user_id)
+    return updated
 
 
-def delete_student(student_id: int):
+def delete_student(student_id: int) -> dict | None:
+    # Write pending usage events first so they are detached below
+    material_usage.flush()
+
+    def command(session):
+        student = session.query(Student).get(student_id)
+        if not student:
+            return None, None
+        deleted = _student_to_dict(student)
+        # Keep the student's usage events, unattributed (ON DELETE SET NULL where enforced)
+        session.query(MaterialUsageEvent).filter_by(student_id=student_id).update({"student_id": None})
+        session.query(WeeklySkillRollup).filter_by(student_id=student_id).delete()
+        session.delete(student)
+        session.flush()
+        return deleted, student.user_id
+
+    deleted, user_id = _write(command)
+    if deleted is not None:
+        bump_version(user_id, reports=True)
+        student_ids.invalidate(user_id)
+    return deleted
+
+
+def student_ids_by_name(user_id: int) -> dict[str, int]:
+    """The user's student names mapped to ids, kept until a student is created, updated or deleted."""
+    return student_ids.get_or_load(user_id, lambda: _load_student_ids(user_id))
+
+
+def _load_student_ids(user_id: int) -> dict[str, int]:
     session = get_session()
     try:
-        student = session.query(Student).get(student_id)
-        if student:
-            session.delete(student)
-            session.commit()
-    except Exception:
-        session.rollback()
-        raise
+        return dict(session.execute(select(Student.name, Student.id).where(Student.user_id == user_id)).all())
     finally:
         session.close()
 
 
+def _match_student(ids: dict[str, int], data: dict) -> int | None:
+    if data.get("student_id") is not None:
+        return data["student_id"] if data["student_id"] in ids.values() else None
+    return ids.get(data.get("student"))
+
+
+def _student_id_for(user_id: int, data: dict) -> int:
+    """Resolve the student a write refers to: ``data["student_id"]`` if given, else ``data["student"]`` by name."""
+    student_id = _match_student(student_ids_by_name(user_id), data)
+    if student_id is None:
+        # The student may have been added by another process since the map was built
+        student_ids.invalidate(user_id)
+        student_id = _match_student(student_ids_by_name(user_id), data)
+    if student_id is None:
+        raise ValueError(f"Student '{data.get('student_id') or data.get('student')}' not found")
+    return student_id
+
+
 # ---------------------------------------------------------------------------
 # Observations
 # ---------------------------------------------------------------------------
 
-def list_observations(user_id: int) -> list[dict]:
+@cached_read("observations")
+def list_observations(user_id: int) -> tuple[dict, ...]:
     session = get_session()
     try:
         observations = (
             session.query(Observation)
             .join(Student)
             .filter(Student.user_id == user_id)
+            .options(
+                contains_eager(Observation.student),
+                selectinload(Observation.skills),
+                raiseload("*"),
+            )
+            .order_by(Observation.id)
             .all()
         )
-        return [_observation_to_dict(o) for o in observations]
+        return tuple(_observation_to_dict(o) for o in observations)
     finally:
         session.close()
 
 
-def create_observation(user_id: int, data: dict) -> dict:
+def student_report_data(user_id: int, student_id: int) -> dict | None:
+    """The student and their observations (oldest first) straight from the database, or None if not the user's.
+
+    Report builders cache what they make from this in the shared report
+    cache, so it must not depend on any one session's copy of the data.
+    """
     session = get_session()
     try:
-        student = session.query(Student).filter_by(name=data["student"], user_id=user_id).first()
-        if not student:
-            raise ValueError(f"Student '{data['student']}' not found")
+        student = (
+            session.query(Student)
+            .filter_by(id=student_id, user_id=user_id)
+            .options(selectinload(Student.interests), selectinload(Student.allergies), raiseload("*"))
+            .one_or_none()
+        )
+        if student is None:
+            return None
+        observations = (
+            session.query(Observation)
+            .join(Student)
+            .filter(Observation.student_id == student_id)
+            .options(contains_eager(Observation.student), selectinload(Observation.skills), raiseload("*"))
+            .order_by(Observation.id)
+            .all()
+        )
+        return {
+            "student": _student_to_dict(student),
+            "observations": tuple(_observation_to_dict(o) for o in observations),
+        }
+    finally:
+        session.close()
+
+
+@cached_read("observations_page")
+def page_observations(
+    user_id: int,
+    student_id: int | None = None,
+    area: str | None = None,
+    before: tuple[str, int] | None = None,
+    limit: int = 20,
+) -> dict:
+    """One page of the user's observations, newest first (date, then id).
+
+    Pass the previous page's ``next_cursor`` — a (date ISO string, id) pair —
+    as ``before`` to continue. Returns {"items": (...), "next_cursor": cursor
+    or None, "total": n}.
+    """
+    session = get_session()
+    try:
+        query = session.query(Observation).join(Student).filter(Student.user_id == user_id)
+        if student_id is not None:
+            query = query.filter(Observation.student_id == student_id)
+        if area is not None:
+            query = query.filter(Observation.area == area)
+        total = query.count()
+        if before is not None:
+            query = query.filter(
+                tuple_(Observation.date, Observation.id) < (date_type.fromisoformat(before[0]), before[1])
+            )
+        observations = (
+            query.options(
+                contains_eager(Observation.student),
+                selectinload(Observation.skills),
+                raiseload("*"),
+            )
+            .order_by(Observation.date.desc(), Observation.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+        next_cursor = None
+        if len(observations) > limit:
+            last = observations[limit - 1]
+            next_cursor = (last.date.isoformat(), last.id)
+        return {"items": tuple(_observation_to_dict(o) for o in observations[:limit]), "next_cursor": next_cursor, "total": total}
+    finally:
+        session.close()
+
+
+def list_observations_by_ids(user_id: int, observation_ids: list[int]) -> list[dict]:
+    """Fetch the given observations in the order of ``observation_ids``."""
+    if not observation_ids:
+        return []
+    session = get_session()
+    try:
+        observations = (
+            session.query(Observation)
+            .join(Student)
+            .filter(Student.user_id == user_id, Observation.id.in_(observation_ids))
+            .options(
+                contains_eager(Observation.student),
+                selectinload(Observation.skills),
+                raiseload("*"),
+            )
+            .all()
+        )
+        by_id = {o.id: _observation_to_dict(o) for o in observations}
+        return [by_id[i] for i in observation_ids if i in by_id]
+    finally:
+        session.close()
+
+
+def search_observations(
+    user_id: int,
+    query: str,
+    student_id: int | None = None,
+    area: str | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> dict:
+    """Rank the user's observations against ``query`` using the FTS5 index.
+
+    Every word is matched as a prefix across student name, notes and skills.
+    Returns {"total": n, "results": [{"id", "snippet"}, ...]} for the requested
+    page, best match first, with matched terms wrapped in ``**`` in the snippet.
+    Falls back to a LIKE scan when the database has no FTS5 index.
+    """
+    match = fts_query(query)
+    if match is None:
+        return {"total": 0, "results": []}
+    filters = "s.user_id = :user_id"
+    params = {"match": match, "user_id": user_id, "limit": limit, "offset": offset}
+    if student_id is not None:
+        filters += " AND o.student_id = :student_id"
+        params["student_id"] = student_id
+    if area is not None:
+        filters += " AND o.area = :area"
+        params["area"] = area
+    source = f"""
+        FROM observations_fts f
+        JOIN observations o ON o.id = f.rowid
+        JOIN students s ON s.id = o.student_id
+        WHERE observations_fts MATCH :match AND {filters}
+    """
+    session = get_session()
+    try:
+        try:
+            total = session.execute(text(f"SELECT count(*) {source}"), params).scalar()
+            rows = session.execute(text(f"""
+                SELECT o.id, snippet(observations_fts, -1, '**', '**', '…', 16)
+                {source}
+                ORDER BY bm25(observations_fts, 2.0, 1.0, 1.5), o.date DESC
+                LIMIT :limit OFFSET :offset
+            """), params).all()
+        except OperationalError:
+            session.rollback()
+            return _search_observations_like(session, user_id, query, student_id, area, limit, offset)
+        return {"total": total, "results": [{"id": obs_id, "snippet": snippet} for obs_id, snippet in rows]}
+    finally:
+        session.close()
+
+
+def _search_observations_like(session, user_id, query, student_id, area, limit, offset) -> dict:
+    pattern = f"%{query}%"
+    q = (
+        session.query(Observation.id, Observation.notes)
+        .join(Student)
+        .filter(Student.user_id == user_id)
+        .filter(or_(Student.name.ilike(pattern), Observation.notes.ilike(pattern)))
+    )
+    if student_id is not None:
+        q = q.filter(Observation.student_id == student_id)
+    if area is not None:
+        q = q.filter(Observation.area == area)
+    total = q.count()
+    rows = q.order_by(Observation.date.desc(), Observation.id.desc()).limit(limit).offset(offset).all()
+    return {"total": total, "results": [{"id": obs_id, "snippet": notes or ""} for obs_id, notes in rows]}
+
+
+def create_observation(user_id: int, data: dict) -> dict:
+    student_id = _student_id_for(user_id, data)
+
+    def command(session):
         obs_date = data["date"] if isinstance(data["date"], date_type) else date_type.fromisoformat(data["date"])
         obs = Observation(
-            student_id=student.id,
+            student_id=student_id,
             date=obs_date,
             area=data["area"],
             notes=data.get("notes", ""),
+            skills=[ObservationSkill(skill=skill) for skill in data.get("skills", [])],
         )
         session.add(obs)
         session.flush()
-        for skill in data.get("skills", []):
-            session.add(ObservationSkill(observation_id=obs.id, skill=skill))
-        session.commit()
         return _observation_to_dict(obs)
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
+
+    created = _write(command)
+    bump_version(user_id, reports=True)
+    return created
 
 
 def update_observation(observation_id: int, user_id: int, data: dict) -> dict:
-    session = get_session()
-    try:
+    student_id = _student_id_for(user_id, data)
+
+    def command(session):
         obs = session.query(Observation).get(observation_id)
         if not obs:
             raise ValueError(f"Observation {observation_id} not found")
-        student = session.query(Student).filter_by(name=data["student"], user_id=user_id).first()
-        if not student:
-            raise ValueError(f"Student '{data['student']}' not found")
-        obs.student_id = student.id
+        obs.student_id = student_id
         obs.date = data["date"] if isinstance(data["date"], date_type) else date_type.fromisoformat(data["date"])
         obs.area = data["area"]
         obs.notes = data.get("notes", "")
         session.query(ObservationSkill).filter_by(observation_id=obs.id).delete()
         for skill in data.get("skills", []):
             session.add(ObservationSkill(observation_id=obs.id, skill=skill))
-        session.commit()
+        session.flush()
         session.refresh(obs)
         return _observation_to_dict(obs)
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
 
+    updated = _write(command)
+    bump_version(user_id, reports=True)
+    return updated
 
-def delete_observation(observation_id: int):
-    session = get_session()
-    try:
+
+def delete_observation(observation_id: int) -> dict | None:
+    def command(session):
         obs = session.query(Observation).get(observation_id)
-        if obs:
-            session.delete(obs)
-            session.commit()
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
+        if not obs:
+            return None, None
+        deleted = _observation_to_dict(obs)
+        user_id = obs.student.user_id
+        session.delete(obs)
+        session.flush()
+        return deleted, user_id
+
+    deleted, user_id = _write(command)
+    if deleted is not None:
+        bump_version(user_id, reports=True)
+    return deleted
 
 
 # ---------------------------------------------------------------------------
 # Schedule
 # ---------------------------------------------------------------------------
 
-def list_schedules(user_id: int) -> list[dict]:
+@cached_read("schedule")
+def list_schedules(user_id: int) -> tuple[dict, ...]:
     session = get_session()
     try:
-        schedules = session.query(Schedule).filter_by(user_id=user_id).all()
-        return [_schedule_to_dict(s) for s in schedules]
+        schedules = (
+            session.query(Schedule)
+            .filter_by(user_id=user_id)
+            .options(raiseload("*"))
+            .order_by(Schedule.id)
+            .all()
+        )
+        return tuple(_schedule_to_dict(s) for s in schedules)
     finally:
         session.close()
 
 
 def create_schedule(user_id: int, data: dict) -> dict:
-    session = get_session()
-    try:
+    def command(session):
         sched = Schedule(
             day=data["day"],
             time=data["time"],
@@ -272,18 +592,16 @@ def create_schedule(user_id: int, data: dict) -> dict:
             user_id=user_id,
         )
         session.add(sched)
-        session.commit()
+        session.flush()
         return _schedule_to_dict(sched)
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
+
+    created = _write(command)
+    bump_version(user_id)
+    return created
 
 
 def update_schedule(schedule_id: int, data: dict) -> dict:
-    session = get_session()
-    try:
+    def command(session):
         sched = session.query(Schedule).get(schedule_id)
         if not sched:
             raise ValueError(f"Schedule {schedule_id} not found")
@@ -292,45 +610,128 @@ def update_schedule(schedule_id: int, data: dict) -> dict:
         sched.activity = data["activity"]
         sched.duration = data["duration"]
         sched.students_group = data["students"]
-        session.commit()
-        return _schedule_to_dict(sched)
-    except Exception:
-        session.rollback()
-        raise
+        session.flush()
+        return _schedule_to_dict(sched), sched.user_id
+
+    updated, user_id = _write(command)
+    bump_version(user_id)
+    return updated
+
+
+def delete_schedule(schedule_id: int) -> dict | None:
+    def command(session):
+        sched = session.query(Schedule).get(schedule_id)
+        if not sched:
+            return None, None
+        deleted = _schedule_to_dict(sched)
+        session.delete(sched)
+        session.flush()
+        return deleted, sched.user_id
+
+    deleted, user_id = _write(command)
+    if deleted is not None:
+        bump_version(user_id)
+    return deleted
+
+
+# ---------------------------------------------------------------------------
+# Materials
+# ---------------------------------------------------------------------------
+
+@cached_read("materials")
+def list_materials(user_id: int) -> tuple[dict, ...]:
+    session = get_session()
+    try:
+        materials = (
+            session.query(Material)
+            .filter_by(user_id=user_id)
+            .options(raiseload("*"))
+            .order_by(Material.id)
+            .all()
+        )
+        return tuple(_material_to_dict(m) for m in materials)
     finally:
         session.close()
 
 
-def delete_schedule(schedule_id: int):
+@cached_read("materials_page")
+def page_materials(user_id: int, category: str | None = None, after: int | None = None, limit: int = 24) -> dict:
+    """One page of the user's materials in id order; see page_students for the cursor."""
     session = get_session()
     try:
-        sched = session.query(Schedule).get(schedule_id)
-        if sched:
-            session.delete(sched)
-            session.commit()
-    except Exception:
-        session.rollback()
-        raise
+        query = session.query(Material).filter(Material.user_id == user_id)
+        if category is not None:
+            query = query.filter(Material.category == category)
+        total = query.count()
+        if after is not None:
+            query = query.filter(Material.id > after)
+        materials = query.options(raiseload("*")).order_by(Material.id).limit(limit + 1).all()
+        next_cursor = materials[limit - 1].id if len(materials) > limit else None
+        return {"items": tuple(_material_to_dict(m) for m in materials[:limit]), "next_cursor": next_cursor, "total": total}
     finally:
         session.close()
 
 
-# ---------------------------------------------------------------------------
-# Materials
-# ---------------------------------------------------------------------------
+def search_materials(user_id: int, query: str, category: str | None = None, limit: int = 60) -> dict:
+    """Find the user's materials whose name or description contains ``query``.
 
-def list_materials(user_id: int) -> list[dict]:
+    Substrings of three or more characters go through the trigram index,
+    joined to the (user_id, category) index in the same statement. Shorter
+    queries, and databases without the index, use a LIKE scan instead.
+    Returns {"total": n, "results": [material dicts]} with at most ``limit``
+    results, best match first.
+    """
+    phrase = fts_phrase(query)
+    if phrase is None:
+        return {"total": 0, "results": []}
     session = get_session()
     try:
-        materials = session.query(Material).filter_by(user_id=user_id).all()
-        return [_material_to_dict(m) for m in materials]
+        if len(query.strip()) >= TRIGRAM_MIN_LENGTH:
+            filters = "m.user_id = :user_id"
+            params = {"match": phrase, "user_id": user_id, "limit": limit}
+            if category is not None:
+                filters += " AND m.category = :category"
+                params["category"] = category
+            source = f"""
+                FROM materials_fts f
+                JOIN materials m ON m.id = f.rowid
+                WHERE materials_fts MATCH :match AND {filters}
+            """
+            try:
+                total = session.execute(text(f"SELECT count(*) {source}"), params).scalar()
+                ids = session.execute(
+                    text(f"SELECT m.id {source} ORDER BY f.rank, m.name LIMIT :limit"), params
+                ).scalars().all()
+            except OperationalError:
+                session.rollback()
+            else:
+                by_id = {
+                    m.id: m
+                    for m in session.query(Material).filter(Material.id.in_(ids)).options(raiseload("*"))
+                }
+                return {"total": total, "results": [_material_to_dict(by_id[i]) for i in ids]}
+        return _search_materials_like(session, user_id, query.strip(), category, limit)
     finally:
         session.close()
 
 
+def _search_materials_like(session, user_id, query, category, limit) -> dict:
+    pattern = f"%{query}%"
+    q = (
+        session.query(Material)
+        .filter(Material.user_id == user_id)
+        .filter(or_(Material.name.ilike(pattern), Material.description.ilike(pattern)))
+        .options(raiseload("*"))
+    )
+    if category is not None:
+        q = q.filter(Material.category == category)
+    total = q.count()
+    materials = q.order_by(Material.name, Material.id).limit(limit).all()
+    return {"total": total, "results": [_material_to_dict(m) for m in materials]}
+
+
 def create_material(user_id: int, data: dict) -> dict:
-    session = get_session()
-    try:
+    def command(session):
         mat = Material(
             name=data["name"],
             category=data["category"],
@@ -341,18 +742,16 @@ def create_material(user_id: int, data: dict) -> dict:
             user_id=user_id,
         )
         session.add(mat)
-        session.commit()
+        session.flush()
         return _material_to_dict(mat)
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
+
+    created = _write(command)
+    bump_version(user_id)
+    return created
 
 
 def update_material(material_id: int, data: dict) -> dict:
-    session = get_session()
-    try:
+    def command(session):
         mat = session.query(Material).get(material_id)
         if not mat:
             raise ValueError(f"Material {material_id} not found")
@@ -361,97 +760,318 @@ def update_material(material_id: int, data: dict) -> dict:
         mat.age_range = data.get("age_range", "")
         mat.description = data.get("description", "")
         mat.in_stock = data.get("in_stock", True)
-        mat.times_used = data.get("times_used", 0)
-        session.commit()
-        return _material_to_dict(mat)
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
+        if "times_used" in data:
+            mat.times_used = data["times_used"]
+        session.flush()
+        return _material_to_dict(mat), mat.user_id
+
+    updated, user_id = _write(command)
+    bump_version(user_id)
+    return updated
+
+
+def increment_material_usage(material_id: int, student_id: int | None = None) -> dict:
+    """Count one use of a material and log it, optionally attributed to a student.
+
+    The counter moves in a single ``UPDATE ... SET times_used = times_used + 1``,
+    so concurrent clicks never overwrite each other. The usage event itself is
+    buffered and written in batches (see ``material_usage``).
+    """
+    def command(session):
+        mat = session.scalars(
+            update(Material)
+            .where(Material.id == material_id)
+            .values(times_used=func.coalesce(Material.times_used, 0) + 1)
+            .returning(Material)
+        ).first()
+        if not mat:
+            raise ValueError(f"Material {material_id} not found")
+        return _material_to_dict(mat), mat.user_id
+
+    result, user_id = _write(command)
+    bump_version(user_id)
+    now = datetime.now()
+    material_usage.record({
+        "material_id": material_id,
+        "student_id": student_id,
+        "used_on": now.date(),
+        "used_at": now,
+        "user_id": user_id,
+    })
+    return result
+
+
+def _write_material_usage(events: list[dict]):
+    """Append a batch of usage events and fold them into the per-day rollup in one transaction."""
+
+    def command(session):
+        # Skip events for materials deleted since they were recorded
+        live = set(session.scalars(select(Material.id).where(Material.id.in_({e["material_id"] for e in events}))))
+        kept = [e for e in events if e["material_id"] in live]
+        if not kept:
+            return set()
+        counts = Counter((e["user_id"], e["material_id"], e["used_on"]) for e in kept)
+        session.execute(insert(MaterialUsageEvent), kept)
+        stmt = _dialect_insert(session, MaterialUsageDaily)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["material_id", "used_on"],
+            set_={"uses": MaterialUsageDaily.uses + stmt.excluded.uses},
+        )
+        session.execute(stmt, [
+            {"user_id": user_id, "material_id": material_id, "used_on": used_on, "uses": uses}
+            for (user_id, material_id, used_on), uses in counts.items()
+        ])
+        return {e["user_id"] for e in kept}
+
+    for user_id in _write(command):
+        bump_version(user_id)
+
 
+# Usage events waiting to be written; readers of the rollup flush it first
+material_usage = EventBuffer(_write_material_usage)
 
-def increment_material_usage(material_id: int) -> dict:
+
+@cached_read("material_usage_summary")
+def _material_usage_summary(user_id: int, today: date_type, days: int) -> dict:
+    since = today - timedelta(days=days - 1)
     session = get_session()
     try:
-        mat = session.query(Material).get(material_id)
-        if not mat:
-            raise ValueError(f"Material {material_id} not found")
-        mat.times_used = (mat.times_used or 0) + 1
-        session.commit()
-        return _material_to_dict(mat)
-    except Exception:
-        session.rollback()
-        raise
+        by_category = session.execute(
+            select(
+                Material.category,
+                func.count(),
+                func.coalesce(func.sum(Material.times_used), 0),
+                func.coalesce(func.sum(case((Material.in_stock, 1), else_=0)), 0),
+            )
+            .where(Material.user_id == user_id)
+            .group_by(Material.category)
+            .order_by(Material.category)
+        ).all()
+        top = session.scalars(
+            select(Material)
+            .where(Material.user_id == user_id)
+            .options(raiseload("*"))
+            .order_by(Material.times_used.desc(), Material.name)
+            .limit(5)
+        ).all()
+        per_day = dict(session.execute(
+            select(MaterialUsageDaily.used_on, func.sum(MaterialUsageDaily.uses))
+            .where(MaterialUsageDaily.user_id == user_id, MaterialUsageDaily.used_on >= since)
+            .group_by(MaterialUsageDaily.used_on)
+        ).all())
+        return {
+            "total_materials": sum(row[1] for row in by_category),
+            "total_uses": sum(row[2] for row in by_category),
+            "in_stock": sum(row[3] for row in by_category),
+            "by_category": [
+                {"category": category, "count": count, "uses": uses}
+                for category, count, uses, _ in by_category
+            ],
+            "top": [_material_to_dict(m) for m in top],
+            "by_day": [
+                {"date": (since + timedelta(days=i)).isoformat(), "uses": per_day.get(since + timedelta(days=i), 0)}
+                for i in range(days)
+            ],
+            "today": per_day.get(today, 0),
+            "recent": sum(per_day.values()),
+        }
     finally:
         session.close()
 
 
-def delete_material(material_id: int):
-    session = get_session()
-    try:
+def material_usage_summary(user_id: int, today: date_type | None = None, days: int = 7) -> dict:
+    """Usage figures for the Materials statistics tab and the dashboard.
+
+    Totals come from materials (one GROUP BY over the user's rows) and the
+    ``days`` up to ``today`` from the material_usage_daily rollup, so no raw
+    events are scanned. Pending usage events are flushed first.
+    """
+    material_usage.flush()
+    return _material_usage_summary(user_id, today or date_type.today(), days)
+
+
+def delete_material(material_id: int) -> dict | None:
+    # Write pending usage events first so they are removed below
+    material_usage.flush()
+
+    def command(session):
         mat = session.query(Material).get(material_id)
-        if mat:
-            session.delete(mat)
-            session.commit()
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
+        if not mat:
+            return None, None
+        deleted = _material_to_dict(mat)
+        # Also removed by ON DELETE CASCADE, but only when SQLite enforces foreign keys
+        session.query(MaterialUsageEvent).filter_by(material_id=material_id).delete()
+        session.query(MaterialUsageDaily).filter_by(material_id=material_id).delete()
+        session.delete(mat)
+        session.flush()
+        return deleted, mat.user_id
+
+    deleted, user_id = _write(command)
+    if deleted is not None:
+        bump_version(user_id)
+    return deleted
 
 
 # ---------------------------------------------------------------------------
 # Daily Entries
 # ---------------------------------------------------------------------------
 
-def list_daily_entries(user_id: int) -> list[dict]:
+@cached_read("daily_entries")
+def list_daily_entries(user_id: int) -> tuple[dict, ...]:
     session = get_session()
     try:
-        entries = session.query(DailyEntry).filter_by(user_id=user_id).all()
-        return [_daily_entry_to_dict(e) for e in entries]
+        entries = (
+            session.query(DailyEntry)
+            .filter_by(user_id=user_id)
+            .options(
+                joinedload(DailyEntry.student, innerjoin=True),
+                selectinload(DailyEntry.activities),
+                raiseload("*"),
+            )
+            .order_by(DailyEntry.id)
+            .all()
+        )
+        return tuple(_daily_entry_to_dict(e) for e in entries)
     finally:
         session.close()
 
 
-def create_daily_entry(user_id: int, data: dict) -> dict:
+@cached_read("daily_entries_in_range")
+def list_daily_entries_in_range(
+    user_id: int,
+    start: date_type,
+    end: date_type,
+    student_id: int | None = None,
+    subject: str | None = None,
+) -> dict[str, dict[str, list[dict]]]:
+    """Entries dated ``start``..``end`` (inclusive), grouped as {student name: {ISO date: [entry, ...]}}.
+
+    Students are ordered by name and days chronologically. The filter is served
+    by the (user_id, date) index, so cost tracks the range, not the history.
+    """
     session = get_session()
     try:
-        student = session.query(Student).filter_by(name=data["student"], user_id=user_id).first()
-        if not student:
-            raise ValueError(f"Student '{data['student']}' not found")
+        query = (
+            session.query(DailyEntry)
+            .join(DailyEntry.student)
+            .filter(DailyEntry.user_id == user_id, DailyEntry.date.between(start, end))
+        )
+        if student_id is not None:
+            query = query.filter(DailyEntry.student_id == student_id)
+        if subject is not None:
+            query = query.filter(DailyEntry.subject == subject)
+        entries = (
+            query.options(
+                contains_eager(DailyEntry.student),
+                selectinload(DailyEntry.activities),
+                raiseload("*"),
+            )
+            .order_by(Student.name, DailyEntry.date, DailyEntry.id)
+            .all()
+        )
+        grouped: dict[str, dict[str, list[dict]]] = {}
+        for e in entries:
+            entry = _daily_entry_to_dict(e)
+            grouped.setdefault(entry["student"], {}).setdefault(entry["date"], []).append(entry)
+        return grouped
+    finally:
+        session.close()
+
+
+def create_daily_entry(user_id: int, data: dict) -> dict:
+    student_id = _student_id_for(user_id, data)
+
+    def command(session):
         entry_date = data["date"] if isinstance(data["date"], date_type) else date_type.fromisoformat(data["date"])
         entry = DailyEntry(
-            student_id=student.id,
+            student_id=student_id,
             date=entry_date,
             subject=data["subject"],
             skill_level=data["skill_level"],
             notes=data.get("notes", ""),
             user_id=user_id,
+            activities=[DailyActivity(activity=activity) for activity in data.get("activities", [])],
         )
         session.add(entry)
         session.flush()
-        for activity in data.get("activities", []):
-            session.add(DailyActivity(daily_entry_id=entry.id, activity=activity))
-        session.commit()
+        _apply_weekly_rollup(session, user_id, {_rollup_key(student_id, entry_date, data["subject"], data["skill_level"]): 1})
         return _daily_entry_to_dict(entry)
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
+
+    try:
+        created = _write(command)
+    except IntegrityError as exc:
+        raise ValueError(_duplicate_entry_message(data)) from exc
+    bump_version(user_id, reports=True)
+    return created
+
+
+def upsert_daily_entry(user_id: int, data: dict) -> dict:
+    """Create the entry for (student, date, subject), or replace the one already there.
+
+    An ``INSERT ... ON CONFLICT DO NOTHING`` against
+    uq_daily_entries_student_date_subject, then, if the entry already
+    existed, an update of that row read under lock. Two sessions saving the
+    same entry leave one row (the last write wins) instead of racing a
+    pre-check, and the weekly rollup moves the replaced skill level exactly.
+    A replaced entry keeps its id; its activities are swapped for the new ones.
+    """
+    student_id = _student_id_for(user_id, data)
+    entry_date = _as_date(data["date"])
+
+    def command(session):
+        stmt = _dialect_insert(session, DailyEntry).values(
+            student_id=student_id,
+            date=entry_date,
+            subject=data["subject"],
+            skill_level=data["skill_level"],
+            notes=data.get("notes", ""),
+            user_id=user_id,
+        )
+        stmt = stmt.on_conflict_do_nothing(index_elements=["student_id", "date", "subject"]).returning(DailyEntry.id)
+        entry_id = session.scalar(stmt)
+        deltas = Counter({_rollup_key(student_id, entry_date, data["subject"], data["skill_level"]): 1})
+        if entry_id is None:
+            entry_id, old_level = session.execute(
+                select(DailyEntry.id, DailyEntry.skill_level)
+                .where(
+                    DailyEntry.student_id == student_id,
+                    DailyEntry.date == entry_date,
+                    DailyEntry.subject == data["subject"],
+                )
+                .with_for_update()
+            ).one()
+            session.execute(
+                update(DailyEntry)
+                .where(DailyEntry.id == entry_id)
+                .values(skill_level=data["skill_level"], notes=data.get("notes", ""))
+            )
+            session.query(DailyActivity).filter_by(daily_entry_id=entry_id).delete()
+            deltas[_rollup_key(student_id, entry_date, data["subject"], old_level)] -= 1
+        activities = [{"daily_entry_id": entry_id, "activity": a} for a in data.get("activities", [])]
+        if activities:
+            session.execute(insert(DailyActivity), activities)
+        _apply_weekly_rollup(session, user_id, deltas)
+        entry = session.get(
+            DailyEntry, entry_id,
+            options=[joinedload(DailyEntry.student, innerjoin=True), selectinload(DailyEntry.activities)],
+            populate_existing=True,
+        )
+        return _daily_entry_to_dict(entry)
+
+    saved = _write(command)
+    bump_version(user_id, reports=True)
+    return saved
 
 
 def update_daily_entry(entry_id: int, user_id: int, data: dict) -> dict:
-    session = get_session()
-    try:
-        entry = session.query(DailyEntry).get(entry_id)
+    student_id = _student_id_for(user_id, data)
+
+    def command(session):
+        entry = session.get(DailyEntry, entry_id, with_for_update=True)
         if not entry:
             raise ValueError(f"DailyEntry {entry_id} not found")
-        student = session.query(Student).filter_by(name=data["student"], user_id=user_id).first()
-        if not student:
-            raise ValueError(f"Student '{data['student']}' not found")
-        entry.student_id = student.id
+        deltas = Counter({_rollup_key(entry.student_id, entry.date, entry.subject, entry.skill_level): -1})
+        entry.student_id = student_id
         entry.date = data["date"] if isinstance(data["date"], date_type) else date_type.fromisoformat(data["date"])
         entry.subject = data["subject"]
         entry.skill_level = data["skill_level"]
@@ -459,29 +1079,625 @@ def update_daily_entry(entry_id: int, user_id: int, data: dict) -> dict:
         session.query(DailyActivity).filter_by(daily_entry_id=entry.id).delete()
         for activity in data.get("activities", []):
             session.add(DailyActivity(daily_entry_id=entry.id, activity=activity))
-        session.commit()
+        deltas[_rollup_key(student_id, entry.date, entry.subject, entry.skill_level)] += 1
+        session.flush()
+        _apply_weekly_rollup(session, user_id, deltas)
         session.refresh(entry)
         return _daily_entry_to_dict(entry)
-    except Exception:
-        session.rollback()
-        raise
+
+    try:
+        updated = _write(command)
+    except IntegrityError as exc:
+        raise ValueError(_duplicate_entry_message(data)) from exc
+    bump_version(user_id, reports=True)
+    return updated
+
+
+def delete_daily_entry(entry_id: int) -> dict | None:
+    def command(session):
+        entry = session.get(DailyEntry, entry_id, with_for_update=True)
+        if not entry:
+            return None, None
+        deleted = _daily_entry_to_dict(entry)
+        _apply_weekly_rollup(session, entry.user_id, {
+            _rollup_key(entry.student_id, entry.date, entry.subject, entry.skill_level): -1,
+        })
+        session.delete(entry)
+        session.flush()
+        return deleted, entry.user_id
+
+    deleted, user_id = _write(command)
+    if deleted is not None:
+        bump_version(user_id, reports=True)
+    return deleted
+
+
+# ---------------------------------------------------------------------------
+# Weekly rollups
+# ---------------------------------------------------------------------------
+#
+# weekly_skill_rollups holds how many daily entries each student has per ISO
+# week, subject and skill level. Every daily-entry write applies its +1/-1 in
+# the same transaction, so newsletters, reports and the dashboard read a few
+# rows per week instead of every entry. rebuild_weekly_rollups() recomputes
+# the table from daily_entries (see src/monty/rebuild_rollups.py).
+
+def _week_start(day: date_type) -> date_type:
+    """The Monday of ``day``'s ISO week."""
+    return day - timedelta(days=day.weekday())
+
+
+def _rollup_key(student_id: int, day: date_type, subject: str, skill_level: str) -> tuple:
+    return (student_id, _week_start(day), subject, skill_level)
+
+
+def _apply_weekly_rollup(session: Session, user_id: int, deltas: dict):
+    """Add ``deltas`` ({_rollup_key: n}) to the rollup in the caller's transaction."""
+    deltas = {key: n for key, n in deltas.items() if n}
+    if not deltas:
+        return
+    stmt = _dialect_insert(session, WeeklySkillRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["student_id", "week_start", "subject", "skill_level"],
+        set_={"sessions": WeeklySkillRollup.sessions + stmt.excluded.sessions},
+    )
+    session.execute(stmt, [
+        {"student_id": student_id, "week_start": week, "subject": subject,
+         "skill_level": skill_level, "sessions": n, "user_id": user_id}
+        for (student_id, week, subject, skill_level), n in deltas.items()
+    ])
+    emptied = [key for key, n in deltas.items() if n < 0]
+    if emptied:
+        session.execute(delete(WeeklySkillRollup).where(
+            tuple_(
+                WeeklySkillRollup.student_id, WeeklySkillRollup.week_start,
+                WeeklySkillRollup.subject, WeeklySkillRollup.skill_level,
+            ).in_(emptied),
+            WeeklySkillRollup.sessions <= 0,
+        ))
+
+
+@cached_read("weekly_rollup")
+def list_weekly_rollup(
+    user_id: int,
+    start: date_type,
+    end: date_type,
+    student_id: int | None = None,
+) -> tuple[dict, ...]:
+    """Rollup rows for the ISO weeks overlapping ``start``..``end``, ordered by week, student, subject and level.
+
+    Each row is {"student_id", "student", "week_start" (ISO date), "subject",
+    "skill_level", "sessions"}.
+    """
+    session = get_session()
+    try:
+        query = (
+            select(WeeklySkillRollup, Student.name)
+            .join(Student, Student.id == WeeklySkillRollup.student_id)
+            .where(
+                WeeklySkillRollup.user_id == user_id,
+                WeeklySkillRollup.week_start.between(_week_start(start), end),
+            )
+        )
+        if student_id is not None:
+            query = query.where(WeeklySkillRollup.student_id == student_id)
+        rows = session.execute(query.order_by(
+            WeeklySkillRollup.week_start, Student.name, WeeklySkillRollup.subject, WeeklySkillRollup.skill_level,
+        )).all()
+        return tuple(
+            {
+                "student_id": r.student_id,
+                "student": name,
+                "week_start": r.week_start.isoformat(),
+                "subject": r.subject,
+                "skill_level": r.skill_level,
+                "sessions": r.sessions,
+            }
+            for r, name in rows
+        )
+    finally:
+        session.close()
+
+
+def rebuild_weekly_rollups(user_id: int | None = None) -> int:
+    """Recompute the weekly rollup from daily_entries, for one user or everyone; returns the rows written."""
+
+    def command(session):
+        days = select(
+            DailyEntry.user_id, DailyEntry.student_id, DailyEntry.date,
+            DailyEntry.subject, DailyEntry.skill_level, func.count(),
+        ).group_by(
+            DailyEntry.user_id, DailyEntry.student_id, DailyEntry.date,
+            DailyEntry.subject, DailyEntry.skill_level,
+        )
+        clear = delete(WeeklySkillRollup)
+        if user_id is not None:
+            days = days.where(DailyEntry.user_id == user_id)
+            clear = clear.where(WeeklySkillRollup.user_id == user_id)
+        # Grouped per day in SQL, folded into weeks here, so the week arithmetic stays dialect-neutral
+        weekly: Counter = Counter()
+        for owner, student_id, day, subject, skill_level, n in session.execute(days):
+            weekly[(owner, *_rollup_key(student_id, day, subject, skill_level))] += n
+        session.execute(clear)
+        if weekly:
+            session.execute(insert(WeeklySkillRollup), [
+                {"user_id": owner, "student_id": student_id, "week_start": week,
+                 "subject": subject, "skill_level": skill_level, "sessions": n}
+                for (owner, student_id, week, subject, skill_level), n in weekly.items()
+            ])
+        return weekly
+
+    weekly = _write(command)
+    for owner in {key[0] for key in weekly} | ({user_id} if user_id is not None else set()):
+        bump_version(owner, reports=True)
+    return len(weekly)
+
+
+# ---------------------------------------------------------------------------
+# Term reports
+# ---------------------------------------------------------------------------
+
+# term_report() builds end-of-term figures for every student of a user with a
+# fixed handful of GROUP BY queries over observations, observation_skills,
+# daily_entries and daily_activities, so the database does the counting and
+# the cost does not grow with the number of students queried. Months are
+# "YYYY-MM" strings computed in SQL; each query's rows are folded into the
+# per-student results in a single pass.
+
+# Skill levels from first to most advanced; a month's level score is the
+# average position (1-4) of that month's sessions
+SKILL_LEVELS = ("Emerging", "Developing", "Proficient", "Advanced")
+
+
+def _month_of(session: Session, column):
+    """``column`` as a "YYYY-MM" string, for the session's backend."""
+    if session.get_bind().dialect.name == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
+
+def _months(start: date_type, end: date_type) -> list[str]:
+    months = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _empty_term_report(student_id: int, name: str, months: list[str]) -> dict:
+    return {
+        "student_id": student_id,
+        "student": name,
+        "observations": 0,
+        "areas": {},
+        "skills": [],
+        "sessions": 0,
+        "subjects": [],
+        "subjects_missing": [],
+        "monthly": {
+            "observations": [0] * len(months),
+            "skills": [0] * len(months),
+            "sessions": [0] * len(months),
+            "level_score": [None] * len(months),
+        },
+        "levels_by_month": {},
+    }
+
+
+def term_report(
+    user_id: int,
+    start: date_type,
+    end: date_type,
+    student_id: int | None = None,
+) -> dict:
+    """Aggregated progress for ``start``..``end`` (inclusive), for every student or just ``student_id``.
+
+    Returns {"start", "end" (ISO dates), "months" (["YYYY-MM", ...]),
+    "subjects" (every subject the class covered), "students": {student_id:
+    report}}, students ordered by name. Each report holds:
+
+    - "observations" and "areas" ({area: observations}, most frequent first)
+    - "skills": [{"skill", "count", "first", "last"}], most observed first
+    - "sessions" and "subjects": [{"subject", "sessions", "activities",
+      "distinct_activities", "first", "last"}], most sessions first
+    - "subjects_missing": class subjects the student has no sessions in
+    - "monthly": {"observations", "skills" (distinct skills observed),
+      "sessions", "level_score"} lists aligned with "months"
+    - "levels_by_month": {skill level: sessions per month}, in SKILL_LEVELS order
+
+    The Reports page caches the result per report data version.
+    """
+    months = _months(start, end)
+    column = {month: i for i, month in enumerate(months)}
+    session = get_session()
+    try:
+        students = select(Student.id, Student.name).where(Student.user_id == user_id)
+        if student_id is not None:
+            students = students.where(Student.id == student_id)
+        reports = {
+            sid: _empty_term_report(sid, name, months)
+            for sid, name in session.execute(students.order_by(Student.name, Student.id))
+        }
+        if not reports:
+            return {"start": start.isoformat(), "end": end.isoformat(), "months": months,
+                    "subjects": [], "students": reports}
+
+        observed = (
+            Observation.student_id.in_(students.with_only_columns(Student.id)),
+            Observation.date.between(start, end),
+        )
+        tracked = [DailyEntry.user_id == user_id, DailyEntry.date.between(start, end)]
+        if student_id is not None:
+            tracked.append(DailyEntry.student_id == student_id)
+        observed_month = _month_of(session, Observation.date)
+        entry_month = _month_of(session, DailyEntry.date)
+
+        for sid, area, n in session.execute(
+            select(Observation.student_id, Observation.area, func.count())
+            .where(*observed)
+            .group_by(Observation.student_id, Observation.area)
+            .order_by(Observation.student_id, func.count().desc(), Observation.area)
+        ):
+            reports[sid]["areas"][area] = n
+            reports[sid]["observations"] += n
+
+        for sid, skill, n, first, last in session.execute(
+            select(
+                Observation.student_id, ObservationSkill.skill, func.count(),
+                func.min(Observation.date), func.max(Observation.date),
+            )
+            .join(ObservationSkill, ObservationSkill.observation_id == Observation.id)
+            .where(*observed)
+            .group_by(Observation.student_id, ObservationSkill.skill)
+            .order_by(Observation.student_id, func.count().desc(), ObservationSkill.skill)
+        ):
+            reports[sid]["skills"].append(
+                {"skill": skill, "count": n, "first": first.isoformat(), "last": last.isoformat()}
+            )
+
+        for sid, month, n, skills in session.execute(
+            select(
+                Observation.student_id, observed_month,
+                func.count(Observation.id.distinct()), func.count(ObservationSkill.skill.distinct()),
+            )
+            .outerjoin(ObservationSkill, ObservationSkill.observation_id == Observation.id)
+            .where(*observed)
+            .group_by(Observation.student_id, observed_month)
+        ):
+            reports[sid]["monthly"]["observations"][column[month]] = n
+            reports[sid]["monthly"]["skills"][column[month]] = skills
+
+        # (student, date, subject) is unique, so sessions are also days worked
+        activities = {
+            (sid, subject): (n, distinct)
+            for sid, subject, n, distinct in session.execute(
+                select(
+                    DailyEntry.student_id, DailyEntry.subject,
+                    func.count(), func.count(DailyActivity.activity.distinct()),
+                )
+                .join(DailyActivity, DailyActivity.daily_entry_id == DailyEntry.id)
+                .where(*tracked)
+                .group_by(DailyEntry.student_id, DailyEntry.subject)
+            )
+        }
+        class_subjects = set()
+        for sid, subject, n, first, last in session.execute(
+            select(
+                DailyEntry.student_id, DailyEntry.subject, func.count(),
+                func.min(DailyEntry.date), func.max(DailyEntry.date),
+            )
+            .where(*tracked)
+            .group_by(DailyEntry.student_id, DailyEntry.subject)
+            .order_by(DailyEntry.student_id, func.count().desc(), DailyEntry.subject)
+        ):
+            n_activities, distinct = activities.get((sid, subject), (0, 0))
+            reports[sid]["subjects"].append({
+                "subject": subject, "sessions": n, "activities": n_activities,
+                "distinct_activities": distinct, "first": first.isoformat(), "last": last.isoformat(),
+            })
+            reports[sid]["sessions"] += n
+            class_subjects.add(subject)
+
+        level_rank = {level: rank for rank, level in enumerate(SKILL_LEVELS, start=1)}
+        scored = {}
+        for sid, month, level, n in session.execute(
+            select(DailyEntry.student_id, entry_month, DailyEntry.skill_level, func.count())
+            .where(*tracked)
+            .group_by(DailyEntry.student_id, entry_month, DailyEntry.skill_level)
+        ):
+            report = reports[sid]
+            i = column[month]
+            report["levels_by_month"].setdefault(level, [0] * len(months))[i] += n
+            report["monthly"]["sessions"][i] += n
+            if level in level_rank:
+                total, count = scored.get((sid, i), (0, 0))
+                scored[(sid, i)] = (total + level_rank[level] * n, count + n)
+        for (sid, i), (total, count) in scored.items():
+            reports[sid]["monthly"]["level_score"][i] = round(total / count, 2)
     finally:
         session.close()
 
+    subjects = sorted(class_subjects)
+    for report in reports.values():
+        covered = {row["subject"] for row in report["subjects"]}
+        report["subjects_missing"] = [subject for subject in subjects if subject not in covered]
+        report["levels_by_month"] = dict(sorted(
+            report["levels_by_month"].items(),
+            key=lambda item: (level_rank.get(item[0], len(SKILL_LEVELS) + 1), item[0]),
+        ))
+    return {"start": start.isoformat(), "end": end.isoformat(), "months": months,
+            "subjects": subjects, "students": reports}
 
-def delete_daily_entry(entry_id: int):
+
+# ---------------------------------------------------------------------------
+# Bulk writes
+# ---------------------------------------------------------------------------
+#
+# The bulk_create_* functions validate every record up front, resolve students
+# (by "student_id" or "student" name) through the cached name map and insert
+# parents and child rows with executemany in one transaction. Invalid records
+# are reported as {"index", "error"} dicts in the result instead of aborting
+# the batch. If the database still rejects the batch (e.g. a concurrent insert
+# hit the unique index), the valid rows are retried one transaction each so
+# that only the conflicting rows fail.
+
+def _duplicate_entry_message(data: dict) -> str:
+    return f"This student already has a {data['subject']} entry on {_as_date(data['date']).isoformat()}"
+
+
+def _dialect_insert(session: Session, model):
+    """An INSERT for the session's backend, which supports ``on_conflict_do_update``."""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def _as_date(value) -> date_type:
+    return value if isinstance(value, date_type) else date_type.fromisoformat(value)
+
+
+def _student_ids_for_batch(user_id: int, records: list[dict]) -> dict[str, int]:
+    ids = student_ids_by_name(user_id)
+    if any(_match_student(ids, data) is None for data in records):
+        student_ids.invalidate(user_id)
+        ids = student_ids_by_name(user_id)
+    return ids
+
+
+def _insert_batch(session: Session, model, rows: list[tuple]) -> list[int]:
+    """Insert (index, values, children) rows and their child rows; return the new parent ids."""
+    ids = session.scalars(
+        insert(model).returning(model.id, sort_by_parameter_order=True),
+        [values for _, values, _ in rows],
+    ).all()
+    child_rows: dict = {}
+    for (_, _, children), parent_id in zip(rows, ids):
+        for child_model, fk_name, child_values in children:
+            if child_values:
+                child_rows.setdefault(child_model, []).extend(
+                    {fk_name: parent_id, **values} for values in child_values
+                )
+    for child_model, values in child_rows.items():
+        session.execute(insert(child_model), values)
+    return ids
+
+
+def _bulk_insert(model, rows: list[tuple], errors: list[dict], on_insert=None) -> list[tuple[int, int]]:
+    """Insert rows in one transaction, falling back to one transaction per row on conflict.
+
+    ``on_insert(session, rows)`` runs in each transaction after its rows are inserted.
+    """
+    if not rows:
+        return []
+
+    def insert_rows(batch):
+        def command(session):
+            ids = _insert_batch(session, model, batch)
+            if on_insert:
+                on_insert(session, batch)
+            session.flush()
+            return ids
+        return command
+
+    try:
+        ids = _write(insert_rows(rows))
+        return [(index, new_id) for (index, _, _), new_id in zip(rows, ids)]
+    except IntegrityError:
+        pass
+    inserted = []
+    for row in rows:
+        try:
+            (new_id,) = _write(insert_rows([row]))
+            inserted.append((row[0], new_id))
+        except IntegrityError as exc:
+            errors.append({"index": row[0], "error": str(exc.orig)})
+    return inserted
+
+
+def bulk_create_students(user_id: int, records: list[dict]) -> dict:
+    """Create many students at once; returns {"created": [...], "errors": [...]}.
+
+    Names already used by the user, or earlier in the batch, are reported as errors.
+    """
+    rows, errors = [], []
+    taken = set(student_ids_by_name(user_id))
+    for index, data in enumerate(records):
+        if not data.get("name"):
+            errors.append({"index": index, "error": "Student name is required"})
+            continue
+        if data["name"] in taken:
+            errors.append({"index": index, "error": f"A student named '{data['name']}' already exists"})
+            continue
+        try:
+            age = int(data["age"])
+        except (KeyError, TypeError, ValueError):
+            errors.append({"index": index, "error": f"Invalid age for '{data['name']}'"})
+            continue
+        values = {
+            "name": data["name"],
+            "age": age,
+            "parent_name": data.get("parent_name", ""),
+            "parent_email": data.get("parent_email", ""),
+            "user_id": user_id,
+        }
+        children = [
+            (StudentInterest, "student_id", [{"interest": i} for i in data.get("interests", [])]),
+            (StudentAllergy, "student_id", [{"allergy": a} for a in data.get("allergies", [])]),
+        ]
+        taken.add(data["name"])
+        rows.append((index, values, children))
+
+    inserted = _bulk_insert(Student, rows, errors)
+    by_index = {row[0]: row for row in rows}
+    created = []
+    for index, new_id in inserted:
+        values = by_index[index][1]
+        created.append({
+            "id": new_id,
+            "name": values["name"],
+            "age": values["age"],
+            "interests": list(records[index].get("interests", [])),
+            "allergies": list(records[index].get("allergies", [])),
+            "parent_name": values["parent_name"] or "",
+            "parent_email": values["parent_email"] or "",
+        })
+    if created:
+        bump_version(user_id, reports=True)
+        student_ids.invalidate(user_id)
+    return {"created": created, "errors": sorted(errors, key=lambda e: e["index"])}
+
+
+def bulk_create_observations(user_id: int, records: list[dict]) -> dict:
+    """Create many observations at once; returns {"created": [...], "errors": [...]}."""
+    ids = _student_ids_for_batch(user_id, records)
+    names = {student_id: name for name, student_id in ids.items()}
+
+    rows, errors = [], []
+    for index, data in enumerate(records):
+        student_id = _match_student(ids, data)
+        if student_id is None:
+            errors.append({"index": index, "error": f"Student '{data.get('student_id') or data.get('student')}' not found"})
+            continue
+        try:
+            obs_date = _as_date(data["date"])
+        except (KeyError, TypeError, ValueError):
+            errors.append({"index": index, "error": f"Invalid date {data.get('date')!r}"})
+            continue
+        if not data.get("area"):
+            errors.append({"index": index, "error": "Area is required"})
+            continue
+        values = {
+            "student_id": student_id,
+            "date": obs_date,
+            "area": data["area"],
+            "notes": data.get("notes", ""),
+        }
+        children = [(ObservationSkill, "observation_id", [{"skill": s} for s in data.get("skills", [])])]
+        rows.append((index, values, children))
+
+    inserted = _bulk_insert(Observation, rows, errors)
+    by_index = {row[0]: row for row in rows}
+    created = []
+    for index, new_id in inserted:
+        values = by_index[index][1]
+        created.append({
+            "id": new_id,
+            "student": names[values["student_id"]],
+            "date": values["date"].isoformat(),
+            "area": values["area"],
+            "notes": values["notes"] or "",
+            "skills": list(records[index].get("skills", [])),
+        })
+    if created:
+        bump_version(user_id, reports=True)
+    return {"created": created, "errors": sorted(errors, key=lambda e: e["index"])}
+
+
+def bulk_create_daily_entries(user_id: int, records: list[dict]) -> dict:
+    """Create many daily entries at once; returns {"created": [...], "errors": [...]}.
+
+    Records that repeat an existing (student, date, subject) entry, or another
+    record earlier in the same batch, are reported as errors.
+    """
+    ids = _student_ids_for_batch(user_id, records)
+    names = {student_id: name for name, student_id in ids.items()}
+
+    rows, errors = [], []
     session = get_session()
     try:
-        entry = session.query(DailyEntry).get(entry_id)
-        if entry:
-            session.delete(entry)
-            session.commit()
-    except Exception:
-        session.rollback()
-        raise
+        parsed = []
+        for index, data in enumerate(records):
+            student_id = _match_student(ids, data)
+            if student_id is None:
+                errors.append({"index": index, "error": f"Student '{data.get('student_id') or data.get('student')}' not found"})
+                continue
+            try:
+                entry_date = _as_date(data["date"])
+            except (KeyError, TypeError, ValueError):
+                errors.append({"index": index, "error": f"Invalid date {data.get('date')!r}"})
+                continue
+            if not data.get("subject") or not data.get("skill_level"):
+                errors.append({"index": index, "error": "Subject and skill level are required"})
+                continue
+            parsed.append((index, data, student_id, entry_date))
+
+        existing = set()
+        if parsed:
+            existing = set(session.execute(
+                select(DailyEntry.student_id, DailyEntry.date, DailyEntry.subject).where(
+                    DailyEntry.user_id == user_id,
+                    DailyEntry.student_id.in_({p[2] for p in parsed}),
+                    DailyEntry.date.in_({p[3] for p in parsed}),
+                )
+            ).all())
     finally:
         session.close()
 
+    for index, data, student_id, entry_date in parsed:
+        key = (student_id, entry_date, data["subject"])
+        if key in existing:
+            errors.append({
+                "index": index,
+                "error": f"Entry already exists for {names[student_id]} on {entry_date.isoformat()} with subject {data['subject']}",
+            })
+            continue
+        existing.add(key)
+        values = {
+            "student_id": student_id,
+            "date": entry_date,
+            "subject": data["subject"],
+            "skill_level": data["skill_level"],
+            "notes": data.get("notes", ""),
+            "user_id": user_id,
+        }
+        children = [(DailyActivity, "daily_entry_id", [{"activity": a} for a in data.get("activities", [])])]
+        rows.append((index, values, children))
+
+    def count_weekly(session, inserted_rows):
+        _apply_weekly_rollup(session, user_id, Counter(
+            _rollup_key(values["student_id"], values["date"], values["subject"], values["skill_level"])
+            for _, values, _ in inserted_rows
+        ))
+
+    inserted = _bulk_insert(DailyEntry, rows, errors, on_insert=count_weekly)
+    by_index = {row[0]: row for row in rows}
+    created = []
+    for index, new_id in inserted:
+        values = by_index[index][1]
+        created.append({
+            "id": new_id,
+            "student": names[values["student_id"]],
+            "date": values["date"].isoformat(),
+            "subject": values["subject"],
+            "activities": list(records[index].get("activities", [])),
+            "skill_level": values["skill_level"],
+            "notes": values["notes"] or "",
+        })
+    if created:
+        bump_version(user_id, reports=True)
+    return {"created": created, "errors": sorted(errors, key=lambda e: e["index"])}
+
 
 # ---------------------------------------------------------------------------
 # User Settings
@@ -497,17 +1713,16 @@ def get_user_settings(user_id: int) -> dict | None:
 
 
 def save_user_settings(user_id: int, settings: dict):
-    session = get_session()
-    try:
+    def command(session):
         us = session.query(UserSettings).filter_by(user_id=user_id).first()
         if us:
             us.settings_json = settings
         else:
-            us = UserSettings(user_id=user_id, settings_json=settings)
-            session.add(us)
-        session.commit()
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
+            session.add(UserSettings(user_id=user_id, settings_json=settings))
+        session.flush()
+
+    _write(command)
+
+
+# Time every public function above when MONTY_PROFILE=1 (no-op otherwise)
+instrument_module(globals(), __name__)
@@ -1,10 +1,13 @@
 import hashlib
 import os
+import threading
+from contextlib import contextmanager
 from datetime import date
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, make_url
 from sqlalchemy.orm import Session, sessionmaker
 
+from src.monty.batching import GroupCommitWriter
 from src.monty.models import (
     Base,
     DailyActivity,
@@ -19,34 +22,147 @@ from src.monty.models import (
     User,
     UserSettings,
 )
+from src.monty.search import install_search_indexes
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data")
 DB_PATH = os.path.join(DATA_DIR, "monty.db")
-DATABASE_URL = f"sqlite:///{DB_PATH}"
+DATABASE_URL = os.environ.get("DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+# Set MONTY_SQLITE_TUNING=0 to fall back to SQLite's default journaling and locking.
+SQLITE_TUNING = os.environ.get("MONTY_SQLITE_TUNING", "1") != "0"
+
+# Applied to every new SQLite connection. WAL lets readers proceed while a
+# writer commits, and busy_timeout makes a blocked writer wait instead of
+# failing straight away with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -32768,  # negative means KiB, i.e. 32 MiB per connection
+    "mmap_size": 268435456,
+    "busy_timeout": 5000,
+    "foreign_keys": "ON",
+    "temp_store": "MEMORY",
+}
+
+# Streamlit runs each browser session's script on its own thread, so the pool
+# must hand connections across threads and have room for concurrent reruns.
+POOL_SIZE = int(os.environ.get("MONTY_DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.environ.get("MONTY_DB_MAX_OVERFLOW", "20"))
+
+# Set MONTY_WRITE_QUEUE=1 to send crud writes through one group-commit writer
+# thread (see batching.GroupCommitWriter) instead of committing on each
+# session's script thread. MONTY_WRITE_WINDOW_MS is how long a group stays open.
+WRITE_QUEUE = os.environ.get("MONTY_WRITE_QUEUE", "0") == "1"
+WRITE_WINDOW = float(os.environ.get("MONTY_WRITE_WINDOW_MS", "2")) / 1000
 
 _engine = None
 _SessionFactory = None
+_writer = None
+_engine_lock = threading.Lock()
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url: str = DATABASE_URL, tuned: bool = SQLITE_TUNING):
+    """Build an engine for ``url``; SQLite file databases get the pooled, tuned profile."""
+    options = {"echo": False}
+    parsed = make_url(url)
+    is_sqlite = parsed.get_backend_name() == "sqlite"
+    if is_sqlite:
+        options["connect_args"] = {"check_same_thread": False}
+        if parsed.database and parsed.database != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(parsed.database)), exist_ok=True)
+            options.update(pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW)
+    engine = create_engine(url, **options)
+    if is_sqlite and tuned:
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return engine
 
 
 def get_engine():
     global _engine
     if _engine is None:
-        os.makedirs(DATA_DIR, exist_ok=True)
-        _engine = create_engine(DATABASE_URL, echo=False)
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_db_engine()
     return _engine
 
 
 def get_session() -> Session:
     global _SessionFactory
     if _SessionFactory is None:
-        _SessionFactory = sessionmaker(bind=get_engine())
+        engine = get_engine()
+        with _engine_lock:
+            if _SessionFactory is None:
+                _SessionFactory = sessionmaker(bind=engine)
     return _SessionFactory()
 
 
+def get_writer() -> GroupCommitWriter | None:
+    """The shared group-commit writer, or None when MONTY_WRITE_QUEUE is off."""
+    global _writer
+    if not WRITE_QUEUE:
+        return None
+    if _writer is None:
+        with _engine_lock:
+            if _writer is None:
+                _writer = GroupCommitWriter(get_session, window=WRITE_WINDOW)
+    return _writer
+
+
+class QueryCounter:
+    """Collects the SQL statements executed while a count_queries() block is active."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries():
+    """Count statements sent to the database inside the ``with`` block.
+
+    The listener is attached to the shared engine, so statements issued by
+    other threads during the block are counted as well.
+    """
+    engine = get_engine()
+    counter = QueryCounter()
+
+    def _on_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Fail with AssertionError if the block issues more than ``limit`` statements."""
+    with count_queries() as counter:
+        yield counter
+    if counter.count > limit:
+        listing = "\n".join(counter.statements)
+        raise AssertionError(f"Expected at most {limit} queries, got {counter.count}:\n{listing}")
+
+
 def init_db():
     """Create all tables and seed demo data if the database is empty."""
     engine = get_engine()
     Base.metadata.create_all(engine)
+    install_search_indexes(engine)
     session = get_session()
     try:
         if session.query(User).count() == 0:
@@ -128,6 +244,8 @@ def seed_demo_data(session: Session):
         {"name": "Ethan Brown", "age": 6, "interests": ["Mathematics", "Puzzles"], "allergies": ["Wheat"], "parent_name": "Robert Brown", "parent_email": "robert.b@email.com"},
     ]
 
+    # Children are attached through relationships so the unit of work can
+    # insert each table in one executemany batch instead of flushing per row.
     student_objects = {}
     for sd in students_data:
         student = Student(
@@ -136,16 +254,12 @@ def seed_demo_data(session: Session):
             parent_name=sd["parent_name"],
             parent_email=sd["parent_email"],
             user_id=demo_user.id,
+            interests=[StudentInterest(interest=interest) for interest in sd["interests"]],
+            allergies=[StudentAllergy(allergy=allergy) for allergy in sd["allergies"]],
         )
         session.add(student)
-        session.flush()
         student_objects[sd["name"]] = student
 
-        for interest in sd["interests"]:
-            session.add(StudentInterest(student_id=student.id, interest=interest))
-        for allergy in sd["allergies"]:
-            session.add(StudentAllergy(student_id=student.id, allergy=allergy))
-
     # --- Schedule ---
     schedule_data = [
         {"day": "Monday", "time": "8:30 AM", "activity": "Morning Circle", "duration": 15, "students": "All"},
@@ -185,18 +299,14 @@ def seed_demo_data(session: Session):
     ]
 
     for od in observations_data:
-        student = student_objects[od["student"]]
         obs_date = date.fromisoformat(od["date"])
-        obs = Observation(
-            student_id=student.id,
+        session.add(Observation(
+            student=student_objects[od["student"]],
             date=obs_date,
             area=od["area"],
             notes=od["notes"],
-        )
-        session.add(obs)
-        session.flush()
-        for skill in od["skills"]:
-            session.add(ObservationSkill(observation_id=obs.id, skill=skill))
+            skills=[ObservationSkill(skill=skill) for skill in od["skills"]],
+        ))
 
     # --- Materials ---
     materials_data = [
@@ -0,0 +1,286 @@
+"""Streaming "Export My Data" archives.
+
+    python -m src.monty.export USER_ID OUTPUT.zip [--format jsonl|csv|parquet]
+
+``export_user_data`` writes everything a user owns (students with their
+interests and allergies, observations with skills, schedules, materials and
+their usage events, daily entries with activities and their settings) into
+a zip archive, one member per table plus a ``manifest.json`` of row counts.
+
+Tables are read with server-side cursors (``stream_results``) in chunks of
+``CHUNK_ROWS``; each chunk's child rows are fetched with one ``IN`` query,
+and the chunk is written to the archive before the next one is read. Memory
+therefore tracks the chunk size, not the size of the user's data. JSON Lines
+and CSV members are deflated as they are written. Parquet members get one
+row group per chunk and are stored as-is, since Parquet compresses its own
+columns. The export runs in a single read transaction, so it is a
+consistent snapshot even while the user keeps working.
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+import zipfile
+from datetime import date, datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select
+
+from src.monty.crud import material_usage
+from src.monty.database import get_engine, init_db
+from src.monty.models import (
+    DailyActivity,
+    DailyEntry,
+    Material,
+    MaterialUsageEvent,
+    Observation,
+    ObservationSkill,
+    Schedule,
+    Student,
+    StudentAllergy,
+    StudentInterest,
+    UserSettings,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# format -> (member file extension, zip compression)
+EXPORT_FORMATS = {
+    "jsonl": (".jsonl", zipfile.ZIP_DEFLATED),
+    "csv": (".csv", zipfile.ZIP_DEFLATED),
+    "parquet": (".parquet", zipfile.ZIP_STORED),
+}
+
+CHUNK_ROWS = 1000
+
+_STRINGS = pa.list_(pa.string())
+
+
+def _tables(user_id: int) -> list[tuple[str, object, dict, list[tuple]]]:
+    """(name, query, {column: Arrow type}, [(list column, child foreign key, child value)]) for each table."""
+    return [
+        (
+            "students",
+            select(Student.id, Student.name, Student.age, Student.parent_name, Student.parent_email)
+            .where(Student.user_id == user_id)
+            .order_by(Student.id),
+            {"id": pa.int64(), "name": pa.string(), "age": pa.int64(), "parent_name": pa.string(),
+             "parent_email": pa.string(), "interests": _STRINGS, "allergies": _STRINGS},
+            [("interests", StudentInterest.student_id, StudentInterest.interest),
+             ("allergies", StudentAllergy.student_id, StudentAllergy.allergy)],
+        ),
+        (
+            "observations",
+            select(Observation.id, Observation.student_id, Observation.date, Observation.area, Observation.notes)
+            .join(Student, Student.id == Observation.student_id)
+            .where(Student.user_id == user_id)
+            .order_by(Observation.id),
+            {"id": pa.int64(), "student_id": pa.int64(), "date": pa.date32(), "area": pa.string(),
+             "notes": pa.string(), "skills": _STRINGS},
+            [("skills", ObservationSkill.observation_id, ObservationSkill.skill)],
+        ),
+        (
+            "schedules",
+            select(Schedule.id, Schedule.day, Schedule.time, Schedule.activity, Schedule.duration,
+                   Schedule.students_group)
+            .where(Schedule.user_id == user_id)
+            .order_by(Schedule.id),
+            {"id": pa.int64(), "day": pa.string(), "time": pa.string(), "activity": pa.string(),
+             "duration": pa.int64(), "students_group": pa.string()},
+            [],
+        ),
+        (
+            "materials",
+            select(Material.id, Material.name, Material.category, Material.age_range, Material.description,
+                   Material.in_stock, Material.times_used)
+            .where(Material.user_id == user_id)
+            .order_by(Material.id),
+            {"id": pa.int64(), "name": pa.string(), "category": pa.string(), "age_range": pa.string(),
+             "description": pa.string(), "in_stock": pa.bool_(), "times_used": pa.int64()},
+            [],
+        ),
+        (
+            "material_usage_events",
+            select(MaterialUsageEvent.id, MaterialUsageEvent.material_id, MaterialUsageEvent.student_id,
+                   MaterialUsageEvent.used_on, MaterialUsageEvent.used_at)
+            .where(MaterialUsageEvent.user_id == user_id)
+            .order_by(MaterialUsageEvent.id),
+            {"id": pa.int64(), "material_id": pa.int64(), "student_id": pa.int64(), "used_on": pa.date32(),
+             "used_at": pa.timestamp("us")},
+            [],
+        ),
+        (
+            "daily_entries",
+            select(DailyEntry.id, DailyEntry.student_id, DailyEntry.date, DailyEntry.subject,
+                   DailyEntry.skill_level, DailyEntry.notes)
+            .where(DailyEntry.user_id == user_id)
+            .order_by(DailyEntry.id),
+            {"id": pa.int64(), "student_id": pa.int64(), "date": pa.date32(), "subject": pa.string(),
+             "skill_level": pa.string(), "notes": pa.string(), "activities": _STRINGS},
+            [("activities", DailyActivity.daily_entry_id, DailyActivity.activity)],
+        ),
+        (
+            "settings",
+            select(UserSettings.settings_json.label("settings")).where(UserSettings.user_id == user_id),
+            # Nested settings are kept as a JSON document in CSV and Parquet
+            {"settings": pa.string()},
+            [],
+        ),
+    ]
+
+
+def _chunks(connection, query, children, chunk_rows: int):
+    """Yield the query's rows as lists of dicts, ``chunk_rows`` at a time, with child values attached as lists."""
+    result = connection.execution_options(stream_results=True, yield_per=chunk_rows).execute(query)
+    for rows in result.mappings().partitions():
+        records = [dict(row) for row in rows]
+        ids = [record["id"] for record in records] if children else []
+        for column, foreign_key, value in children:
+            grouped = {}
+            for parent_id, item in connection.execute(
+                select(foreign_key, value).where(foreign_key.in_(ids)).order_by(foreign_key, foreign_key.table.c.id)
+            ):
+                grouped.setdefault(parent_id, []).append(item)
+            for record in records:
+                record[column] = grouped.get(record["id"], [])
+        yield records
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _write_jsonl(member, columns, chunks) -> int:
+    rows = 0
+    for chunk in chunks:
+        member.write("".join(
+            json.dumps(record, default=_json_default, ensure_ascii=False) + "\n" for record in chunk
+        ).encode("utf-8"))
+        rows += len(chunk)
+    return rows
+
+
+def _csv_cell(value):
+    # Lists and nested settings are written as JSON so they survive the round trip
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_json_default, ensure_ascii=False)
+    return value
+
+
+def _write_csv(member, columns, chunks) -> int:
+    rows = 0
+    text = io.TextIOWrapper(member, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    for chunk in chunks:
+        writer.writerows([_csv_cell(record[column]) for column in columns] for record in chunk)
+        rows += len(chunk)
+    text.flush()
+    text.detach()
+    return rows
+
+
+def _write_parquet(member, columns, chunks) -> int:
+    rows = 0
+    schema = pa.schema(list(columns.items()))
+    with pq.ParquetWriter(member, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            nested = [column for column, value in chunk[0].items() if isinstance(value, dict)]
+            for record in chunk:
+                for column in nested:
+                    record[column] = json.dumps(record[column], ensure_ascii=False)
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+_WRITERS = {"jsonl": _write_jsonl, "csv": _write_csv, "parquet": _write_parquet}
+
+
+def peak_rss_bytes() -> int | None:
+    """The process's peak resident set size so far, or None where the platform does not report it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def export_user_data(user_id: int, file, fmt: str = "jsonl", chunk_rows: int = CHUNK_ROWS,
+                     on_progress=None) -> dict:
+    """Write ``user_id``'s data to ``file`` as a zip of ``fmt`` members; returns the export's statistics.
+
+    ``on_progress(done, total, table)`` is called after each table. The result is
+    {"format", "tables" ({table: rows}), "rows", "bytes", "seconds",
+    "rows_per_second", "peak_rss_bytes", "rss_growth_bytes"}. Peak RSS is
+    the process high-water mark, so "rss_growth_bytes" (how far the export
+    raised it) is the export's own footprint only if it set a new peak.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+    extension, compression = EXPORT_FORMATS[fmt]
+    write = _WRITERS[fmt]
+    # Buffered usage events are written first so the export includes them
+    material_usage.flush()
+    rss_before = peak_rss_bytes()
+    started = time.perf_counter()
+    counts = {}
+    with get_engine().connect() as connection, connection.begin():
+        with zipfile.ZipFile(file, "w", compression=compression) as archive:
+            tables = _tables(user_id)
+            for done, (name, query, columns, children) in enumerate(tables, start=1):
+                with archive.open(f"{name}{extension}", "w") as member:
+                    counts[name] = write(member, columns, _chunks(connection, query, children, chunk_rows))
+                if on_progress:
+                    on_progress(done, len(tables), name)
+            archive.writestr("manifest.json", json.dumps({
+                "user_id": user_id,
+                "exported_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                "format": fmt,
+                "tables": counts,
+            }, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+    seconds = time.perf_counter() - started
+    rows = sum(counts.values())
+    rss_after = peak_rss_bytes()
+    return {
+        "format": fmt,
+        "tables": counts,
+        "rows": rows,
+        "bytes": file.tell() if hasattr(file, "tell") else None,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else 0.0,
+        "peak_rss_bytes": rss_after,
+        "rss_growth_bytes": rss_after - rss_before if rss_after is not None else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("user_id", type=int)
+    parser.add_argument("output", help="zip file to write")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="jsonl")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    init_db()
+    with open(args.output, "wb") as file:
+        stats = export_user_data(args.user_id, file, args.format, args.chunk_rows)
+    for table, rows in stats["tables"].items():
+        print(f"  {table:<16}{rows:>10} rows")
+    print(f"Exported {stats['rows']} rows to {args.output} ({stats['bytes'] / 1024:.0f} KB) in "
+          f"{stats['seconds']:.2f}s: {stats['rows_per_second']:,.0f} rows/s")
+    if stats["peak_rss_bytes"] is not None:
+        print(f"Peak RSS {stats['peak_rss_bytes'] / 2**20:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
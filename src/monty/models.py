@@ -6,6 +6,7 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     JSON,
     String,
@@ -49,6 +50,9 @@ class UserSettings(Base):
 
 class Student(Base):
     __tablename__ = "students"
+    __table_args__ = (
+        Index("uq_students_user_id_name", "user_id", "name", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(200), nullable=False)
@@ -68,7 +72,7 @@ class StudentInterest(Base):
     __tablename__ = "student_interests"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False, index=True)
     interest = Column(String(200), nullable=False)
 
     student = relationship("Student", back_populates="interests")
@@ -78,7 +82,7 @@ class StudentAllergy(Base):
     __tablename__ = "student_allergies"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False, index=True)
     allergy = Column(String(200), nullable=False)
 
     student = relationship("Student", back_populates="allergies")
@@ -86,6 +90,9 @@ class StudentAllergy(Base):
 
 class Observation(Base):
     __tablename__ = "observations"
+    __table_args__ = (
+        Index("ix_observations_student_id_date", "student_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -101,7 +108,7 @@ class ObservationSkill(Base):
     __tablename__ = "observation_skills"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    observation_id = Column(Integer, ForeignKey("observations.id"), nullable=False)
+    observation_id = Column(Integer, ForeignKey("observations.id"), nullable=False, index=True)
     skill = Column(String(200), nullable=False)
 
     observation = relationship("Observation", back_populates="skills")
@@ -116,13 +123,16 @@ class Schedule(Base):
     activity = Column(String(200), nullable=False)
     duration = Column(Integer, nullable=False)
     students_group = Column(String(100), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
 
     user = relationship("User", back_populates="schedules")
 
 
 class Material(Base):
     __tablename__ = "materials"
+    __table_args__ = (
+        Index("ix_materials_user_id_category", "user_id", "category"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(200), nullable=False)
@@ -138,6 +148,10 @@ class Material(Base):
 
 class DailyEntry(Base):
     __tablename__ = "daily_entries"
+    __table_args__ = (
+        Index("ix_daily_entries_user_id_date", "user_id", "date"),
+        Index("uq_daily_entries_student_date_subject", "student_id", "date", "subject", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -156,7 +170,50 @@ class DailyActivity(Base):
     __tablename__ = "daily_activities"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    daily_entry_id = Column(Integer, ForeignKey("daily_entries.id"), nullable=False)
+    daily_entry_id = Column(Integer, ForeignKey("daily_entries.id"), nullable=False, index=True)
     activity = Column(String(200), nullable=False)
 
     daily_entry = relationship("DailyEntry", back_populates="activities")
+
+
+class MaterialUsageEvent(Base):
+    # Append-only; material_usage_daily holds the per-day counts
+    __tablename__ = "material_usage_events"
+    __table_args__ = (
+        Index("ix_material_usage_events_user_id_used_on", "user_id", "used_on"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    material_id = Column(Integer, ForeignKey("materials.id", ondelete="CASCADE"), nullable=False, index=True)
+    student_id = Column(Integer, ForeignKey("students.id", ondelete="SET NULL"), nullable=True)
+    used_on = Column(Date, nullable=False)
+    used_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+
+class MaterialUsageDaily(Base):
+    __tablename__ = "material_usage_daily"
+    __table_args__ = (
+        Index("ix_material_usage_daily_user_id_used_on", "user_id", "used_on"),
+    )
+
+    material_id = Column(Integer, ForeignKey("materials.id", ondelete="CASCADE"), primary_key=True)
+    used_on = Column(Date, primary_key=True)
+    uses = Column(Integer, nullable=False, default=0)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+
+class WeeklySkillRollup(Base):
+    # Daily entries counted per student, ISO week (its Monday), subject and
+    # skill level; kept in step by the crud daily-entry writes
+    __tablename__ = "weekly_skill_rollups"
+    __table_args__ = (
+        Index("ix_weekly_skill_rollups_user_id_week_start", "user_id", "week_start"),
+    )
+
+    student_id = Column(Integer, ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    week_start = Column(Date, primary_key=True)
+    subject = Column(String(100), primary_key=True)
+    skill_level = Column(String(50), primary_key=True)
+    sessions = Column(Integer, nullable=False, default=0)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
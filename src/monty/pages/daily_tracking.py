@@ -1,12 +1,25 @@
 import streamlit as st
 from datetime import datetime, timedelta
 import time
-from src.monty.session import init_session_state, require_auth, reload_from_db, flash, show_flash
-from src.monty.crud import create_daily_entry, update_daily_entry
+import zipfile
+from src.monty.session import (
+    discard_temp_file,
+    init_session_state,
+    require_auth,
+    upsert_record,
+    flash,
+    show_flash,
+    rerun_fragment,
+    open_in_form,
+)
+from src.monty.profiling import profiled_fragment, profiled_render
+from src.monty.reporting import FORMATS, file_name, mime_type, render_stream, rewound, spool, spool_file, write_member
+from src.monty.crud import upsert_daily_entry, update_daily_entry, list_daily_entries_in_range, list_weekly_rollup
 
 
+@profiled_render("Daily Tracking")
 def render():
-    init_session_state()
+    init_session_state("students", "daily_entries")
     require_auth()
     
     st.set_page_config(page_title="Daily Tracking - Monty", page_icon="📝", layout="wide")
@@ -57,6 +70,8 @@ def render_main_content():
         render_newsletter()
 
 
+@st.fragment(key="daily_entry_form")
+@profiled_fragment("Daily Tracking", "daily_entry_form")
 def render_add_entry():
     st.subheader("➕ Add Daily Entry")
     
@@ -88,20 +103,24 @@ def render_add_entry():
         with col_save:
             if st.button("Update Entry", use_container_width=True):
                 user_id = st.session_state.user["db_id"]
-                update_daily_entry(entry["id"], user_id, {
-                    "student": student, "date": date.strftime("%Y-%m-%d"),
-                    "subject": subject, "activities": activities,
-                    "skill_level": skill_level, "notes": notes,
-                })
-                del st.session_state.edit_entry
-                reload_from_db()
-                flash("Entry updated successfully!")
-                st.rerun()
+                try:
+                    updated = update_daily_entry(entry["id"], user_id, {
+                        "student_id": get_student_id(student), "date": date.strftime("%Y-%m-%d"),
+                        "subject": subject, "activities": activities,
+                        "skill_level": skill_level, "notes": notes,
+                    })
+                except ValueError as exc:
+                    st.error(str(exc))
+                else:
+                    del st.session_state.edit_entry
+                    upsert_record("daily_entries", updated)
+                    flash("Entry updated successfully!")
+                    st.rerun()
         
         with col_cancel:
             if st.button("Cancel Edit", use_container_width=True):
                 del st.session_state.edit_entry
-                st.rerun()
+                rerun_fragment()
     
     else:
         col1, col2 = st.columns(2)
@@ -120,27 +139,27 @@ def render_add_entry():
         notes = st.text_area("Notes", placeholder="Document what the student worked on today...", height=150)
         
         date_str = date.strftime("%Y-%m-%d") if date else None
-        existing_entry = any(
-            e["student"] == student and e["date"] == date_str and e["subject"] == subject
-            for e in st.session_state.daily_entries
-        )
+        # Advisory only: the unique (student, date, subject) index decides, and the upsert replaces
+        existing_entry = st.session_state.daily_entries.first(
+            student=student, date=date_str, subject=subject
+        ) is not None
         
         if existing_entry:
-            st.warning(f"Entry already exists for {student} on {date_str} with subject {subject}")
+            st.warning(f"Entry already exists for {student} on {date_str} with subject {subject}. Saving will replace it.")
         
-        if st.button("Save Entry", use_container_width=True, disabled=existing_entry):
+        if st.button("Replace Entry" if existing_entry else "Save Entry", use_container_width=True):
             if not student:
                 st.error("Please select a student!")
             elif not activities:
                 st.error("Please add at least one activity!")
             else:
                 user_id = st.session_state.user["db_id"]
-                create_daily_entry(user_id, {
-                    "student": student, "date": date_str,
+                saved = upsert_daily_entry(user_id, {
+                    "student_id": get_student_id(student), "date": date_str,
                     "subject": subject, "activities": activities,
                     "skill_level": skill_level, "notes": notes,
                 })
-                reload_from_db()
+                upsert_record("daily_entries", saved)
                 flash(f"Entry for {student} saved successfully!")
                 st.rerun()
 
@@ -165,35 +184,27 @@ def render_week_view():
     
     st.markdown(f"**Week of {week_dates[0].strftime('%B %d, %Y')} - {week_dates[-1].strftime('%B %d, %Y')}**")
     
-    week_strs = [d.strftime("%Y-%m-%d") for d in week_dates]
-    
     student_filter = st.selectbox("Filter by student", ["All Students"] + [s["name"] for s in st.session_state.students])
+    student_id = get_student_id(student_filter)
     
-    if student_filter == "All Students":
-        entries = [e for e in st.session_state.daily_entries if e["date"] in week_strs]
-    else:
-        entries = [e for e in st.session_state.daily_entries if e["date"] in week_strs and e["student"] == student_filter]
+    user_id = st.session_state.user["db_id"]
+    entries_by_student = list_daily_entries_in_range(user_id, week_dates[0], week_dates[-1], student_id)
+    entry_count = sum(len(day) for days in entries_by_student.values() for day in days.values())
     
-    if not entries:
+    if not entry_count:
         st.info("No entries found for this week.")
         return
     
-    st.markdown(f"**{len(entries)} entry(s) found**")
+    st.markdown(f"**{entry_count} entry(s) found**")
     
     if student_filter == "All Students":
-        student_entries = {}
-        for entry in entries:
-            if entry["student"] not in student_entries:
-                student_entries[entry["student"]] = []
-            student_entries[entry["student"]].append(entry)
-        
-        for student_name, student_entries_list in sorted(student_entries.items()):
+        for student_name, entries_by_day in entries_by_student.items():
             with st.container(border=True):
                 st.subheader(f"👤 {student_name}")
                 
                 for day_idx, day_date in enumerate(week_dates):
                     day_str = day_date.strftime("%Y-%m-%d")
-                    day_entries = [e for e in student_entries_list if e["date"] == day_str]
+                    day_entries = entries_by_day.get(day_str, [])
                     
                     if day_entries:
                         day_name = day_date.strftime("%A")
@@ -211,17 +222,17 @@ def render_week_view():
                                     skill_emoji = {"Emerging": "🌱", "Developing": "🌿", "Proficient": "🌳", "Advanced": "⭐"}
                                     st.write(f"{skill_emoji.get(entry['skill_level'], '')} {entry['skill_level']}")
                                 with col4:
-                                    if st.button("Edit", key=f"edit_{entry['id']}", use_container_width=True):
-                                        st.session_state.edit_entry = entry
-                                        st.rerun()
+                                    st.button("Edit", key=f"edit_{entry['id']}", use_container_width=True,
+                                              on_click=open_in_form, args=("edit_entry", entry, "daily_entry_form"))
                                 
                                 if entry["notes"]:
                                     st.write(f"📝 {entry['notes']}")
                                 st.markdown("---")
     else:
+        entries_by_day = entries_by_student.get(student_filter, {})
         for day_idx, day_date in enumerate(week_dates):
             day_str = day_date.strftime("%Y-%m-%d")
-            day_entries = [e for e in entries if e["date"] == day_str]
+            day_entries = entries_by_day.get(day_str, [])
             
             if day_entries:
                 day_name = day_date.strftime("%A")
@@ -239,9 +250,8 @@ def render_week_view():
                             skill_emoji = {"Emerging": "🌱", "Developing": "🌿", "Proficient": "🌳", "Advanced": "⭐"}
                             st.write(f"{skill_emoji.get(entry['skill_level'], '')} {entry['skill_level']}")
                         with col4:
-                            if st.button("Edit", key=f"edit_{entry['id']}", use_container_width=True):
-                                st.session_state.edit_entry = entry
-                                st.rerun()
+                            st.button("Edit", key=f"edit_{entry['id']}", use_container_width=True,
+                                      on_click=open_in_form, args=("edit_entry", entry, "daily_entry_form"))
                         
                         if entry["notes"]:
                             st.write(f"📝 {entry['notes']}")
@@ -254,144 +264,175 @@ def render_newsletter():
     col1, col2 = st.columns(2)
     
     with col1:
-        newsletter_type = st.radio("Newsletter Type", ["Individual Student", "Whole Class"])
+        newsletter_type = st.radio("Newsletter Type", ["Individual Student", "Whole Class", "Every Family (Batch)"])
     
     with col2:
         week_offset = st.number_input("Week offset for newsletter", min_value=-4, max_value=0, value=0, format="%d")
+        fmt = st.selectbox("Download format", list(FORMATS), format_func=str.capitalize)
     
     today = datetime.now().date()
     start_of_week = today - timedelta(days=today.weekday())
     selected_week_start = start_of_week + timedelta(days=week_offset * 7)
     week_dates = [selected_week_start + timedelta(days=i) for i in range(7)]
-    week_strs = [d.strftime("%Y-%m-%d") for d in week_dates]
+    user_id = st.session_state.user["db_id"]
     
     if newsletter_type == "Individual Student":
         selected_student = st.selectbox("Select Student", [s["name"] for s in st.session_state.students])
         
-        student_obj = next((s for s in st.session_state.students if s["name"] == selected_student), None)
+        student_obj = st.session_state.students.first(name=selected_student)
         
         if student_obj:
             st.write(f"**Parent:** {student_obj['parent_name']} ({student_obj['parent_email']})")
         
-        entries = [e for e in st.session_state.daily_entries if e["date"] in week_strs and e["student"] == selected_student]
+        entries_by_student = list_daily_entries_in_range(user_id, week_dates[0], week_dates[-1], get_student_id(selected_student))
+        entries = flatten_entries(entries_by_student)
         
         if not entries:
             st.info(f"No entries found for {selected_student} this week.")
             return
         
-        newsletter_content = generate_individual_newsletter(selected_student, student_obj, entries, week_dates)
+        week_rollup = list_weekly_rollup(user_id, week_dates[0], week_dates[-1], get_student_id(selected_student))
+        skill_counts = rollup_counts(week_rollup, "skill_level")
+        newsletter_content = "".join(
+            generate_individual_newsletter(selected_student, student_obj, entries, week_dates, skill_counts)
+        )
         
         st.text_area("Newsletter Preview", value=newsletter_content, height=300)
         
-        st.download_button("📥 Download Newsletter (Markdown)", newsletter_content, 
-                          file_name=f"newsletter_{selected_student.lower().replace(' ', '_')}_{week_dates[0].strftime('%Y%m%d')}.md",
-                          mime="text/markdown")
+        st.download_button(f"📥 Download Newsletter ({fmt.capitalize()})",
+                          lambda: spool(generate_individual_newsletter(
+                              selected_student, student_obj, entries, week_dates, skill_counts, fmt)),
+                          file_name=file_name(newsletter_stem(selected_student, week_dates), fmt),
+                          mime=mime_type(fmt))
+    
+    elif newsletter_type == "Every Family (Batch)":
+        render_newsletter_batch(user_id, week_dates, fmt)
     
     else:
         st.write("**Whole Class Newsletter**")
         
-        all_entries = [e for e in st.session_state.daily_entries if e["date"] in week_strs]
+        all_entries = flatten_entries(list_daily_entries_in_range(user_id, week_dates[0], week_dates[-1]))
         
         if not all_entries:
             st.info("No entries found this week.")
             return
         
-        newsletter_content = generate_class_newsletter(all_entries, week_dates, st.session_state.students)
+        subject_counts = rollup_counts(list_weekly_rollup(user_id, week_dates[0], week_dates[-1]), "subject")
+        newsletter_content = "".join(generate_class_newsletter(all_entries, week_dates, subject_counts))
         
         st.text_area("Newsletter Preview", value=newsletter_content, height=300)
         
-        st.download_button("📥 Download Class Newsletter (Markdown)", newsletter_content,
-                          file_name=f"class_newsletter_{week_dates[0].strftime('%Y%m%d')}.md",
-                          mime="text/markdown")
+        st.download_button(f"📥 Download Class Newsletter ({fmt.capitalize()})",
+                          lambda: spool(generate_class_newsletter(all_entries, week_dates, subject_counts, fmt)),
+                          file_name=file_name(f"class_newsletter_{week_dates[0].strftime('%Y%m%d')}", fmt),
+                          mime=mime_type(fmt))
 
 
-def generate_individual_newsletter(student_name, student_obj, entries, week_dates):
-    content = f"# Weekly Update for {student_name}\n\n"
-    content += f"**Week of {week_dates[0].strftime('%B %d, %Y')} - {week_dates[-1].strftime('%B %d, %Y')}**\n\n"
-    
-    if student_obj:
-        content += f"**Parent:** {student_obj['parent_name']}\n\n"
-    
-    content += "---\n\n"
-    content += "## This Week's Activities\n\n"
-    
-    subject_entries = {}
-    for entry in entries:
-        if entry["subject"] not in subject_entries:
-            subject_entries[entry["subject"]] = []
-        subject_entries[entry["subject"]].append(entry)
-    
-    for subject, subject_entries_list in sorted(subject_entries.items()):
-        content += f"### {subject}\n"
-        for entry in subject_entries_list:
-            date_obj = datetime.strptime(entry["date"], "%Y-%m-%d")
-            content += f"- **{date_obj.strftime('%A, %b %d')}**: {', '.join(entry['activities'])} ({entry['skill_level']})\n"
-            if entry["notes"]:
-                content += f"  - {entry['notes']}\n"
-        content += "\n"
-    
-    content += "---\n\n"
-    content += "## Skills Development\n\n"
-    
-    skill_counts = {}
-    for entry in entries:
-        skill_level = entry["skill_level"]
-        if skill_level not in skill_counts:
-            skill_counts[skill_level] = 0
-        skill_counts[skill_level] += 1
-    
-    for skill, count in sorted(skill_counts.items()):
-        content += f"- {skill}: {count} sessions\n"
-    
-    content += "\n---\n\n"
-    content += "*Thank you for being part of our Montessori community!*\n"
-    
-    return content
+def render_newsletter_batch(user_id, week_dates, fmt):
+    st.write("**Individual newsletters for every family, in one zip**")
+    
+    archive_name = f"newsletters_{week_dates[0].strftime('%Y%m%d')}_{fmt}.zip"
+    
+    if st.button("📦 Build All Newsletters", use_container_width=True):
+        progress = st.progress(0.0, text="Loading this week's entries...")
+        # One grouped query for the whole class instead of one per student
+        entries_by_student = list_daily_entries_in_range(user_id, week_dates[0], week_dates[-1])
+        week_rollup = list_weekly_rollup(user_id, week_dates[0], week_dates[-1])
+        
+        def on_progress(done, total, student_name):
+            progress.progress(done / total, text=f"Wrote {done} of {total}: {student_name}")
+        
+        # Spooled to disk past SPOOL_MAX_BYTES instead of kept in session state as bytes
+        file = spool_file()
+        written = write_newsletter_archive(
+            file, entries_by_student, week_rollup, week_dates, st.session_state.students, fmt, on_progress
+        )
+        progress.empty()
+        size = file.tell()
+        discard_temp_file("newsletter_archive")
+        st.session_state.newsletter_archive = {
+            "name": archive_name, "file": rewound(file), "size": size, "written": written,
+            "skipped": len(st.session_state.students) - written,
+        }
+    
+    archive = st.session_state.get("newsletter_archive")
+    if not archive or archive["name"] != archive_name:
+        return
+    
+    if not archive["written"]:
+        st.info("No entries found this week.")
+        return
+    
+    st.success(f"Built {archive['written']} newsletters ({archive['size'] / 1024:.0f} KB)")
+    if archive["skipped"]:
+        st.caption(f"{archive['skipped']} student(s) had no entries this week and were left out.")
+    
+    file = archive["file"]
+    st.download_button("📥 Download All Newsletters (Zip)", lambda: file,
+                      file_name=archive["name"], mime="application/zip")
 
 
-def generate_class_newsletter(entries, week_dates, students):
-    content = f"# Weekly Class Update\n\n"
-    content += f"**Week of {week_dates[0].strftime('%B %d, %Y')} - {week_dates[-1].strftime('%B %d, %Y')}**\n\n"
-    
-    content += "---\n\n"
-    content += "## Class Highlights\n\n"
-    
-    student_entries = {}
-    for entry in entries:
-        if entry["student"] not in student_entries:
-            student_entries[entry["student"]] = []
-        student_entries[entry["student"]].append(entry)
-    
-    for student_name, student_entries_list in sorted(student_entries.items()):
-        content += f"### {student_name}\n"
-        subjects = set(e["subject"] for e in student_entries_list)
-        content += f"- Explored: {', '.join(sorted(subjects))}\n"
-        
-        activities_flat = []
-        for e in student_entries_list:
-            activities_flat.extend(e["activities"])
-        unique_activities = list(set(activities_flat))[:5]
-        content += f"- Highlights: {', '.join(unique_activities)}\n"
-        content += "\n"
-    
-    content += "---\n\n"
-    content += "## Subject Overview\n\n"
-    
-    subject_counts = {}
-    for entry in entries:
-        if entry["subject"] not in subject_counts:
-            subject_counts[entry["subject"]] = 0
-        subject_counts[entry["subject"]] += 1
-    
-    for subject, count in sorted(subject_counts.items(), key=lambda x: -x[1]):
-        content += f"- {subject}: {count} sessions\n"
-    
-    content += "\n---\n\n"
-    content += f"**Total Entries This Week:** {len(entries)}\n\n"
-    content += "---\n\n"
-    content += "*Thank you for being part of our Montessori community!*\n"
-    
-    return content
+def write_newsletter_archive(file, entries_by_student, week_rollup, week_dates, students, fmt, on_progress=None):
+    """Write every student's newsletter and the class newsletter into a zip; returns how many students were written.
+
+    Each newsletter is compressed into ``file`` chunk by chunk as its
+    template renders, so no newsletter is ever held whole in memory.
+    """
+    suffix = week_dates[0].strftime("%Y%m%d")
+    total = len(entries_by_student)
+    all_entries = []
+    with zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for done, (student_name, days) in enumerate(entries_by_student.items(), start=1):
+            entries = [e for day in days.values() for e in day]
+            all_entries.extend(entries)
+            skill_counts = rollup_counts(week_rollup, "skill_level", student=student_name)
+            write_member(archive, file_name(newsletter_stem(student_name, week_dates), fmt), generate_individual_newsletter(
+                student_name, students.first(name=student_name), entries, week_dates, skill_counts, fmt
+            ))
+            if on_progress:
+                on_progress(done, total, student_name)
+        if all_entries:
+            subject_counts = rollup_counts(week_rollup, "subject")
+            write_member(archive, file_name(f"class_newsletter_{suffix}", fmt),
+                         generate_class_newsletter(all_entries, week_dates, subject_counts, fmt))
+    return total
+
+
+def newsletter_stem(student_name, week_dates):
+    return f"newsletter_{student_name.lower().replace(' ', '_')}_{week_dates[0].strftime('%Y%m%d')}"
+
+
+def get_student_id(student_name):
+    student = st.session_state.students.first(name=student_name)
+    return student["id"] if student else None
+
+
+def flatten_entries(entries_by_student):
+    return [e for days in entries_by_student.values() for day in days.values() for e in day]
+
+
+def rollup_counts(rollup, field, student=None):
+    """Sessions per value of ``field`` ("subject" or "skill_level") in weekly rollup rows, optionally for one student."""
+    counts = {}
+    for row in rollup:
+        if student is None or row["student"] == student:
+            counts[row[field]] = counts.get(row[field], 0) + row["sessions"]
+    return counts
+
+
+def generate_individual_newsletter(student_name, student_obj, entries, week_dates, skill_counts, fmt="markdown"):
+    """The student's weekly newsletter, yielded in chunks as the template renders."""
+    return render_stream(
+        "student_newsletter.j2", fmt, student_name=student_name, student=student_obj,
+        entries=entries, week_dates=week_dates, skill_counts=skill_counts,
+    )
+
+
+def generate_class_newsletter(entries, week_dates, subject_counts, fmt="markdown"):
+    """The whole-class weekly newsletter, yielded in chunks as the template renders."""
+    return render_stream(
+        "class_newsletter.j2", fmt, entries=entries, week_dates=week_dates, subject_counts=subject_counts,
+    )
 
 
 if __name__ == "__main__":
@@ -1,11 +1,14 @@
 import streamlit as st
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 
 from src.monty.session import init_session_state, require_auth, logout_user, show_flash
+from src.monty.profiling import profiled_render
+from src.monty.crud import list_weekly_rollup, material_usage_summary
 
 
+@profiled_render("Dashboard")
 def render():
-    init_session_state()
+    init_session_state("students", "observations")
     require_auth()
     
     st.set_page_config(
@@ -89,16 +92,32 @@ def get_time_greeting():
 def render_stats_cards():
     st.subheader("📊 Today's Overview")
     
+    today = date.today().isoformat()
+    user_id = st.session_state.user["db_id"]
+    usage = material_usage_summary(user_id)
+    this_week, last_week = weekly_sessions(user_id)
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Students", len(st.session_state.students), "+0 today")
+        st.metric("Students", len(st.session_state.students))
     with col2:
-        st.metric("Observations", len(st.session_state.observations), "+0 today")
+        st.metric("Observations", len(st.session_state.observations),
+                  f"+{len(st.session_state.observations.where(date=today))} today")
     with col3:
-        st.metric("Activities", len(st.session_state.daily_entries), "+0 today")
+        st.metric("Activities This Week", this_week, f"{this_week - last_week:+d} vs last week")
     with col4:
-        st.metric("Materials Used", 0, "+0 today")
+        st.metric("Materials Used", usage["total_uses"], f"+{usage['today']} today")
+
+
+def weekly_sessions(user_id):
+    """Daily entries logged this ISO week and last, summed from the weekly rollup."""
+    monday = date.today() - timedelta(days=date.today().weekday())
+    last_monday = monday - timedelta(weeks=1)
+    totals = {last_monday.isoformat(): 0, monday.isoformat(): 0}
+    for row in list_weekly_rollup(user_id, last_monday, monday):
+        totals[row["week_start"]] += row["sessions"]
+    return totals[monday.isoformat()], totals[last_monday.isoformat()]
 
 
 def render_quick_actions():
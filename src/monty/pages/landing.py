@@ -2,8 +2,10 @@ import streamlit as st
 
 from src.monty.auth import login
 from src.monty.session import init_session_state
+from src.monty.profiling import profiled_render
 
 
+@profiled_render("Landing")
 def render():
     init_session_state()
     
@@ -1,11 +1,33 @@
 import streamlit as st
 
-from src.monty.session import init_session_state, require_auth, reload_from_db, flash, show_flash
-from src.monty.crud import create_material, update_material, increment_material_usage
+from src.monty.session import (
+    PAGE_SIZES,
+    init_session_state,
+    require_auth,
+    upsert_record,
+    flash,
+    show_flash,
+    pager_cursor,
+    render_pager,
+    rerun_fragment,
+    open_in_form,
+)
+from src.monty.profiling import profiled_fragment, profiled_render
+from src.monty.crud import (
+    create_material,
+    update_material,
+    increment_material_usage,
+    material_usage_summary,
+    page_materials,
+    search_materials,
+)
 
+SEARCH_LIMIT = 60
 
+
+@profiled_render("Materials")
 def render():
-    init_session_state()
+    init_session_state("materials", "students")
     require_auth()
     
     st.set_page_config(page_title="Materials - Monty", page_icon="📦", layout="wide")
@@ -56,7 +78,10 @@ def render_main_content():
         render_usage_statistics()
 
 
+@st.fragment(key="material_grid")
+@profiled_fragment("Materials", "material_grid")
 def render_browse_materials():
+    show_flash()
     categories = ["All", "Practical Life", "Sensorial", "Language", "Mathematics", "Art", "Science"]
     
     col1, col2 = st.columns([3, 1])
@@ -69,37 +94,61 @@ def render_browse_materials():
         search = st.text_input("Search", placeholder="Search...")
         st.session_state.material_search = search
     
-    materials = get_filtered_materials()
+    materials, total, page = get_filtered_materials()
     
-    if not materials:
+    if not total:
         st.info("No materials found matching your criteria.")
         return
     
-    st.markdown(f"**{len(materials)} material(s) found**")
+    col_count, col_size = st.columns([3, 1])
+    
+    with col_count:
+        st.markdown(f"**{total} material(s) found**")
+        if page is None and total > len(materials):
+            st.caption(f"Showing the {len(materials)} best matches. Refine your search to see more.")
+    
+    with col_size:
+        if page is not None:
+            st.selectbox("Per page", PAGE_SIZES, index=1, key="material_page_size")
     
     cols = st.columns(3)
     
     for i, material in enumerate(materials):
         with cols[i % 3]:
             render_material_card(material)
+    
+    if page is not None:
+        render_pager("material_cards", page)
 
 
 def get_filtered_materials():
-    materials = st.session_state.materials
-    
+    """Return (materials, total, page); page is None for search results, which are not paged."""
     category = st.session_state.get("material_category", "All")
     search = st.session_state.get("material_search", "")
-    
-    if category != "All":
-        materials = [m for m in materials if m["category"] == category]
-    
-    if search:
-        materials = [m for m in materials if search.lower() in m["name"].lower() or search.lower() in m["description"].lower()]
-    
-    return materials
+    user_id = st.session_state.user["db_id"]
+    
+    if search.strip():
+        found = search_materials(user_id, search, None if category == "All" else category, limit=SEARCH_LIMIT)
+        return found["results"], found["total"], None
+    
+    page_size = st.session_state.get("material_page_size", PAGE_SIZES[1])
+    page = page_materials(
+        user_id,
+        category=None if category == "All" else category,
+        after=pager_cursor("material_cards", (category,), page_size),
+        limit=page_size,
+    )
+    return page["items"], page["total"], page
 
 
+# One fragment per card; they share the key, so st.rerun("material_card") reruns every card
+@st.fragment(key="material_card")
+@profiled_fragment("Materials", "material_card")
 def render_material_card(material):
+    # Use and Record Use rerun only this card, so their flash is shown here
+    show_flash()
+    # A card-scoped rerun reuses the arguments of the last full render; read the current copy
+    material = st.session_state.materials.get(material["id"]) or material
     with st.container(border=True):
         st.subheader(f"📦 {material['name']}")
         
@@ -121,16 +170,16 @@ def render_material_card(material):
         col_view, col_use = st.columns(2)
         
         with col_view:
-            if st.button("View", key=f"view_{material['id']}", use_container_width=True):
-                st.session_state.view_material = material
-                st.rerun()
+            # Reruns the whole grid so the previously viewed card closes its details
+            st.button("View", key=f"view_{material['id']}", use_container_width=True,
+                      on_click=open_in_form, args=("view_material", material, "material_grid"))
         
         with col_use:
             if st.button("Use", key=f"use_{material['id']}", use_container_width=True):
-                increment_material_usage(material["id"])
-                reload_from_db()
+                updated = increment_material_usage(material["id"])
+                upsert_record("materials", updated)
                 flash(f"Recorded use of {material['name']}")
-                st.rerun()
+                rerun_fragment()
     
     if "view_material" in st.session_state and st.session_state.view_material["id"] == material["id"]:
         render_view_dialog(st.session_state.view_material)
@@ -149,11 +198,32 @@ def render_view_dialog(material):
         st.write("**Description:**")
         st.write(material['description'])
         
+        st.markdown("---")
+        
+        students = st.session_state.students
+        col_student, col_record = st.columns([3, 1])
+        
+        with col_student:
+            student_id = st.selectbox(
+                "Used with", [None] + [s["id"] for s in students], key=f"use_student_{material['id']}",
+                format_func=lambda sid: "No particular student" if sid is None else students.get(sid)["name"],
+            )
+        
+        with col_record:
+            if st.button("Record Use", key=f"record_use_{material['id']}", use_container_width=True):
+                updated = increment_material_usage(material["id"], student_id)
+                upsert_record("materials", updated)
+                st.session_state.view_material = updated
+                flash(f"Recorded use of {material['name']}")
+                rerun_fragment()
+        
         if st.button("Close", key=f"close_{material['id']}"):
             del st.session_state.view_material
-            st.rerun()
+            rerun_fragment()
 
 
+@st.fragment(key="material_form")
+@profiled_fragment("Materials", "material_form")
 def render_add_material_form():
     st.subheader("➕ Add New Material")
     
@@ -172,20 +242,19 @@ def render_add_material_form():
         
         with col_save:
             if st.button("Update Material", use_container_width=True):
-                update_material(material["id"], {
+                updated = update_material(material["id"], {
                     "name": name, "category": category, "age_range": age_range,
                     "description": description, "in_stock": in_stock,
-                    "times_used": material.get("times_used", 0),
                 })
                 del st.session_state.edit_material
-                reload_from_db()
+                upsert_record("materials", updated)
                 flash("Material updated successfully!")
                 st.rerun()
         
         with col_cancel:
             if st.button("Cancel Edit", use_container_width=True):
                 del st.session_state.edit_material
-                st.rerun()
+                rerun_fragment()
     
     else:
         name = st.text_input("Material Name", placeholder="e.g., Pink Tower")
@@ -201,11 +270,11 @@ def render_add_material_form():
                 st.error("Description is required!")
             else:
                 user_id = st.session_state.user["db_id"]
-                create_material(user_id, {
+                created = create_material(user_id, {
                     "name": name, "category": category, "age_range": age_range,
                     "description": description, "in_stock": in_stock,
                 })
-                reload_from_db()
+                upsert_record("materials", created)
                 flash(f"Added {name} successfully!")
                 st.rerun()
 
@@ -213,46 +282,40 @@ def render_add_material_form():
 def render_usage_statistics():
     st.subheader("📊 Material Usage Statistics")
     
-    materials = st.session_state.materials
+    summary = material_usage_summary(st.session_state.user["db_id"])
     
-    if not materials:
+    if not summary["total_materials"]:
         st.info("No materials available.")
         return
     
-    total_uses = sum(m.get("times_used", 0) for m in materials)
-    in_stock_count = sum(1 for m in materials if m["in_stock"])
-    
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Materials", len(materials))
+        st.metric("Total Materials", summary["total_materials"])
     with col2:
-        st.metric("Total Uses", total_uses)
+        st.metric("Total Uses", summary["total_uses"], f"+{summary['today']} today")
     with col3:
-        st.metric("In Stock", in_stock_count)
+        st.metric("Uses (7 days)", summary["recent"])
+    with col4:
+        st.metric("In Stock", summary["in_stock"])
+    
+    st.markdown("---")
+    
+    st.markdown("### Uses per Day")
+    st.bar_chart({day["date"]: day["uses"] for day in summary["by_day"]})
     
     st.markdown("---")
     
     st.markdown("### Usage by Category")
-    categories = {}
-    for m in materials:
-        cat = m["category"]
-        if cat not in categories:
-            categories[cat] = {"count": 0, "uses": 0}
-        categories[cat]["count"] += 1
-        categories[cat]["uses"] += m.get("times_used", 0)
-    
-    for cat, data in categories.items():
-        with st.expander(f"{cat}"):
-            st.write(f"**Materials:** {data['count']}")
-            st.write(f"**Total Uses:** {data['uses']}")
+    for cat in summary["by_category"]:
+        with st.expander(f"{cat['category']}"):
+            st.write(f"**Materials:** {cat['count']}")
+            st.write(f"**Total Uses:** {cat['uses']}")
     
     st.markdown("---")
     
     st.markdown("### Most Used Materials")
-    sorted_materials = sorted(materials, key=lambda x: x.get("times_used", 0), reverse=True)
-    
-    for m in sorted_materials[:5]:
+    for m in summary["top"]:
         with st.container(border=True):
             col1, col2 = st.columns([3, 1])
             
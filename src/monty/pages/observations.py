@@ -1,12 +1,35 @@
 import streamlit as st
 from datetime import datetime
 
-from src.monty.session import init_session_state, require_auth, reload_from_db, flash, show_flash
-from src.monty.crud import create_observation, update_observation, delete_observation
+from src.monty.session import (
+    PAGE_SIZES,
+    init_session_state,
+    require_auth,
+    upsert_record,
+    remove_record,
+    flash,
+    show_flash,
+    pager_cursor,
+    render_pager,
+    rerun_fragment,
+    open_in_form,
+)
+from src.monty.profiling import profiled_fragment, profiled_render
+from src.monty.crud import (
+    create_observation,
+    update_observation,
+    delete_observation,
+    page_observations,
+    search_observations,
+    list_observations_by_ids,
+)
 
+SEARCH_PAGE_SIZE = 20
 
+
+@profiled_render("Observations")
 def render():
-    init_session_state()
+    init_session_state("students")
     require_auth()
     
     st.set_page_config(page_title="Observations - Monty", page_icon="👁️", layout="wide")
@@ -48,13 +71,20 @@ def render_main_content():
     tab1, tab2 = st.tabs(["Observation Feed", "New Observation"])
     
     with tab1:
-        render_observation_filters()
-        render_observation_feed()
+        render_observation_list()
     
     with tab2:
         render_new_observation_form()
 
 
+@st.fragment(key="observation_list")
+@profiled_fragment("Observations", "observation_list")
+def render_observation_list():
+    show_flash()
+    render_observation_filters()
+    render_observation_feed()
+
+
 def render_observation_filters():
     col1, col2, col3 = st.columns(3)
     
@@ -69,71 +99,129 @@ def render_observation_filters():
     with col3:
         area_filter = st.selectbox("Filter by area", ["All Areas", "Practical Life", "Sensorial", "Language", "Mathematics", "Art", "Science", "Music"])
         st.session_state.obs_area_filter = area_filter
+    
+    # Start search results from the first page whenever the filters change
+    filters = (search_query, student_filter, area_filter)
+    if st.session_state.get("obs_search_filters") != filters:
+        st.session_state.obs_search_filters = filters
+        st.session_state.obs_search_page = 1
 
 
-def get_filtered_observations():
-    observations = st.session_state.observations
-    
+def render_observation_feed():
     search = st.session_state.get("obs_search", "")
+    if search:
+        render_search_results(search)
+        return
+    
     student_filter = st.session_state.get("obs_student_filter", "All Students")
     area_filter = st.session_state.get("obs_area_filter", "All Areas")
+    filters = (student_filter, area_filter)
+    page_size = st.session_state.get("obs_page_size", PAGE_SIZES[1])
     
-    if search:
-        observations = [o for o in observations if search.lower() in o["student"].lower() or search.lower() in o["notes"].lower()]
+    page = page_observations(
+        st.session_state.user["db_id"],
+        student_id=get_student_id(student_filter),
+        area=None if area_filter == "All Areas" else area_filter,
+        before=pager_cursor("obs_feed", filters, page_size),
+        limit=page_size,
+    )
+    
+    if not page["total"]:
+        st.info("No observations found matching your criteria.")
+        return
+    
+    col_count, col_size = st.columns([3, 1])
     
-    if student_filter != "All Students":
-        observations = [o for o in observations if o["student"] == student_filter]
+    with col_count:
+        st.markdown(f"**{page['total']} observation(s) found**")
     
-    if area_filter != "All Areas":
-        observations = [o for o in observations if o["area"] == area_filter]
+    with col_size:
+        st.selectbox("Per page", PAGE_SIZES, index=1, key="obs_page_size")
     
-    return observations
+    for obs in page["items"]:
+        render_observation_card(obs)
+    
+    render_pager("obs_feed", page)
 
 
-def render_observation_feed():
-    observations = get_filtered_observations()
+def render_search_results(search):
+    student_filter = st.session_state.get("obs_student_filter", "All Students")
+    area_filter = st.session_state.get("obs_area_filter", "All Areas")
+    student_id = get_student_id(student_filter)
+    page = st.session_state.get("obs_search_page", 1)
     
-    if not observations:
+    user_id = st.session_state.user["db_id"]
+    found = search_observations(
+        user_id, search, student_id,
+        None if area_filter == "All Areas" else area_filter,
+        limit=SEARCH_PAGE_SIZE, offset=(page - 1) * SEARCH_PAGE_SIZE,
+    )
+    
+    if not found["total"]:
         st.info("No observations found matching your criteria.")
         return
     
-    st.markdown(f"**{len(observations)} observation(s) found**")
-    
-    for obs in reversed(observations):
-        with st.container(border=True):
-            col1, col2, col3 = st.columns([2, 2, 1])
-            
-            with col1:
-                st.subheader(f"👤 {obs['student']}")
-                st.write(f"📅 {obs['date']}")
-            
-            with col2:
-                st.write(f"**Area:** {obs['area']}")
-                skills = obs.get("skills", [])
-                if skills:
-                    st.write("**Skills:** " + ", ".join([f"🏷️ {s}" for s in skills]))
-            
-            with col3:
-                st.write(f"🆔 #{obs['id']}")
-            
-            st.markdown("---")
-            st.write(obs['notes'])
-            
-            col_edit, col_delete = st.columns([1, 1])
-            
-            with col_edit:
-                if st.button("Edit", key=f"edit_obs_{obs['id']}", use_container_width=True):
-                    st.session_state.edit_observation = obs
-                    st.rerun()
-            
-            with col_delete:
-                if st.button("Delete", key=f"delete_obs_{obs['id']}", use_container_width=True):
-                    delete_observation(obs["id"])
-                    reload_from_db()
-                    flash(f"Deleted observation for {obs['student']}")
-                    st.rerun()
+    page_count = (found["total"] + SEARCH_PAGE_SIZE - 1) // SEARCH_PAGE_SIZE
+    if page > page_count:
+        # Deletions shrank the result set below the current page
+        st.session_state.obs_search_page = page = page_count
+        found = search_observations(
+            user_id, search, student_id,
+            None if area_filter == "All Areas" else area_filter,
+            limit=SEARCH_PAGE_SIZE, offset=(page - 1) * SEARCH_PAGE_SIZE,
+        )
+    col_count, col_page = st.columns([3, 1])
+    
+    with col_count:
+        st.markdown(f"**{found['total']} observation(s) found**")
+    
+    with col_page:
+        if page_count > 1:
+            st.number_input("Page", min_value=1, max_value=page_count, format="%d", key="obs_search_page")
+    
+    snippets = {r["id"]: r["snippet"] for r in found["results"]}
+    for obs in list_observations_by_ids(user_id, list(snippets)):
+        render_observation_card(obs, snippets[obs["id"]])
 
 
+def render_observation_card(obs, snippet=None):
+    with st.container(border=True):
+        col1, col2, col3 = st.columns([2, 2, 1])
+        
+        with col1:
+            st.subheader(f"👤 {obs['student']}")
+            st.write(f"📅 {obs['date']}")
+        
+        with col2:
+            st.write(f"**Area:** {obs['area']}")
+            skills = obs.get("skills", [])
+            if skills:
+                st.write("**Skills:** " + ", ".join([f"🏷️ {s}" for s in skills]))
+        
+        with col3:
+            st.write(f"🆔 #{obs['id']}")
+        
+        st.markdown("---")
+        if snippet:
+            st.markdown(f"🔎 {snippet}")
+        st.write(obs['notes'])
+        
+        col_edit, col_delete = st.columns([1, 1])
+        
+        with col_edit:
+            st.button("Edit", key=f"edit_obs_{obs['id']}", use_container_width=True,
+                      on_click=open_in_form, args=("edit_observation", obs, "observation_form"))
+        
+        with col_delete:
+            if st.button("Delete", key=f"delete_obs_{obs['id']}", use_container_width=True):
+                delete_observation(obs["id"])
+                remove_record("observations", obs["id"])
+                flash(f"Deleted observation for {obs['student']}")
+                rerun_fragment()
+
+
+@st.fragment(key="observation_form")
+@profiled_fragment("Observations", "observation_form")
 def render_new_observation_form():
     st.subheader("➕ New Observation")
     
@@ -162,19 +250,19 @@ def render_new_observation_form():
         with col_save:
             if st.button("Update Observation", use_container_width=True):
                 user_id = st.session_state.user["db_id"]
-                update_observation(obs["id"], user_id, {
-                    "student": student, "date": date.strftime("%Y-%m-%d"),
+                updated = update_observation(obs["id"], user_id, {
+                    "student_id": get_student_id(student), "date": date.strftime("%Y-%m-%d"),
                     "area": area, "skills": skills, "notes": notes,
                 })
                 del st.session_state.edit_observation
-                reload_from_db()
+                upsert_record("observations", updated)
                 flash("Observation updated successfully!")
                 st.rerun()
         
         with col_cancel:
             if st.button("Cancel Edit", use_container_width=True):
                 del st.session_state.edit_observation
-                st.rerun()
+                rerun_fragment()
     
     else:
         col1, col2 = st.columns(2)
@@ -197,14 +285,19 @@ def render_new_observation_form():
                 st.error("Please add observation notes!")
             else:
                 user_id = st.session_state.user["db_id"]
-                create_observation(user_id, {
-                    "student": student, "date": date.strftime("%Y-%m-%d"),
+                created = create_observation(user_id, {
+                    "student_id": get_student_id(student), "date": date.strftime("%Y-%m-%d"),
                     "area": area, "skills": skills, "notes": notes,
                 })
-                reload_from_db()
+                upsert_record("observations", created)
                 flash(f"Observation for {student} saved successfully!")
                 st.rerun()
 
 
+def get_student_id(student_name):
+    student = st.session_state.students.first(name=student_name)
+    return student["id"] if student else None
+
+
 if __name__ == "__main__":
     render()
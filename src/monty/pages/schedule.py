@@ -1,10 +1,21 @@
 import streamlit as st
-from src.monty.session import init_session_state, require_auth, reload_from_db, flash, show_flash
+from src.monty.session import (
+    init_session_state,
+    require_auth,
+    upsert_record,
+    remove_record,
+    flash,
+    show_flash,
+    rerun_fragment,
+    open_in_form,
+)
+from src.monty.profiling import profiled_fragment, profiled_render
 from src.monty.crud import create_schedule, update_schedule, delete_schedule
 
 
+@profiled_render("Schedule")
 def render():
-    init_session_state()
+    init_session_state("schedule")
     require_auth()
     
     st.set_page_config(page_title="Schedule - Monty", page_icon="📅", layout="wide")
@@ -52,14 +63,17 @@ def render_main_content():
         render_add_activity_form()
 
 
+@st.fragment(key="schedule_day")
+@profiled_fragment("Schedule", "schedule_day")
 def render_week_view():
+    show_flash()
     days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
     
     st.subheader("📅 This Week's Schedule")
     
     selected_day = st.selectbox("Select Day", days)
     
-    day_activities = [a for a in st.session_state.schedule if a["day"] == selected_day]
+    day_activities = st.session_state.schedule.where(day=selected_day)
     day_activities.sort(key=lambda x: x["time"])
     
     if not day_activities:
@@ -85,18 +99,19 @@ def render_week_view():
             col_edit, col_delete = st.columns([1, 1])
             
             with col_edit:
-                if st.button("Edit", key=f"edit_activity_{activity['id']}", use_container_width=True):
-                    st.session_state.edit_activity = activity
-                    st.rerun()
+                st.button("Edit", key=f"edit_activity_{activity['id']}", use_container_width=True,
+                          on_click=open_in_form, args=("edit_activity", activity, "schedule_form"))
             
             with col_delete:
                 if st.button("Delete", key=f"delete_activity_{activity['id']}", use_container_width=True):
                     delete_schedule(activity["id"])
-                    reload_from_db()
+                    remove_record("schedule", activity["id"])
                     flash(f"Deleted {activity['activity']}")
-                    st.rerun()
+                    rerun_fragment()
 
 
+@st.fragment(key="schedule_form")
+@profiled_fragment("Schedule", "schedule_form")
 def render_add_activity_form():
     st.subheader("➕ Add New Activity")
     
@@ -122,19 +137,19 @@ def render_add_activity_form():
         
         with col_save:
             if st.button("Update Activity", use_container_width=True):
-                update_schedule(activity["id"], {
+                updated = update_schedule(activity["id"], {
                     "day": day, "time": time, "duration": duration,
                     "students": students, "activity": activity_name,
                 })
                 del st.session_state.edit_activity
-                reload_from_db()
+                upsert_record("schedule", updated)
                 flash("Activity updated successfully!")
                 st.rerun()
         
         with col_cancel:
             if st.button("Cancel Edit", use_container_width=True):
                 del st.session_state.edit_activity
-                st.rerun()
+                rerun_fragment()
     
     else:
         col1, col2 = st.columns(2)
@@ -156,11 +171,11 @@ def render_add_activity_form():
                 st.error("Time is required!")
             else:
                 user_id = st.session_state.user["db_id"]
-                create_schedule(user_id, {
+                created = create_schedule(user_id, {
                     "day": day, "time": time, "activity": activity_name,
                     "duration": duration, "students": students,
                 })
-                reload_from_db()
+                upsert_record("schedule", created)
                 flash(f"Added {activity_name} successfully!")
                 st.rerun()
 
@@ -1,9 +1,18 @@
 import streamlit as st
+import os
+import tempfile
+from datetime import date
+from pathlib import Path
 
-from src.monty.session import init_session_state, require_auth, logout_user
+from src.monty.session import discard_temp_file, init_session_state, require_auth, logout_user
+from src.monty.profiling import profiled_render
 from src.monty.crud import get_user_settings, save_user_settings
+from src.monty.export import EXPORT_FORMATS, export_user_data
 
+EXPORT_LABELS = {"jsonl": "JSON Lines", "csv": "CSV", "parquet": "Parquet"}
 
+
+@profiled_render("Settings")
 def render():
     init_session_state()
     require_auth()
@@ -375,8 +384,64 @@ def render_privacy_section():
             st.success("Privacy settings saved successfully!")
     
     with col2:
-        if st.button("Export My Data", use_container_width=True):
-            st.info("Data export feature coming soon!")
+        export_format = st.selectbox("Export format", list(EXPORT_FORMATS),
+                                     format_func=lambda fmt: EXPORT_LABELS[fmt], label_visibility="collapsed")
+        if st.button("Export My Data", use_container_width=True, disabled=not settings["data_export"],
+                     help=None if settings["data_export"] else "Turn on Allow Data Export and save to export"):
+            export_my_data(export_format)
+    
+    render_data_export()
+
+
+def export_my_data(fmt):
+    user_id = st.session_state.user.get("db_id")
+    if not user_id:
+        st.error("Log in again to export your data.")
+        return
+    
+    discard_temp_file("data_export")
+    
+    # Written to disk rather than memory, so a large export stays small in the app
+    descriptor, path = tempfile.mkstemp(prefix="monty_export_", suffix=".zip")
+    progress = st.progress(0.0, text="Exporting...")
+    
+    def on_progress(done, total, table):
+        progress.progress(done / total, text=f"Exported {done} of {total}: {table}")
+    
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            stats = export_user_data(user_id, file, fmt, on_progress=on_progress)
+    except Exception:
+        Path(path).unlink(missing_ok=True)
+        raise
+    finally:
+        progress.empty()
+    
+    # One read handle per export, closed with the file by discard_temp_file
+    st.session_state.data_export = {
+        "path": path,
+        "file": open(path, "rb"),
+        "name": f"monty_export_{date.today().strftime('%Y%m%d')}_{fmt}.zip",
+        "stats": stats,
+    }
+
+
+def render_data_export():
+    export = st.session_state.get("data_export")
+    if not export or not os.path.exists(export["path"]):
+        return
+    
+    stats = export["stats"]
+    st.success(f"Exported {stats['rows']:,} rows from {len(stats['tables'])} tables "
+               f"({stats['bytes'] / 1024:,.0f} KB, {EXPORT_LABELS[stats['format']]}).")
+    details = f"{stats['seconds']:.2f}s, {stats['rows_per_second']:,.0f} rows/s"
+    if stats["peak_rss_bytes"] is not None:
+        details += f", peak RSS {stats['peak_rss_bytes'] / 2**20:,.0f} MB"
+    st.caption(f"{details}. " + ", ".join(f"{table}: {rows:,}" for table, rows in stats["tables"].items()))
+    
+    file = export["file"]
+    st.download_button("📥 Download My Data (Zip)", lambda: file,
+                       file_name=export["name"], mime="application/zip")
 
 
 def render_appearance_section():
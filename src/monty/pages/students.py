@@ -1,10 +1,24 @@
 import streamlit as st
-from src.monty.session import init_session_state, require_auth, reload_from_db, flash, show_flash
-from src.monty.crud import create_student, update_student, delete_student
+from src.monty.session import (
+    PAGE_SIZES,
+    init_session_state,
+    require_auth,
+    upsert_record,
+    remove_record,
+    flash,
+    show_flash,
+    pager_cursor,
+    render_pager,
+    rerun_fragment,
+    open_in_form,
+)
+from src.monty.profiling import profiled_fragment, profiled_render
+from src.monty.crud import create_student, update_student, delete_student, page_students
 
 
+@profiled_render("Students")
 def render():
-    init_session_state()
+    init_session_state("students")
     require_auth()
     
     st.set_page_config(page_title="Students - Monty", page_icon="👥", layout="wide")
@@ -46,13 +60,20 @@ def render_main_content():
     tab1, tab2 = st.tabs(["Student List", "Add Student"])
     
     with tab1:
-        render_student_filters()
-        render_student_grid()
+        render_student_list()
     
     with tab2:
         render_add_student_form()
 
 
+@st.fragment(key="student_list")
+@profiled_fragment("Students", "student_list")
+def render_student_list():
+    show_flash()
+    render_student_filters()
+    render_student_grid()
+
+
 def render_student_filters():
     col1, col2, col3 = st.columns(3)
     
@@ -69,33 +90,38 @@ def render_student_filters():
         st.session_state.interest_filter = interest_filter
 
 
-def get_filtered_students():
-    students = st.session_state.students
-    
+def get_student_page():
     search_query = st.session_state.get("search_query", "")
     age_filter = st.session_state.get("age_filter", "All Ages")
     interest_filter = st.session_state.get("interest_filter", "All Interests")
+    filters = (search_query, age_filter, interest_filter)
+    page_size = st.session_state.get("student_page_size", PAGE_SIZES[1])
     
-    if search_query:
-        students = [s for s in students if search_query.lower() in s["name"].lower()]
-    
-    if age_filter != "All Ages":
-        students = [s for s in students if s["age"] == int(age_filter)]
-    
-    if interest_filter != "All Interests":
-        students = [s for s in students if interest_filter in s["interests"]]
-    
-    return students
+    return page_students(
+        st.session_state.user["db_id"],
+        search=search_query,
+        age=None if age_filter == "All Ages" else int(age_filter),
+        interest=None if interest_filter == "All Interests" else interest_filter,
+        after=pager_cursor("student_grid", filters, page_size),
+        limit=page_size,
+    )
 
 
 def render_student_grid():
-    students = get_filtered_students()
+    page = get_student_page()
+    students = page["items"]
     
-    if not students:
+    if not page["total"]:
         st.info("No students found matching your criteria.")
         return
     
-    st.markdown(f"**{len(students)} student(s) found**")
+    col_count, col_size = st.columns([3, 1])
+    
+    with col_count:
+        st.markdown(f"**{page['total']} student(s) found**")
+    
+    with col_size:
+        st.selectbox("Per page", PAGE_SIZES, index=1, key="student_page_size")
     
     for i in range(0, len(students), 2):
         col1, col2 = st.columns(2)
@@ -106,6 +132,8 @@ def render_student_grid():
         with col2:
             if i + 1 < len(students):
                 render_student_card(students[i + 1])
+    
+    render_pager("student_grid", page)
 
 
 def render_student_card(student):
@@ -145,18 +173,19 @@ def render_student_card(student):
         col_edit, col_delete = st.columns(2)
         
         with col_edit:
-            if st.button("Edit", key=f"edit_{student['id']}", use_container_width=True):
-                st.session_state.edit_student = student
-                st.rerun()
+            st.button("Edit", key=f"edit_{student['id']}", use_container_width=True,
+                      on_click=open_in_form, args=("edit_student", student, "student_form"))
         
         with col_delete:
             if st.button("Delete", key=f"delete_{student['id']}", use_container_width=True):
                 delete_student(student["id"])
-                reload_from_db()
+                remove_record("students", student["id"])
                 flash(f"Deleted {student['name']}")
-                st.rerun()
+                rerun_fragment()
 
 
+@st.fragment(key="student_form")
+@profiled_fragment("Students", "student_form")
 def render_add_student_form():
     st.subheader("➕ Add New Student")
     
@@ -182,20 +211,28 @@ def render_add_student_form():
         
         with col1:
             if st.button("Update Student", use_container_width=True):
-                update_student(student["id"], {
-                    "name": name, "age": age, "interests": interests,
-                    "allergies": allergies, "parent_name": parent_name,
-                    "parent_email": parent_email,
-                })
-                del st.session_state.edit_student
-                reload_from_db()
-                flash("Student updated successfully!")
-                st.rerun()
+                existing = st.session_state.students.first(name=name)
+                if existing and existing["id"] != student["id"]:
+                    st.error(f"A student named {name} already exists!")
+                else:
+                    try:
+                        updated = update_student(student["id"], {
+                            "name": name, "age": age, "interests": interests,
+                            "allergies": allergies, "parent_name": parent_name,
+                            "parent_email": parent_email,
+                        })
+                    except ValueError as exc:
+                        st.error(str(exc))
+                    else:
+                        del st.session_state.edit_student
+                        upsert_record("students", updated)
+                        flash("Student updated successfully!")
+                        st.rerun()
         
         with col2:
             if st.button("Cancel Edit", use_container_width=True):
                 del st.session_state.edit_student
-                st.rerun()
+                rerun_fragment()
     
     else:
         name = st.text_input("Student Name", placeholder="Enter student name...")
@@ -215,16 +252,22 @@ def render_add_student_form():
                 st.error("Student name is required!")
             elif not parent_name:
                 st.error("Parent name is required!")
+            elif st.session_state.students.first(name=name):
+                st.error(f"A student named {name} already exists!")
             else:
                 user_id = st.session_state.user["db_id"]
-                create_student(user_id, {
-                    "name": name, "age": age, "interests": interests,
-                    "allergies": allergies, "parent_name": parent_name,
-                    "parent_email": parent_email,
-                })
-                reload_from_db()
-                flash(f"Added {name} successfully!")
-                st.rerun()
+                try:
+                    created = create_student(user_id, {
+                        "name": name, "age": age, "interests": interests,
+                        "allergies": allergies, "parent_name": parent_name,
+                        "parent_email": parent_email,
+                    })
+                except ValueError as exc:
+                    st.error(str(exc))
+                else:
+                    upsert_record("students", created)
+                    flash(f"Added {name} successfully!")
+                    st.rerun()
 
 
 if __name__ == "__main__":
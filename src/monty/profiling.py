@@ -0,0 +1,276 @@
+"""Opt-in per-rerun profiling of page renders, crud calls and SQL statements.
+
+Set ``MONTY_PROFILE=1`` to turn it on. Each page's ``render()`` is wrapped
+with ``profiled_render``, which times the rerun and collects, per public crud
+function, the number of calls, their wall time and the statements they sent
+to the database (counted by event hooks on the shared engine). Crud time that
+is not SQL is mostly ORM loading and dict conversion; render time outside
+crud is widget construction. The totals are shown in a sidebar panel and
+appended as one JSON line per rerun to ``MONTY_PROFILE_LOG``.
+
+A fragment rerun runs only the fragment's function, not ``render()``, so
+fragments are wrapped with ``profiled_fragment`` as well. Their reruns are
+logged as records of their own (with "fragment" set) and listed separately
+in the panel on the page's next full rerun.
+
+With profiling off, ``profiled_render``, ``profiled_fragment`` and
+``instrument_module`` return the functions unchanged.
+"""
+
+import inspect
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+
+from sqlalchemy import event
+
+from src.monty.database import DATA_DIR, get_engine
+
+PROFILING = os.environ.get("MONTY_PROFILE", "0") == "1"
+PROFILE_LOG = os.environ.get("MONTY_PROFILE_LOG", os.path.join(DATA_DIR, "profile.jsonl"))
+
+# Streamlit runs each session's rerun on its own thread, so the active
+# profile and the crud call stack are per thread.
+_local = threading.local()
+_log_lock = threading.Lock()
+_instrumented_engines = set()
+
+
+class RerunProfile:
+    """Timings collected during one page rerun."""
+
+    def __init__(self, page: str, fragment: str | None = None):
+        self.page = page
+        self.fragment = fragment
+        self.started = time.perf_counter()
+        self.render_seconds = 0.0
+        # Wall time of outermost crud calls; nested calls are inside it already
+        self.crud_seconds = 0.0
+        # function name -> {"calls", "seconds", "queries", "sql_seconds"}
+        self.functions: dict[str, dict] = {}
+
+    def _bucket(self, name: str) -> dict:
+        return self.functions.setdefault(name, {"calls": 0, "seconds": 0.0, "queries": 0, "sql_seconds": 0.0})
+
+    def add_call(self, name: str, seconds: float):
+        bucket = self._bucket(name)
+        bucket["calls"] += 1
+        bucket["seconds"] += seconds
+
+    def add_query(self, name: str, seconds: float):
+        bucket = self._bucket(name)
+        bucket["queries"] += 1
+        bucket["sql_seconds"] += seconds
+
+    @property
+    def queries(self) -> int:
+        return sum(b["queries"] for b in self.functions.values())
+
+    @property
+    def sql_seconds(self) -> float:
+        return sum(b["sql_seconds"] for b in self.functions.values())
+
+    def as_dict(self) -> dict:
+        return {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "page": self.page,
+            "fragment": self.fragment,
+            "render_ms": round(self.render_seconds * 1000, 3),
+            "crud_ms": round(self.crud_seconds * 1000, 3),
+            "sql_ms": round(self.sql_seconds * 1000, 3),
+            "queries": self.queries,
+            "functions": {
+                name: {
+                    "calls": b["calls"],
+                    "ms": round(b["seconds"] * 1000, 3),
+                    "queries": b["queries"],
+                    "sql_ms": round(b["sql_seconds"] * 1000, 3),
+                }
+                for name, b in sorted(self.functions.items(), key=lambda item: -item[1]["seconds"])
+            },
+        }
+
+
+def current_profile() -> RerunProfile | None:
+    return getattr(_local, "profile", None)
+
+
+def _call_stack() -> list[str]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+# ---------------------------------------------------------------------------
+# SQL statements
+# ---------------------------------------------------------------------------
+
+# The start time lives on the statement's execution context, which is
+# discarded with it: after_cursor_execute never fires for a statement that
+# raises (e.g. an IntegrityError), so nothing may be left waiting for it.
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile() is not None and context is not None:
+        context._monty_profile_started = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile()
+    started = getattr(context, "_monty_profile_started", None)
+    if profile is None or started is None:
+        return
+    stack = _call_stack()
+    profile.add_query(stack[-1] if stack else "(outside crud)", time.perf_counter() - started)
+
+
+def instrument_engine(engine):
+    """Attach the statement timing hooks to ``engine`` once."""
+    if id(engine) in _instrumented_engines:
+        return
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+    _instrumented_engines.add(id(engine))
+
+
+# ---------------------------------------------------------------------------
+# Crud calls
+# ---------------------------------------------------------------------------
+
+def traced(fn):
+    """Time calls to ``fn`` and attribute the statements it runs to it."""
+    name = fn.__name__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        profile = current_profile()
+        if profile is None:
+            return fn(*args, **kwargs)
+        stack = _call_stack()
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stack.pop()
+            elapsed = time.perf_counter() - start
+            profile.add_call(name, elapsed)
+            if not stack:
+                profile.crud_seconds += elapsed
+    return wrapper
+
+
+def instrument_module(namespace: dict, module_name: str):
+    """Wrap the public functions defined in a module with ``traced``.
+
+    Call at the bottom of the module as ``instrument_module(globals(), __name__)``.
+    Classes are left alone: wrapping one would hide its classmethods and
+    break ``isinstance`` checks.
+    """
+    if not PROFILING:
+        return
+    for name, value in list(namespace.items()):
+        if inspect.isfunction(value) and not name.startswith("_") and value.__module__ == module_name:
+            namespace[name] = traced(value)
+
+
+# ---------------------------------------------------------------------------
+# Page renders
+# ---------------------------------------------------------------------------
+
+def profiled_render(page: str):
+    """Decorate a page's ``render()`` to profile each rerun when profiling is on."""
+    def decorator(render):
+        if not PROFILING:
+            return render
+
+        @wraps(render)
+        def wrapper(*args, **kwargs):
+            if current_profile() is not None:
+                # app.py delegating to the dashboard; the outer page owns the profile
+                return render(*args, **kwargs)
+            instrument_engine(get_engine())
+            profile = _local.profile = RerunProfile(page)
+            _local.stack = []
+            completed = False
+            try:
+                result = render(*args, **kwargs)
+                completed = True
+                return result
+            finally:
+                # st.rerun() and st.stop() end the script with an exception;
+                # the rerun is still logged, only the panel is skipped.
+                profile.render_seconds = time.perf_counter() - profile.started
+                _local.profile = None
+                record = profile.as_dict()
+                write_record(record)
+                if completed:
+                    render_profile_panel(record)
+        return wrapper
+    return decorator
+
+
+def profiled_fragment(page: str, fragment: str):
+    """Decorate a fragment's function, below ``@st.fragment``, to profile reruns of the fragment alone.
+
+    During a full rerun the fragment's calls count towards the page's
+    profile. A fragment rerun gets its own record, which is logged and kept
+    in session state for the panel; the sidebar cannot be drawn from inside
+    a fragment rerun.
+    """
+    def decorator(fn):
+        if not PROFILING:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if current_profile() is not None:
+                return fn(*args, **kwargs)
+            import streamlit as st
+
+            instrument_engine(get_engine())
+            profile = _local.profile = RerunProfile(page, fragment)
+            _local.stack = []
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profile.render_seconds = time.perf_counter() - profile.started
+                _local.profile = None
+                record = profile.as_dict()
+                write_record(record)
+                st.session_state.setdefault("fragment_profiles", {})[(page, fragment)] = record
+        return wrapper
+    return decorator
+
+
+def write_record(record: dict, path: str | None = None):
+    path = path or PROFILE_LOG
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    line = json.dumps(record) + "\n"
+    with _log_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+def render_profile_panel(record: dict):
+    import streamlit as st
+
+    with st.sidebar.expander("⏱️ Profiling", expanded=False):
+        st.write(f"**Render:** {record['render_ms']:.1f} ms")
+        st.write(f"**Crud:** {record['crud_ms']:.1f} ms ({record['sql_ms']:.1f} ms SQL, {record['queries']} queries)")
+        st.write(f"**Widgets & other:** {record['render_ms'] - record['crud_ms']:.1f} ms")
+        for name, stats in record["functions"].items():
+            calls = f" ×{stats['calls']}: {stats['ms']:.1f} ms," if stats["calls"] else ""
+            st.caption(f"`{name}`{calls} {stats['queries']} queries / {stats['sql_ms']:.1f} ms SQL")
+        timings = st.session_state.get("load_timings")
+        if timings:
+            st.caption("Collection loads: " + ", ".join(f"{k} {v * 1000:.1f} ms" for k, v in timings.items()))
+        fragments = [r for (page, _), r in st.session_state.get("fragment_profiles", {}).items()
+                     if page == record["page"]]
+        if fragments:
+            st.write("**Last fragment reruns** (not in the totals above):")
+            for fragment in fragments:
+                st.caption(f"`{fragment['fragment']}`: {fragment['render_ms']:.1f} ms, "
+                           f"{fragment['crud_ms']:.1f} ms crud, {fragment['queries']} queries")
@@ -0,0 +1,27 @@
+"""Recompute the weekly skill rollups from the daily entries.
+
+    python -m src.monty.rebuild_rollups [--user USER_ID]
+
+Writes keep the rollups current on their own; run this to backfill after
+importing entries with raw SQL or restoring a backup taken without them.
+"""
+
+import argparse
+
+from src.monty.crud import rebuild_weekly_rollups
+from src.monty.database import init_db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user", type=int, default=None, help="only this user's rollups (default: everyone)")
+    args = parser.parse_args()
+
+    init_db()
+    rows = rebuild_weekly_rollups(args.user)
+    scope = f"user {args.user}" if args.user is not None else "all users"
+    print(f"Rebuilt weekly rollups for {scope}: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Document rendering for reports and newsletters.
+
+Documents are Jinja templates in ``src/monty/templates``. Each template is
+written once against a small set of markup helpers (``title``, ``heading``,
+``field``, ``item``, ...) and rendered to Markdown, plain text or HTML by
+swapping the helpers; HTML output is autoescaped. There is one Environment
+per format, and each compiles a template on first use and keeps it.
+
+``render_stream`` yields the document in chunks as the template runs, so a
+long report is never built as one string. ``download`` wraps that for
+``st.download_button``: the document is only rendered when the button is
+clicked, into a spooled file that moves to disk past ``SPOOL_MAX_BYTES``.
+``write_member`` streams a document into a zip archive the same way; zip
+archives are built in a ``spool_file`` and handed out with ``rewound``.
+"""
+
+import io
+import tempfile
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined
+from markupsafe import Markup
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+
+# format -> (file extension, MIME type)
+FORMATS = {
+    "markdown": (".md", "text/markdown"),
+    "text": (".txt", "text/plain"),
+    "html": (".html", "text/html"),
+}
+
+# Template output items gathered into each yielded chunk
+STREAM_BUFFER = 64
+SPOOL_MAX_BYTES = 1024 * 1024
+
+
+def _underline(text, char):
+    text = str(text).upper()
+    return f"{text}\n{char * len(text)}"
+
+
+MARKUP = {
+    "markdown": {
+        "doc_start": lambda title: "",
+        "doc_end": lambda: "",
+        "title": lambda text: f"# {text}",
+        "heading": lambda text: f"## {text}",
+        "subheading": lambda text: f"### {text}",
+        "bold": lambda text: f"**{text}**",
+        "emphasis": lambda text: f"*{text}*",
+        "para": lambda text: str(text),
+        # Two trailing spaces keep consecutive fields on separate lines
+        "field": lambda label, value: f"**{label}:** {value}  ",
+        "list_start": lambda: "",
+        "list_end": lambda: "",
+        "item": lambda text: f"- {text}",
+        "subitem": lambda text: f"  - {text}",
+        "rule": lambda: "---",
+    },
+    "text": {
+        "doc_start": lambda title: "",
+        "doc_end": lambda: "",
+        "title": lambda text: _underline(text, "="),
+        "heading": lambda text: _underline(text, "-"),
+        "subheading": lambda text: str(text),
+        "bold": lambda text: str(text),
+        "emphasis": lambda text: str(text),
+        "para": lambda text: str(text),
+        "field": lambda label, value: f"{label}: {value}",
+        "list_start": lambda: "",
+        "list_end": lambda: "",
+        "item": lambda text: f"- {text}",
+        "subitem": lambda text: f"    {text}",
+        "rule": lambda: "",
+    },
+    "html": {
+        "doc_start": lambda title: Markup(
+            '<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{}</title></head><body>'
+        ).format(title),
+        "doc_end": lambda: Markup("</body></html>"),
+        "title": lambda text: Markup("<h1>{}</h1>").format(text),
+        "heading": lambda text: Markup("<h2>{}</h2>").format(text),
+        "subheading": lambda text: Markup("<h3>{}</h3>").format(text),
+        "bold": lambda text: Markup("<strong>{}</strong>").format(text),
+        "emphasis": lambda text: Markup("<em>{}</em>").format(text),
+        "para": lambda text: Markup("<p>{}</p>").format(text),
+        "field": lambda label, value: Markup("<p><strong>{}:</strong> {}</p>").format(label, value),
+        "list_start": lambda: Markup("<ul>"),
+        "list_end": lambda: Markup("</ul>"),
+        "item": lambda text: Markup("<li>{}</li>").format(text),
+        "subitem": lambda text: Markup('<li class="note">{}</li>').format(text),
+        "rule": lambda: Markup("<hr>"),
+    },
+}
+
+
+def format_date(value, fmt: str = "%B %d, %Y") -> str:
+    """Jinja ``date`` filter; accepts dates and ISO date strings."""
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return value.strftime(fmt)
+
+
+@lru_cache(maxsize=None)
+def environment(fmt: str) -> Environment:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown report format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=fmt == "html",
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
+        undefined=StrictUndefined,
+        # Templates ship with the code; never stat them again once compiled
+        auto_reload=False,
+    )
+    env.globals.update(MARKUP[fmt])
+    env.filters["date"] = format_date
+    return env
+
+
+def render_stream(name: str, fmt: str, **context) -> Iterator[str]:
+    """Yield template ``name`` rendered as ``fmt``, a chunk at a time."""
+    stream = environment(fmt).get_template(name).stream(**context)
+    stream.enable_buffering(STREAM_BUFFER)
+    return iter(stream)
+
+
+def render(name: str, fmt: str, **context) -> str:
+    return "".join(render_stream(name, fmt, **context))
+
+
+def spool_file():
+    """An empty binary file, held in memory up to SPOOL_MAX_BYTES and on disk past that."""
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+
+
+def rewound(file):
+    """``file`` rewound and wrapped in a ``BufferedReader``, ready for st.download_button.
+
+    The button rejects a bare SpooledTemporaryFile; closing the reader closes the file.
+    """
+    file.seek(0)
+    return io.BufferedReader(file)
+
+
+def spool(chunks, encoding: str = "utf-8"):
+    """Write text chunks to a ``spool_file`` and return it ``rewound``."""
+    file = spool_file()
+    for chunk in chunks:
+        file.write(chunk.encode(encoding))
+    return rewound(file)
+
+
+def write_member(archive, name: str, chunks, encoding: str = "utf-8"):
+    """Compress text chunks into zip member ``name`` as they arrive."""
+    with archive.open(name, "w") as member:
+        for chunk in chunks:
+            member.write(chunk.encode(encoding))
+
+
+def download(name: str, fmt: str, **context):
+    """``st.download_button`` data: renders the document only when the button is clicked."""
+    return lambda: spool(render_stream(name, fmt, **context))
+
+
+def file_name(stem: str, fmt: str) -> str:
+    return f"{stem}{FORMATS[fmt][0]}"
+
+
+def mime_type(fmt: str) -> str:
+    return FORMATS[fmt][1]
@@ -0,0 +1,160 @@
+"""SQLite FTS5 full-text indexes kept in sync with the ORM tables by triggers.
+
+``observations_fts`` indexes each observation's student name, notes and
+skills under the observation id as its rowid. ``materials_fts`` is an
+external-content trigram index over material name and description, so any
+substring of three or more characters is an indexed match. Triggers keep
+both current, so the crud layer never writes to them directly.
+``install_search_indexes`` is idempotent and backfills each index the first
+time it is created.
+"""
+
+import re
+
+from sqlalchemy import text
+
+SEARCH_TABLES = ("observations_fts", "materials_fts")
+
+# Trigram queries shorter than this cannot use the index
+TRIGRAM_MIN_LENGTH = 3
+
+_OBSERVATION_SKILLS = "(SELECT group_concat(skill, ' ') FROM observation_skills WHERE observation_id = {id})"
+_STUDENT_NAME = "(SELECT name FROM students WHERE id = {student_id})"
+
+OBSERVATION_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS observations_fts USING fts5(
+        student, notes, skills,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS observations_fts_ai AFTER INSERT ON observations BEGIN
+        INSERT INTO observations_fts (rowid, student, notes, skills)
+        VALUES (new.id, {_STUDENT_NAME.format(student_id="new.student_id")}, new.notes,
+                {_OBSERVATION_SKILLS.format(id="new.id")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS observations_fts_au AFTER UPDATE ON observations BEGIN
+        UPDATE observations_fts
+        SET student = {_STUDENT_NAME.format(student_id="new.student_id")}, notes = new.notes
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS observations_fts_ad AFTER DELETE ON observations BEGIN
+        DELETE FROM observations_fts WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS observation_skills_fts_ai AFTER INSERT ON observation_skills BEGIN
+        UPDATE observations_fts SET skills = {_OBSERVATION_SKILLS.format(id="new.observation_id")}
+        WHERE rowid = new.observation_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS observation_skills_fts_ad AFTER DELETE ON observation_skills BEGIN
+        UPDATE observations_fts SET skills = {_OBSERVATION_SKILLS.format(id="old.observation_id")}
+        WHERE rowid = old.observation_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS students_fts_au AFTER UPDATE OF name ON students BEGIN
+        UPDATE observations_fts SET student = new.name
+        WHERE rowid IN (SELECT id FROM observations WHERE student_id = new.id);
+    END
+    """,
+]
+
+OBSERVATION_FTS_BACKFILL = f"""
+    INSERT INTO observations_fts (rowid, student, notes, skills)
+    SELECT o.id, s.name, o.notes, {_OBSERVATION_SKILLS.format(id="o.id")}
+    FROM observations o JOIN students s ON s.id = o.student_id
+"""
+
+MATERIAL_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS materials_fts USING fts5(
+        name, description,
+        content = 'materials', content_rowid = 'id',
+        tokenize = 'trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS materials_fts_ai AFTER INSERT ON materials BEGIN
+        INSERT INTO materials_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS materials_fts_ad AFTER DELETE ON materials BEGIN
+        INSERT INTO materials_fts (materials_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS materials_fts_au AFTER UPDATE OF name, description ON materials BEGIN
+        INSERT INTO materials_fts (materials_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO materials_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+]
+
+MATERIAL_FTS_BACKFILL = "INSERT INTO materials_fts (materials_fts) VALUES ('rebuild')"
+
+
+def is_search_table(name: str) -> bool:
+    """True for FTS virtual tables and the shadow tables SQLite creates for them."""
+    return any(name == table or name.startswith(f"{table}_") for table in SEARCH_TABLES)
+
+
+def fts5_available(connection) -> bool:
+    if connection.dialect.name != "sqlite":
+        return False
+    return bool(connection.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar())
+
+
+def trigram_available(connection) -> bool:
+    """The trigram tokenizer shipped with SQLite 3.34."""
+    version = connection.execute(text("SELECT sqlite_version()")).scalar()
+    return tuple(int(part) for part in version.split(".")[:2]) >= (3, 34)
+
+
+def _table_exists(connection, name: str) -> bool:
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": name}
+    ).first() is not None
+
+
+def install_search_indexes(engine):
+    """Create the FTS tables and triggers if missing; backfill tables created by this call."""
+    with engine.begin() as connection:
+        if not fts5_available(connection):
+            return
+        indexes = [("observations_fts", OBSERVATION_FTS_DDL, OBSERVATION_FTS_BACKFILL)]
+        if trigram_available(connection):
+            indexes.append(("materials_fts", MATERIAL_FTS_DDL, MATERIAL_FTS_BACKFILL))
+        for table, ddl, backfill in indexes:
+            is_new = not _table_exists(connection, table)
+            for statement in ddl:
+                connection.exec_driver_sql(statement)
+            if is_new:
+                connection.exec_driver_sql(backfill)
+
+
+def fts_query(query: str) -> str | None:
+    """Turn free text into an FTS5 query that ANDs a prefix match for every word."""
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def fts_phrase(query: str) -> str | None:
+    """Quote free text as a single FTS5 phrase, for substring matching on a trigram index."""
+    query = query.strip()
+    if not query:
+        return None
+    return '"' + query.replace('"', '""') + '"'
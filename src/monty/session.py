@@ -1,14 +1,11 @@
+import time
+from pathlib import Path
+
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 
 from src.monty.database import init_db
-from src.monty.crud import (
-    list_students,
-    list_observations,
-    list_schedules,
-    list_materials,
-    list_daily_entries,
-    get_user_settings,
-)
+from src.monty.store import COLLECTIONS, empty_store, load_store
 
 
 def _get_user_id() -> int | None:
@@ -18,7 +15,12 @@ def _get_user_id() -> int | None:
     return None
 
 
-def init_session_state():
+def init_session_state(*collections: str):
+    """Set up session defaults and load the named collections (see store.COLLECTIONS).
+
+    Pages pass only the collections they read, so e.g. Settings never loads
+    the observation history. Collections already in session state are kept.
+    """
     # Ensure database tables exist and demo data is seeded on first run
     if "db_initialized" not in st.session_state:
         init_db()
@@ -33,41 +35,164 @@ def init_session_state():
     if "show_login_modal" not in st.session_state:
         st.session_state.show_login_modal = False
 
-    # Load data from DB when user is authenticated
+    load_collections(*collections)
+
+
+def load_collections(*names: str):
+    """Load each named collection into session state unless it is already there."""
+    for name in names:
+        if name not in st.session_state:
+            load_collection(name)
+
+
+def load_collection(name: str):
+    """(Re)load one collection as a RecordStore and record how long it took."""
     user_id = _get_user_id()
-    if user_id is not None:
-        if "students" not in st.session_state:
-            st.session_state.students = list_students(user_id)
-        if "schedule" not in st.session_state:
-            st.session_state.schedule = list_schedules(user_id)
-        if "observations" not in st.session_state:
-            st.session_state.observations = list_observations(user_id)
-        if "materials" not in st.session_state:
-            st.session_state.materials = list_materials(user_id)
-        if "daily_entries" not in st.session_state:
-            st.session_state.daily_entries = list_daily_entries(user_id)
-    else:
-        if "students" not in st.session_state:
-            st.session_state.students = []
-        if "schedule" not in st.session_state:
-            st.session_state.schedule = []
-        if "observations" not in st.session_state:
-            st.session_state.observations = []
-        if "materials" not in st.session_state:
-            st.session_state.materials = []
-        if "daily_entries" not in st.session_state:
-            st.session_state.daily_entries = []
+    if user_id is None:
+        st.session_state[name] = empty_store(name)
+        return
+    start = time.perf_counter()
+    st.session_state[name] = load_store(user_id, name)
+    st.session_state.setdefault("load_timings", {})[name] = time.perf_counter() - start
 
 
 def reload_from_db():
-    """Force reload all data from the database into session state."""
-    user_id = _get_user_id()
-    if user_id is not None:
-        st.session_state.students = list_students(user_id)
-        st.session_state.schedule = list_schedules(user_id)
-        st.session_state.observations = list_observations(user_id)
-        st.session_state.materials = list_materials(user_id)
-        st.session_state.daily_entries = list_daily_entries(user_id)
+    """Force reload every collection this session has loaded."""
+    for name in COLLECTIONS:
+        if name in st.session_state:
+            load_collection(name)
+
+
+def upsert_record(collection: str, record: dict):
+    """Insert or replace ``record`` (matched by id) in a session collection's store without re-querying.
+
+    Collections that have not been loaded yet are left alone; they will be
+    loaded fresh when a page asks for them.
+    """
+    items = st.session_state.get(collection)
+    if items is None:
+        _forget_dependents(collection)
+        return
+    previous = items.get(record["id"])
+    st.session_state[collection] = items.upsert(record)
+
+    # Observations and daily entries reference students by name
+    if collection == "students" and previous and previous["name"] != record["name"]:
+        for key in ("observations", "daily_entries"):
+            if key in st.session_state:
+                st.session_state[key] = st.session_state[key].update_where(
+                    {"student": record["name"]}, student=previous["name"]
+                )
+
+
+def remove_record(collection: str, record_id: int):
+    """Drop the record with ``record_id`` from a session collection without re-querying.
+
+    Collections that have not been loaded yet are left alone; they will be
+    loaded fresh when a page asks for them.
+    """
+    items = st.session_state.get(collection)
+    if items is None:
+        _forget_dependents(collection)
+        return
+    removed = items.get(record_id)
+    st.session_state[collection] = items.remove(record_id)
+
+    # Deleting a student cascades to their observations and daily entries
+    if collection == "students" and removed:
+        for key in ("observations", "daily_entries"):
+            if key in st.session_state:
+                st.session_state[key] = st.session_state[key].remove_where(student=removed["name"])
+
+
+def _forget_dependents(collection: str):
+    # Without the old student record the name cascade cannot be applied, so
+    # drop the collections that reference students and let them reload.
+    if collection == "students":
+        for key in ("observations", "daily_entries"):
+            st.session_state.pop(key, None)
+
+
+def rerun_fragment():
+    """Rerun only the enclosing ``@st.fragment`` after an action that changes just its region.
+
+    Card grids and forms are fragments, so a Use/Delete/View click re-renders
+    that grid instead of the sidebar, the other tabs and every other region.
+    Streamlit allows a fragment-scoped rerun only while the fragment itself is
+    being rerun; during a full-page run this falls back to rerunning the page.
+    """
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+
+def open_in_form(state_key: str, record, form: str):
+    """``on_click`` callback for card Edit/View buttons: stage ``record`` and rerun only the ``form`` fragment.
+
+    ``form`` may also be the grid holding the card, when other cards must redraw too.
+    """
+    st.session_state[state_key] = record
+    st.rerun(form)
+
+
+PAGE_SIZES = (10, 20, 50)
+
+
+def pager_cursor(key: str, filters: tuple, page_size: int):
+    """Cursor for the current page of the pager ``key``.
+
+    The pager keeps the cursors of the pages visited so far so "Previous" can
+    step back; it starts over from the first page whenever ``filters`` or
+    ``page_size`` change.
+    """
+    state_key = f"{key}_pager"
+    pager = st.session_state.get(state_key)
+    if pager is None or pager["filters"] != (filters, page_size):
+        pager = st.session_state[state_key] = {"filters": (filters, page_size), "cursors": [None]}
+    return pager["cursors"][-1]
+
+
+def render_pager(key: str, page: dict):
+    """Previous/Next controls for a keyset page returned by a crud ``page_*`` function."""
+    pager = st.session_state[f"{key}_pager"]
+    if not page["items"] and len(pager["cursors"]) > 1:
+        # Deletions emptied this page; step back to the previous one
+        pager["cursors"].pop()
+        rerun_fragment()
+    if len(pager["cursors"]) == 1 and page["next_cursor"] is None:
+        return
+
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+
+    with col_prev:
+        if st.button("← Previous", key=f"{key}_prev", disabled=len(pager["cursors"]) == 1, use_container_width=True):
+            pager["cursors"].pop()
+            rerun_fragment()
+
+    with col_page:
+        st.caption(f"Page {len(pager['cursors'])}")
+
+    with col_next:
+        if st.button("Next →", key=f"{key}_next", disabled=page["next_cursor"] is None, use_container_width=True):
+            pager["cursors"].append(page["next_cursor"])
+            rerun_fragment()
+
+
+# Session entries that own a temporary file: an open handle ({"file": ...}),
+# on disk ({"path": ...}) or spooled, or both; released when replaced or on login/logout
+TEMP_FILE_KEYS = ("data_export", "term_report_archive", "newsletter_archive")
+
+
+def discard_temp_file(key: str):
+    """Drop the session entry ``key`` and release the temporary file it owns."""
+    entry = st.session_state.pop(key, None)
+    if not entry:
+        return
+    if "file" in entry:
+        entry["file"].close()
+    if "path" in entry:
+        Path(entry["path"]).unlink(missing_ok=True)
 
 
 def login_user(user_data):
@@ -76,8 +201,10 @@ def login_user(user_data):
     st.session_state.current_page = "dashboard"
     st.session_state.show_login_modal = False
     # Clear cached data so it reloads from DB for the new user
-    for key in ["students", "schedule", "observations", "materials", "daily_entries", "settings"]:
+    for key in [*COLLECTIONS, "settings", "load_timings"]:
         st.session_state.pop(key, None)
+    for key in TEMP_FILE_KEYS:
+        discard_temp_file(key)
 
 
 def logout_user():
@@ -85,8 +212,10 @@ def logout_user():
     st.session_state.user = None
     st.session_state.current_page = "landing"
     # Clear cached data
-    for key in ["students", "schedule", "observations", "materials", "daily_entries", "settings"]:
+    for key in [*COLLECTIONS, "settings", "load_timings"]:
         st.session_state.pop(key, None)
+    for key in TEMP_FILE_KEYS:
+        discard_temp_file(key)
 
 
 def flash(message: str, level: str = "success"):
@@ -0,0 +1,278 @@
+"""Compact, indexed in-memory copies of the per-user collections.
+
+Pages used to keep each collection as a list of the dicts built by the
+``crud._*_to_dict`` helpers and filter it with list comprehensions. A
+``RecordStore`` holds the same rows as ``__slots__`` records (list fields
+become tuples and repeated strings such as dates, areas and student names
+are interned) plus hash indexes on the fields pages filter by, so
+``store.where(student=..., date=...)`` touches only matching rows.
+
+Records are read-only and behave like the old dicts (``r["name"]``,
+``r.get("skills", [])``, ``{**r}``), so templates and forms keep working.
+Stores are immutable too: ``upsert``/``remove`` return a new store that
+shares the unchanged records. Built stores are kept in the shared read
+cache, so every session of a user points at the same one.
+"""
+
+import inspect
+import sys
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, Sequence
+from operator import attrgetter
+
+from src.monty.cache import cached_read
+from src.monty.profiling import instrument_module
+from src.monty.crud import (
+    list_daily_entries,
+    list_materials,
+    list_observations,
+    list_schedules,
+    list_students,
+)
+
+
+class Record(Mapping):
+    """Base for the slotted record types; read like the dict it was built from."""
+
+    __slots__ = ()
+    # Fields whose values repeat across rows; interned so equal values share one object
+    _interned: tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Record":
+        record = object.__new__(cls)
+        for name in cls.__slots__:
+            value = data[name]
+            if isinstance(value, list):
+                value = tuple(sys.intern(v) if isinstance(v, str) else v for v in value)
+            elif name in cls._interned and isinstance(value, str):
+                value = sys.intern(value)
+            object.__setattr__(record, name, value)
+        return record
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{k}={getattr(self, k)!r}' for k in self.__slots__)})"
+
+    def to_dict(self) -> dict:
+        return {k: list(v) if isinstance(v, tuple) else v for k, v in self.items()}
+
+
+class StudentRecord(Record):
+    __slots__ = ("id", "name", "age", "interests", "allergies", "parent_name", "parent_email")
+
+
+class ObservationRecord(Record):
+    __slots__ = ("id", "student", "date", "area", "notes", "skills")
+    _interned = ("student", "date", "area")
+
+
+class ScheduleRecord(Record):
+    __slots__ = ("id", "day", "time", "activity", "duration", "students")
+    _interned = ("day", "time", "students")
+
+
+class MaterialRecord(Record):
+    __slots__ = ("id", "name", "category", "age_range", "description", "in_stock", "times_used")
+    _interned = ("category", "age_range")
+
+
+class DailyEntryRecord(Record):
+    __slots__ = ("id", "student", "date", "subject", "activities", "skill_level", "notes")
+    _interned = ("student", "date", "subject", "skill_level")
+
+
+class RecordStore(Sequence):
+    """An immutable sequence of records with hash indexes on ``index_fields``.
+
+    Iteration order is the order the records were given in (id order for
+    the crud loaders). Each index maps a field value to the matching
+    records, in that same order. ``key_fields`` names a combination the
+    database keeps unique; records are also hashed by that tuple, so a
+    ``first()`` on exactly those fields is a single dict lookup.
+    """
+
+    __slots__ = ("record_type", "index_fields", "key_fields", "_records", "_by_id", "_by_key", "_indexes", "_sorted")
+
+    def __init__(
+        self,
+        record_type: type[Record],
+        records,
+        index_fields: tuple[str, ...] = (),
+        key_fields: tuple[str, ...] = (),
+    ):
+        self.record_type = record_type
+        self.index_fields = index_fields
+        self.key_fields = key_fields
+        self._records = tuple(records)
+        self._by_id = {r.id: r for r in self._records}
+        self._by_key = {}
+        if key_fields:
+            key = attrgetter(*key_fields)
+            self._by_key = {key(r): r for r in self._records}
+        self._indexes: dict[str, dict] = {}
+        for field in index_fields:
+            index: dict = {}
+            for record in self._records:
+                index.setdefault(getattr(record, field), []).append(record)
+            self._indexes[field] = index
+        # field -> (sorted values, records in that order), built on first range query
+        self._sorted: dict[str, tuple[list, list]] = {}
+
+    @classmethod
+    def from_dicts(
+        cls,
+        record_type: type[Record],
+        rows,
+        index_fields: tuple[str, ...] = (),
+        key_fields: tuple[str, ...] = (),
+    ) -> "RecordStore":
+        return cls(record_type, (record_type.from_dict(row) for row in rows), index_fields, key_fields)
+
+    def __getitem__(self, i):
+        return self._records[i]
+
+    def __len__(self):
+        return len(self._records)
+
+    def __repr__(self):
+        return f"RecordStore({self.record_type.__name__}, {len(self)} records, indexes={self.index_fields})"
+
+    # -- queries -------------------------------------------------------------
+
+    def get(self, record_id: int) -> Record | None:
+        return self._by_id.get(record_id)
+
+    def _narrow(self, criteria: dict):
+        """The smallest index bucket matching ``criteria`` and the criteria it leaves unchecked."""
+        buckets = [
+            (self._indexes[field].get(value, ()), field)
+            for field, value in criteria.items()
+            if field in self._indexes
+        ]
+        if not buckets:
+            return self._records, criteria
+        bucket, field = min(buckets, key=lambda b: len(b[0]))
+        return bucket, {f: v for f, v in criteria.items() if f != field}
+
+    def where(self, **criteria) -> list[Record]:
+        """Records whose fields equal every value in ``criteria``, in store order.
+
+        The most selective indexed field picks the candidates; any other
+        fields are checked on those candidates only.
+        """
+        candidates, rest = self._narrow(criteria)
+        return _filter(candidates, rest)
+
+    def first(self, **criteria) -> Record | None:
+        if self.key_fields and criteria.keys() == set(self.key_fields):
+            wanted = tuple(criteria[f] for f in self.key_fields)
+            return self._by_key.get(wanted if len(wanted) > 1 else wanted[0])
+        candidates, rest = self._narrow(criteria)
+        getter, wanted = _matcher(rest)
+        return next((r for r in candidates if getter(r) == wanted), None)
+
+    def between(self, field: str, low, high, **criteria) -> list[Record]:
+        """Records with ``low <= field <= high`` (plus equality ``criteria``), ordered by ``field``."""
+        if field not in self._sorted:
+            ordered = sorted(self._records, key=lambda r: getattr(r, field))
+            self._sorted[field] = ([getattr(r, field) for r in ordered], ordered)
+        values, ordered = self._sorted[field]
+        lo, hi = bisect_left(values, low), bisect_right(values, high)
+        bucket, rest = self._narrow(criteria)
+        if criteria and len(bucket) < hi - lo:
+            # An equality index is more selective than the range; filter its bucket instead
+            hits = sorted(
+                (r for r in bucket if low <= getattr(r, field) <= high), key=lambda r: getattr(r, field)
+            )
+        else:
+            hits, rest = ordered[lo:hi], criteria
+        return _filter(hits, rest)
+
+    # -- copy-on-write updates -----------------------------------------------
+
+    def _with(self, records) -> "RecordStore":
+        return RecordStore(self.record_type, records, self.index_fields, self.key_fields)
+
+    def upsert(self, row: Mapping) -> "RecordStore":
+        """A new store with ``row`` replacing the record with the same id, or appended."""
+        record = row if isinstance(row, self.record_type) else self.record_type.from_dict(row)
+        if record.id not in self._by_id:
+            return self._with((*self._records, record))
+        return self._with(record if r.id == record.id else r for r in self._records)
+
+    def remove(self, record_id: int) -> "RecordStore":
+        if record_id not in self._by_id:
+            return self
+        return self._with(r for r in self._records if r.id != record_id)
+
+    def remove_where(self, **criteria) -> "RecordStore":
+        doomed = {r.id for r in self.where(**criteria)}
+        return self._with(r for r in self._records if r.id not in doomed) if doomed else self
+
+    def update_where(self, changes: dict, **criteria) -> "RecordStore":
+        """A new store with ``changes`` applied to every record matching ``criteria``."""
+        targets = {r.id for r in self.where(**criteria)}
+        if not targets:
+            return self
+        return self._with(
+            self.record_type.from_dict({**r, **changes}) if r.id in targets else r for r in self._records
+        )
+
+
+def _matcher(criteria: dict):
+    """An (attrgetter, expected value) pair that compares every criterion in one call."""
+    if not criteria:
+        return (lambda r: ()), ()
+    fields = list(criteria)
+    return attrgetter(*fields), (criteria[fields[0]] if len(fields) == 1 else tuple(criteria.values()))
+
+
+def _filter(records, criteria: dict) -> list:
+    if not criteria:
+        return list(records)
+    getter, wanted = _matcher(criteria)
+    return [r for r in records if getter(r) == wanted]
+
+
+# name -> (crud loader, record type, indexed fields, unique key fields)
+COLLECTIONS = {
+    "students": (list_students, StudentRecord, ("name",), ("name",)),
+    "schedule": (list_schedules, ScheduleRecord, ("day",), ()),
+    "observations": (list_observations, ObservationRecord, ("student", "date", "area"), ()),
+    "materials": (list_materials, MaterialRecord, ("category",), ()),
+    # Mirrors uq_daily_entries_student_date_subject
+    "daily_entries": (list_daily_entries, DailyEntryRecord, ("student", "date", "subject"), ("student", "date", "subject")),
+}
+
+
+def empty_store(name: str) -> RecordStore:
+    _, record_type, index_fields, key_fields = COLLECTIONS[name]
+    return RecordStore(record_type, (), index_fields, key_fields)
+
+
+@cached_read("record_store")
+def load_store(user_id: int, name: str) -> RecordStore:
+    """Build the store for one of the user's collections, shared by all their sessions."""
+    loader, record_type, index_fields, key_fields = COLLECTIONS[name]
+    # Read past the dict cache: the store replaces the cached list, not adds to it
+    return RecordStore.from_dicts(record_type, inspect.unwrap(loader)(user_id), index_fields, key_fields)
+
+
+instrument_module(globals(), __name__)
@@ -0,0 +1,27 @@
+"""Shared fixtures.
+
+The app reads DATABASE_URL and its MONTY_* switches at import time, so app
+code runs in a fresh interpreter with the environment set up front.
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def run_app(tmp_path):
+    """``run_app(code, **env)`` runs ``code`` against a fresh SQLite database in tmp_path; returns its stdout."""
+    def run(code: str, **env) -> str:
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'monty.db'}", **env}
+        result = subprocess.run([sys.executable, "-c", textwrap.dedent(code)], cwd=ROOT, env=env,
+                                capture_output=True, text=True, timeout=120)
+        assert result.returncode == 0, result.stderr
+        return result.stdout
+    return run
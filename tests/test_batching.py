@@ -0,0 +1,60 @@
+"""Buffered usage events must reach the database through the group-commit writer.
+
+MONTY_WRITE_QUEUE and DATABASE_URL are read at import time, so each check
+runs in a fresh interpreter with the environment set up front.
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_queued(tmp_path, code: str) -> str:
+    env = {**os.environ, "MONTY_WRITE_QUEUE": "1", "DATABASE_URL": f"sqlite:///{tmp_path / 'monty.db'}"}
+    result = subprocess.run([sys.executable, "-c", textwrap.dedent(code)], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_pending_usage_events_are_written_at_exit(tmp_path):
+    run_queued(tmp_path, """
+        from src.monty import crud
+        from src.monty.database import get_writer, init_db
+
+        init_db()
+        material_id = crud.list_materials.__wrapped__(1)[0]["id"]
+        crud.increment_material_usage(material_id)
+        crud.increment_material_usage(material_id)
+        assert get_writer() is not None
+        assert crud.material_usage.pending() == 2
+    """)
+    with sqlite3.connect(tmp_path / "monty.db") as connection:
+        assert connection.execute("SELECT COUNT(*) FROM material_usage_events").fetchone() == (2,)
+        assert connection.execute("SELECT SUM(uses) FROM material_usage_daily").fetchone() == (2,)
+
+
+def test_crud_writes_go_through_the_writer(tmp_path):
+    out = run_queued(tmp_path, """
+        from src.monty import crud
+        from src.monty.database import get_writer, init_db
+
+        init_db()
+        student = crud.create_student(1, {"name": "Ada", "age": 4, "interests": ["maps"]})
+        try:
+            crud.create_student(1, {"name": "Ada", "age": 5})
+        except ValueError as exc:
+            print(exc)
+        crud.update_student(student["id"], {"name": "Ada", "age": 5})
+        schedule = crud.create_schedule(1, {"day": "Monday", "time": "09:00", "activity": "Circle",
+                                            "duration": 30, "students": "All"})
+        crud.delete_schedule(schedule["id"])
+        crud.save_user_settings(1, {"theme": "dark"})
+        print(get_writer().commands)
+    """)
+    assert out.splitlines() == ["A student named 'Ada' already exists", "5"]
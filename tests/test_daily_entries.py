@@ -0,0 +1,68 @@
+"""Daily-entry writes and the weekly rollup they maintain."""
+
+
+def test_upsert_replaces_the_entry_in_place(run_app):
+    run_app("""
+        from datetime import date
+
+        from src.monty import crud
+        from src.monty.database import init_db
+
+        init_db()
+        student = crud.create_student(1, {"name": "Ada", "age": 4})
+        entry = {"student_id": student["id"], "date": "2025-03-05", "subject": "Math"}
+        first = crud.upsert_daily_entry(1, {**entry, "skill_level": "Developing", "notes": "beads",
+                                            "activities": ["beads"]})
+        second = crud.upsert_daily_entry(1, {**entry, "skill_level": "Proficient", "notes": "rods",
+                                             "activities": ["rods", "cards"]})
+
+        assert second["id"] == first["id"]
+        assert (second["skill_level"], second["notes"]) == ("Proficient", "rods")
+        assert sorted(second["activities"]) == ["cards", "rods"]
+        entries = [e for e in crud.list_daily_entries.__wrapped__(1) if e["student"] == "Ada"]
+        assert [e["id"] for e in entries] == [first["id"]]
+
+        rollup = crud.list_weekly_rollup.__wrapped__(1, date(2025, 3, 3), date(2025, 3, 9), student["id"])
+        assert [(r["week_start"], r["skill_level"], r["sessions"]) for r in rollup] == [
+            ("2025-03-03", "Proficient", 1),
+        ]
+    """)
+
+
+def test_incremental_rollup_matches_a_rebuild(run_app):
+    run_app("""
+        from datetime import date
+
+        from src.monty import crud
+        from src.monty.database import init_db
+
+        def rollup():
+            return crud.list_weekly_rollup.__wrapped__(1, date(2000, 1, 1), date(2100, 1, 1))
+
+        init_db()
+        ada = crud.create_student(1, {"name": "Ada", "age": 4})
+        bo = crud.create_student(1, {"name": "Bo", "age": 5})
+        entries = [
+            crud.create_daily_entry(1, {"student_id": student["id"], "date": day, "subject": subject,
+                                        "skill_level": "Developing"})
+            for student in (ada, bo)
+            for day in ("2025-03-02", "2025-03-03", "2025-03-04")
+            for subject in ("Math", "Language")
+        ]
+        # Move an entry to another student, week and level, and one only to another level
+        crud.update_daily_entry(entries[0]["id"], 1, {"student_id": bo["id"], "date": "2025-03-10",
+                                                      "subject": "Math", "skill_level": "Advanced"})
+        crud.update_daily_entry(entries[2]["id"], 1, {"student_id": ada["id"], "date": "2025-03-03",
+                                                      "subject": "Math", "skill_level": "Proficient"})
+        crud.delete_daily_entry(entries[1]["id"])
+        crud.delete_daily_entry(entries[7]["id"])
+        crud.upsert_daily_entry(1, {"student_id": ada["id"], "date": "2025-03-04", "subject": "Math",
+                                    "skill_level": "Advanced"})
+        crud.upsert_daily_entry(1, {"student_id": ada["id"], "date": "2025-03-05", "subject": "Art",
+                                    "skill_level": "Emerging"})
+
+        incremental = rollup()
+        assert all(r["sessions"] > 0 for r in incremental)
+        crud.rebuild_weekly_rollups(1)
+        assert rollup() == incremental
+    """)
@@ -0,0 +1,84 @@
+"""Profiling must leave the instrumented modules working.
+
+PROFILING and DATABASE_URL are read at import time, so each check runs in a
+fresh interpreter with the environment set up front.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_profiled(tmp_path, code: str) -> str:
+    env = {**os.environ, "MONTY_PROFILE": "1", "DATABASE_URL": f"sqlite:///{tmp_path / 'monty.db'}",
+           "MONTY_PROFILE_LOG": str(tmp_path / "profile.jsonl")}
+    result = subprocess.run([sys.executable, "-c", textwrap.dedent(code)], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_load_store_with_profiling_enabled(tmp_path):
+    out = run_profiled(tmp_path, """
+        from src.monty import profiling
+        from src.monty.database import init_db
+        from src.monty.store import RecordStore, load_store
+
+        assert profiling.PROFILING
+        init_db()
+        profiling._local.profile = profiling.RerunProfile("test")
+        store = load_store(1, "students")
+        assert isinstance(store, RecordStore)
+        assert len(store) > 0
+        print(profiling._local.profile.functions["load_store"]["calls"])
+    """)
+    assert out.strip() == "1"
+
+
+def test_fragment_rerun_is_profiled_on_its_own(tmp_path):
+    run_profiled(tmp_path, """
+        from src.monty import profiling
+        from src.monty.crud import list_students
+        from src.monty.database import init_db
+
+        init_db()
+
+        @profiling.profiled_fragment("Students", "student_list")
+        def fragment():
+            return list_students(1)
+
+        assert fragment()
+        assert profiling.current_profile() is None
+    """)
+    records = [json.loads(line) for line in (tmp_path / "profile.jsonl").read_text().splitlines()]
+    assert [(r["page"], r["fragment"]) for r in records] == [("Students", "student_list")]
+    assert records[0]["functions"]["list_students"]["calls"] == 1
+    assert records[0]["queries"] > 0
+
+
+def test_failed_statements_leave_no_timing_state(tmp_path):
+    out = run_profiled(tmp_path, """
+        from src.monty import crud, profiling
+        from src.monty.database import get_engine, init_db
+
+        init_db()
+        profiling.instrument_engine(get_engine())
+        profiling._local.profile = profiling.RerunProfile("test")
+        crud.create_student(1, {"name": "Ada", "age": 4})
+        for _ in range(3):
+            try:
+                crud.create_student(1, {"name": "Ada", "age": 4})
+            except ValueError:
+                pass
+        crud.list_students(1)
+        profile = profiling._local.profile
+        print(profile.functions["list_students"]["queries"])
+        with get_engine().connect() as connection:
+            print(sorted(key for key in connection.info if "profile" in key))
+    """)
+    assert out.splitlines() == ["3", "[]"]
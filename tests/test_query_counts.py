@@ -0,0 +1,33 @@
+"""Each crud list_* call issues a fixed number of statements, however many rows it returns."""
+
+
+def test_list_queries_stay_within_budget(run_app):
+    run_app("""
+        from src.monty import crud
+        from src.monty.database import assert_max_queries, init_db
+
+        init_db()
+        for i in range(5):
+            student = crud.create_student(1, {"name": f"Student {i}", "age": 4, "interests": ["maps", "music"],
+                                              "allergies": ["milk"]})
+            for day in range(1, 4):
+                crud.create_observation(1, {"student_id": student["id"], "date": f"2025-03-0{day}",
+                                            "area": "Math", "skills": ["counting", "sorting"]})
+                crud.create_daily_entry(1, {"student_id": student["id"], "date": f"2025-03-0{day}",
+                                            "subject": "Math", "skill_level": "Developing",
+                                            "activities": ["beads", "cards"]})
+
+        list_functions = {
+            "students": crud.list_students,
+            "observations": crud.list_observations,
+            "schedule": crud.list_schedules,
+            "materials": crud.list_materials,
+            "daily_entries": crud.list_daily_entries,
+        }
+        assert set(list_functions) == set(crud.LIST_QUERY_COUNTS)
+        for name, list_function in list_functions.items():
+            # Bypass the read cache so the queries actually run
+            with assert_max_queries(crud.LIST_QUERY_COUNTS[name]):
+                rows = list_function.__wrapped__(1)
+            assert len(rows) >= 5, name
+    """)
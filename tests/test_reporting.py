@@ -0,0 +1,13 @@
+"""Spooled downloads must be a file type st.download_button accepts."""
+
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from src.monty.reporting import SPOOL_MAX_BYTES, spool
+
+
+def test_spooled_files_are_accepted_by_download_button():
+    # One stays in memory, the other rolls over to disk
+    for size in (10, SPOOL_MAX_BYTES + 10):
+        with spool(["é" * (size // 2)]) as file:
+            data, _ = convert_data_to_bytes_and_infer_mime(file, unsupported_error=TypeError(type(file)))
+        assert data.decode("utf-8") == "é" * (size // 2)
@@ -0,0 +1,80 @@
+"""Full-text search and the triggers that keep its indexes current."""
+
+
+def test_observation_search_follows_writes(run_app):
+    run_app("""
+        from src.monty import crud
+        from src.monty.database import get_engine, init_db
+        from src.monty.search import fts5_available
+
+        def found(query, **filters):
+            return [r["id"] for r in crud.search_observations(1, query, **filters)["results"]]
+
+        init_db()
+        with get_engine().connect() as connection:
+            assert fts5_available(connection)
+        zora = crud.create_student(1, {"name": "Zora", "age": 4})
+        quill = crud.create_student(1, {"name": "Quillon", "age": 5})
+        poured = crud.create_observation(1, {"student_id": zora["id"], "date": "2025-03-05", "area": "Practical Life",
+                                             "notes": "Poured water into the carafe", "skills": ["decanting"]})
+        traced = crud.create_observation(1, {"student_id": quill["id"], "date": "2025-03-06", "area": "Language",
+                                             "notes": "Traced sandpaper letters at the café", "skills": []})
+
+        # Prefixes of notes, student names and skills; diacritics are folded
+        assert found("carafe") == [poured["id"]]
+        assert found("sandpap lett") == [traced["id"]]
+        assert found("zor") == [poured["id"]]
+        assert found("decant") == [poured["id"]]
+        assert found("cafe") == [traced["id"]]
+        assert found("carafe", student_id=quill["id"]) == []
+        assert found("sandpaper", area="Language") == [traced["id"]]
+        assert "**" in crud.search_observations(1, "carafe")["results"][0]["snippet"]
+        assert crud.search_observations(1, "  ?! ") == {"total": 0, "results": []}
+
+        crud.update_observation(traced["id"], 1, {"student_id": quill["id"], "date": "2025-03-06",
+                                                  "area": "Language", "notes": "Built the pink tower",
+                                                  "skills": ["grading"]})
+        assert found("sandpaper") == []
+        assert found("tower grading") == [traced["id"]]
+        crud.update_student(quill["id"], {"name": "Quentin", "age": 5})
+        assert found("quentin") == [traced["id"]]
+        assert found("quillon") == []
+        crud.delete_observation(poured["id"])
+        assert found("carafe") == []
+    """)
+
+
+def test_material_search_matches_substrings(run_app):
+    run_app("""
+        from src.monty import crud
+        from src.monty.database import get_engine, init_db
+        from src.monty.search import TRIGRAM_MIN_LENGTH, trigram_available
+
+        def found(query, **filters):
+            return [r["name"] for r in crud.search_materials(1, query, **filters)["results"]]
+
+        init_db()
+        with get_engine().connect() as connection:
+            assert trigram_available(connection)
+        crud.create_material(1, {"name": "Zebrawood Puzzle Map", "category": "Geography",
+                                 "description": "Continents of the world"})
+        crud.create_material(1, {"name": "Qx Beads", "category": "Math", "description": "Golden bead chains"})
+
+        # Any substring of TRIGRAM_MIN_LENGTH or more characters, in name or description
+        assert found("ebrawoo") == ["Zebrawood Puzzle Map"]
+        assert found("ZEBRA") == ["Zebrawood Puzzle Map"]
+        assert found("olden bead ch") == ["Qx Beads"]
+        assert found("ebrawoo", category="Math") == []
+        # Shorter queries fall back to a LIKE scan
+        assert len("Qx") < TRIGRAM_MIN_LENGTH
+        assert found("Qx") == ["Qx Beads"]
+        assert found("qx", category="Geography") == []
+        assert crud.search_materials(1, "   ") == {"total": 0, "results": []}
+
+        material = crud.search_materials(1, "Zebrawood")["results"][0]
+        crud.update_material(material["id"], {**material, "name": "Walnut Puzzle Map"})
+        assert found("Zebrawood") == []
+        assert found("lnut puz") == ["Walnut Puzzle Map"]
+        crud.delete_material(material["id"])
+        assert found("Walnut") == []
+    """)
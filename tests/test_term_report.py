@@ -0,0 +1,71 @@
+"""term_report's GROUP BY aggregates against figures counted by hand."""
+
+
+def test_term_report_aggregates(run_app):
+    run_app("""
+        from datetime import date
+
+        from src.monty import crud
+        from src.monty.database import init_db
+
+        init_db()
+        ada = crud.create_student(1, {"name": "Ada", "age": 4})
+        bo = crud.create_student(1, {"name": "Bo", "age": 5})
+        for day, area, skills in [
+            ("2025-01-10", "Math", ["counting"]),  # before the term
+            ("2025-01-20", "Math", ["counting", "sorting"]),
+            ("2025-02-03", "Math", ["counting"]),
+            ("2025-02-04", "Language", []),
+            ("2025-03-20", "Math", ["sorting"]),  # after the term
+        ]:
+            crud.create_observation(1, {"student_id": ada["id"], "date": day, "area": area, "skills": skills})
+        for student, day, subject, level, activities in [
+            (ada, "2025-01-20", "Math", "Developing", ["beads", "cards"]),
+            (ada, "2025-01-21", "Math", "Proficient", ["beads"]),
+            (ada, "2025-02-10", "Language", "Emerging", []),
+            (ada, "2025-03-11", "Math", "Advanced", ["beads"]),  # after the term
+            (bo, "2025-03-01", "Art", "Advanced", ["easel"]),
+        ]:
+            crud.create_daily_entry(1, {"student_id": student["id"], "date": day, "subject": subject,
+                                        "skill_level": level, "activities": activities})
+
+        report = crud.term_report(1, date(2025, 1, 15), date(2025, 3, 10))
+        assert report["months"] == ["2025-01", "2025-02", "2025-03"]
+        assert report["subjects"] == ["Art", "Language", "Math"]
+
+        a = report["students"][ada["id"]]
+        assert a["observations"] == 3
+        assert list(a["areas"].items()) == [("Math", 2), ("Language", 1)]
+        assert a["skills"] == [
+            {"skill": "counting", "count": 2, "first": "2025-01-20", "last": "2025-02-03"},
+            {"skill": "sorting", "count": 1, "first": "2025-01-20", "last": "2025-01-20"},
+        ]
+        assert a["sessions"] == 3
+        assert a["subjects"] == [
+            {"subject": "Math", "sessions": 2, "activities": 3, "distinct_activities": 2,
+             "first": "2025-01-20", "last": "2025-01-21"},
+            {"subject": "Language", "sessions": 1, "activities": 0, "distinct_activities": 0,
+             "first": "2025-02-10", "last": "2025-02-10"},
+        ]
+        assert a["subjects_missing"] == ["Art"]
+        assert a["monthly"] == {
+            "observations": [1, 2, 0],
+            "skills": [2, 1, 0],
+            "sessions": [2, 1, 0],
+            "level_score": [2.5, 1.0, None],
+        }
+        assert a["levels_by_month"] == {
+            "Emerging": [0, 1, 0], "Developing": [1, 0, 0], "Proficient": [1, 0, 0],
+        }
+        assert list(a["levels_by_month"]) == ["Emerging", "Developing", "Proficient"]
+
+        b = report["students"][bo["id"]]
+        assert (b["observations"], b["areas"], b["skills"]) == (0, {}, [])
+        assert b["subjects_missing"] == ["Language", "Math"]
+        assert b["monthly"]["level_score"] == [None, None, 4.0]
+
+        only_bo = crud.term_report(1, date(2025, 1, 15), date(2025, 3, 10), student_id=bo["id"])
+        assert list(only_bo["students"]) == [bo["id"]]
+        assert only_bo["subjects"] == ["Art"]
+        assert only_bo["students"][bo["id"]]["subjects_missing"] == []
+    """)